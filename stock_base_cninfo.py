@@ -16,6 +16,43 @@ pd.set_option('display.width', None)           # 不限制列宽
 pd.set_option('display.max_colwidth', None)     # 不限制列内容宽度
 pd.set_option('expand_frame_repr', False)  # 不换行显示
 
+# 巨潮资讯公司概况列名 -> 英文字段名（保存时加cninfo_前缀）
+CNINFO_FIELDS = [
+    ('公司名称', 'name'),
+    ('英文名称', 'en_name'),
+    ('A股代码', 'code'),
+    ('A股简称', 'short_name'),
+    ('H股代码', 'h_code'),
+    ('H股简称', 'h_short_name'),
+    ('所属市场', 'market'),
+    ('所属行业', 'industry'),
+    ('法人代表', 'legal_rep'),
+    ('注册资金', 'capital'),
+    ('成立日期', 'establish_date'),
+    ('上市日期', 'list_date'),
+    ('官方网站', 'website'),
+    ('注册地址', 'reg_address'),
+    ('办公地址', 'office_address'),
+    ('主营业务', 'business'),
+    ('经营范围', 'scope'),
+    ('机构简介', 'profile'),
+]
+
+def extract_profile_fields(df):
+    """
+    从stock_profile_cninfo返回的数据中提取英文字段名字典（不含前缀）
+
+    参数:
+        df (pd.DataFrame): 接口返回数据
+
+    返回:
+        dict: {英文字段名: 值}，数据为空时返回空字典
+    """
+    if df.empty:
+        return {}
+    row = df.iloc[0]
+    return {field: row.get(column, '') for column, field in CNINFO_FIELDS}
+
 def get_stock_basic_info(symbol):
     """
     获取股票基础信息
@@ -64,24 +101,8 @@ def get_stock_basic_info(symbol):
             cn_stock_info['机构简介'] = row.get('机构简介', '')
 
             # 英文键名字典（以cninfo_开头）
-            en_stock_info['cninfo_name'] = row.get('公司名称', '')
-            en_stock_info['cninfo_en_name'] = row.get('英文名称', '')
-            en_stock_info['cninfo_code'] = row.get('A股代码', '')
-            en_stock_info['cninfo_short_name'] = row.get('A股简称', '')
-            en_stock_info['cninfo_h_code'] = row.get('H股代码', '')
-            en_stock_info['cninfo_h_short_name'] = row.get('H股简称', '')
-            en_stock_info['cninfo_market'] = row.get('所属市场', '')
-            en_stock_info['cninfo_industry'] = row.get('所属行业', '')
-            en_stock_info['cninfo_legal_rep'] = row.get('法人代表', '')
-            en_stock_info['cninfo_capital'] = row.get('注册资金', '')
-            en_stock_info['cninfo_establish_date'] = row.get('成立日期', '')
-            en_stock_info['cninfo_list_date'] = row.get('上市日期', '')
-            en_stock_info['cninfo_website'] = row.get('官方网站', '')
-            en_stock_info['cninfo_reg_address'] = row.get('注册地址', '')
-            en_stock_info['cninfo_office_address'] = row.get('办公地址', '')
-            en_stock_info['cninfo_business'] = row.get('主营业务', '')
-            en_stock_info['cninfo_scope'] = row.get('经营范围', '')
-            en_stock_info['cninfo_profile'] = row.get('机构简介', '')
+            for field, value in extract_profile_fields(df).items():
+                en_stock_info[f'cninfo_{field}'] = value
 
         return en_stock_info, cn_stock_info
 
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应并发控制（AIMD）
+每个限速类别（网站）独立维护并发上限：一个窗口内的请求延迟和错误率都在目标以内时并发上限加1，
+遇到限流信号（429、请求过于频繁等）或延迟、错误率超标时减半，最低为1；回升到上次被缩减的上限前等待，屡次失败时等待加倍。
+附带模拟服务器和模拟程序，按可配置的限流曲线检验控制效果
+"""
+
+import re
+import sys
+import time
+import random
+import threading
+from collections import deque
+from statistics import median
+from typing import Callable, Dict, List
+
+# 视为限流的HTTP状态码和错误信息
+THROTTLE_STATUS_CODES = {403, 429, 503}
+# 429 只在HTTP状态的上下文中出现时才算，避免股票代码、URL中的数字（如 SH600429）误判为限流
+THROTTLE_PATTERN = re.compile(
+    r'\b429\s+(?:client error|too many)'
+    r'|\bstatus(?:[ _]code)?\s*[:=]?\s*429\b'
+    r'|too many requests|rate limit|throttl|频繁|限流|稍后再试',
+    re.IGNORECASE)
+
+
+def is_throttle_error(error: BaseException) -> bool:
+    """异常是否为上游的限流信号"""
+    response = getattr(error, 'response', None)
+    if getattr(response, 'status_code', None) in THROTTLE_STATUS_CODES:
+        return True
+    return THROTTLE_PATTERN.search(str(error)) is not None
+
+
+class AIMDController:
+    """并发上限的加性增、乘性减控制器，调用方负责加锁"""
+
+    def __init__(self, initial_limit: float = 1.0, min_limit: float = 1.0, max_limit: int = 8,
+                 increase: float = 1.0, decrease: float = 0.5, latency_target: float = 3.0,
+                 error_target: float = 0.1, window: int = 10, cooldown: float = 1.0,
+                 max_probe_wait: float = 60.0):
+        """
+        参数:
+            initial_limit: 初始并发上限
+            min_limit / max_limit: 并发上限的范围，低于1时同时只有一个请求，请求间隔按比例拉长；
+                                   默认最低为1，即最慢与固定间隔模式相同，限流后由冷却时间放慢
+            increase: 一个窗口达标后增加的并发数
+            decrease: 限流或超标时的缩减比例
+            latency_target: 窗口内请求延迟中位数的目标（秒）
+            error_target: 窗口内错误率的目标
+            window: 评估一次所需的最少请求数，并发上限更大时按并发上限计
+            cooldown: 调整后的冷却时间（秒），上游的限流判断有滞后：缩减后冷却期内的限流响应来自同一次过载，
+                      不再重复缩减；增加后冷却期内不再增加，等上游对新速率作出反应
+            max_probe_wait: 重新试探上次被缩减的并发上限前的最长等待（秒）。缩减后回升到该上限前需等待，
+                            再次在该上限被缩减时等待加倍，在该上限撑过一个窗口后恢复为冷却时间；
+                            容量刚好低于下一档的网站上不会每隔几秒就因试探被限流一轮
+        """
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.error_target = error_target
+        self.window = window
+        self.throttle_count = 0
+        self._latencies: List[float] = []
+        self._errors = 0
+        self.cooldown = cooldown
+        self.max_probe_wait = max_probe_wait
+        self._hold_until = 0.0
+        self._grow_after = 0.0
+        # 上次被缩减时的并发上限，回升到这里需等到 _probe_after
+        self._ceiling = float('inf')
+        self._probe_wait = cooldown
+        self._probe_after = 0.0
+
+    @property
+    def concurrency(self) -> int:
+        """当前允许同时进行的请求数"""
+        return max(int(self.limit), 1)
+
+    def record(self, latency: float, error: bool = False, throttled: bool = False) -> None:
+        """记录一次请求的延迟和结果"""
+        now = time.monotonic()
+        if throttled:
+            self.throttle_count += 1
+            self._cut(now, latency)
+            return
+        self._latencies.append(latency)
+        self._errors += int(error)
+        if len(self._latencies) < max(self.window, self.concurrency):
+            return
+        healthy = (median(self._latencies) <= self.latency_target
+                   and self._errors / len(self._latencies) <= self.error_target)
+        if healthy:
+            if self.limit >= self._ceiling:
+                # 试探成功，之后按正常节奏增加
+                self._ceiling = float('inf')
+                self._probe_wait = self.cooldown
+            # 上限低于1时按最小上限的步长增加，避免请求速率成倍跳升
+            step = self.increase if self.limit >= 1 else self.min_limit
+            grown = min(self.limit + step, self.max_limit)
+            if now >= self._grow_after and (grown < self._ceiling or now >= self._probe_after):
+                self.limit = grown
+                self._grow_after = now + self.cooldown
+            self._reset()
+        else:
+            self._cut(now, latency)
+
+    def _cut(self, now: float, latency: float) -> None:
+        if now >= self._hold_until:
+            if self.limit >= self._ceiling:
+                # 在上次被缩减的上限再次被缩减，下次试探前等待加倍
+                self._probe_wait = min(self._probe_wait * 2, self.max_probe_wait)
+            self._ceiling = self.limit
+            self._probe_after = now + self._probe_wait
+            self.limit = max(self.limit * self.decrease, self.min_limit)
+            self._hold_until = self._grow_after = now + max(self.cooldown, latency)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._latencies = []
+        self._errors = 0
+
+
+# ---------------- 模拟服务器 ----------------
+
+# 限流曲线：负载（最近1秒请求数 / 服务器容量）→ 返回限流错误的概率
+THROTTLE_CURVES: Dict[str, Callable[[float], float]] = {
+    'step': lambda load: 0.0 if load <= 1.0 else 1.0,
+    'linear': lambda load: min(max(load - 1.0, 0.0), 1.0),
+    'soft': lambda load: min(max(load - 0.8, 0.0) ** 2 * 4, 1.0),
+}
+
+
+class ThrottledError(Exception):
+    """模拟服务器返回的限流错误"""
+
+
+class SimulatedServer:
+    """模拟上游网站：负载越高延迟越大，超过容量后按限流曲线返回 429"""
+
+    def __init__(self, name: str, capacity: float, base_latency: float = 0.05, curve: str = 'linear'):
+        """
+        参数:
+            name: 名称
+            capacity: 每秒可承受的请求数
+            base_latency: 空载时的响应延迟（秒）
+            curve: 限流曲线名称，见 THROTTLE_CURVES
+        """
+        self.name = name
+        self.capacity = capacity
+        self.base_latency = base_latency
+        self.curve = THROTTLE_CURVES[curve]
+        self.served = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._recent = deque()
+
+    def request(self, symbol: str) -> str:
+        now = time.monotonic()
+        with self._lock:
+            self._recent.append(now)
+            while self._recent and self._recent[0] < now - 1.0:
+                self._recent.popleft()
+            load = len(self._recent) / self.capacity
+        # 负载过半后延迟随负载上升
+        time.sleep(self.base_latency * (1 + 2 * max(load - 0.5, 0.0)))
+        if random.random() < self.curve(load):
+            with self._lock:
+                self.throttled += 1
+            raise ThrottledError("429 Too Many Requests")
+        with self._lock:
+            self.served += 1
+        return symbol
+
+
+def _simulate_site(server: SimulatedServer, codes: List[str], delay: float, adaptive: bool,
+                   max_concurrency: int, report: Dict[str, Dict]) -> None:
+    """用一个只含该网站数据源的引擎获取全部股票，记录耗时和并发变化"""
+    from stock_base_sources import SOURCE_REGISTRY, SourceEngine, StockSource, register_source
+
+    SOURCE_REGISTRY.pop(server.name, None)
+    register_source(StockSource(server.name, f'{server.name}_', server.name, server.request,
+                                lambda raw, code: {'value': raw}, fields=['value'],
+                                description=f'模拟网站，容量 {server.capacity:g}次/秒'))
+    engine = SourceEngine([server.name], delay=delay, max_delay=2.0, verbose=False,
+                          adaptive=adaptive, max_concurrency=max_concurrency, latency_target=4 * server.base_latency)
+    limiter = engine.limiters[server.name]
+    trajectory = []
+    failed = 0
+    start = time.perf_counter()
+    for i, (code, fields, errors) in enumerate(engine.run(codes), 1):
+        failed += bool(errors)
+        if adaptive and i % max(len(codes) // 10, 1) == 0:
+            trajectory.append(round(limiter.adaptive.limit, 2))
+    report[server.name] = {'elapsed': time.perf_counter() - start, 'failed': failed,
+                           'requests': engine.request_count, 'trajectory': trajectory}
+
+
+def simulate(stocks: int = 200, curve: str = 'linear', delay: float = 0.1, max_concurrency: int = 16) -> None:
+    """
+    两个容量不同的模拟网站，分别以固定间隔和自适应并发获取，对比吞吐量和限流次数
+
+    参数:
+        stocks: 每个网站模拟的股票数
+        curve: 限流曲线
+        delay: 基础请求间隔（秒）
+        max_concurrency: 自适应时每个网站的并发上限
+    """
+    codes = [f"{i:06d}" for i in range(1, stocks + 1)]
+    print(f"模拟 {stocks} 只股票, 限流曲线 {curve}, 基础间隔 {delay:g}秒, 自适应并发上限 {max_concurrency}")
+    for adaptive in (False, True):
+        servers = [SimulatedServer('sim_fast', capacity=40, curve=curve),
+                   SimulatedServer('sim_slow', capacity=8, curve=curve)]
+        # 各网站独立的引擎并行运行，互不牵制，分别观察各自的并发控制
+        report: Dict[str, Dict] = {}
+        threads = [threading.Thread(target=_simulate_site, args=(server, codes, delay, adaptive, max_concurrency, report))
+                   for server in servers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        print(f"\n{'自适应并发' if adaptive else '固定间隔'}:")
+        for server in servers:
+            result = report[server.name]
+            line = (f"  {server.name:<9} 容量 {server.capacity:>3g}次/秒  耗时 {result['elapsed']:>5.1f}秒  "
+                    f"{server.served / result['elapsed']:>5.1f}次/秒  限流 {server.throttled:>4}  失败 {result['failed']}")
+            if adaptive:
+                line += f"  并发变化 {result['trajectory']}"
+            print(line)
+
+
+def main():
+    """命令行入口: python stock_base_concurrency.py simulate [股票数] [限流曲线]"""
+    if len(sys.argv) > 1 and sys.argv[1] == "simulate":
+        stocks = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+        curve = sys.argv[3] if len(sys.argv) > 3 else 'linear'
+        simulate(stocks=stocks, curve=curve)
+    else:
+        print("使用方法: python stock_base_concurrency.py simulate [股票数] [限流曲线: "
+              f"{'/'.join(THROTTLE_CURVES)}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,8 @@
 # -*- coding: utf-8 -*-
 """
 股票基础信息统一获取接口
-结合cninfo和xqinfo两个数据源，提供统一的股票信息获取功能
+通过数据源插件注册表（stock_base_sources.py）获取股票信息，默认结合cninfo和xqinfo两个数据源，
+可选东方财富、实际控制人、上市相关等数据源
 """
 
 import sys
@@ -13,66 +14,44 @@ from datetime import datetime
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
-from stock_base_cninfo import get_stock_basic_info as get_cninfo_info
-# 导入xqinfo模块
-from stock_base_xqinfo import get_xueqiu_stock_info
+from stock_base_sources import SourceEngine
 
-def get_stock_info(stock_code):
+def get_stock_info(stock_code, sources=None, fields=None):
     """
     统一获取股票基础信息的接口
 
     参数:
         stock_code (str): 股票代码，如"600030"
+        sources (list|str): 数据源名称列表或逗号分隔的字符串，None为默认的cninfo和xqinfo，all为全部数据源
+        fields (list|str): 只获取这些字段（如 ["cninfo_industry", "xqinfo_staff_num"]），
+                           只请求提供这些字段的数据源，None为获取数据源的全部字段
 
     返回:
-        dict: 包含从两个数据源获取的股票信息的扁平字典
-              包含cninfo和xqinfo的所有字段，直接合并到一个字典中
+        dict: 包含从各数据源获取的股票信息的扁平字典
+              各数据源的字段以各自前缀（如cninfo_、xqinfo_）区分，直接合并到一个字典中
     """
 
     print(f"开始获取股票 {stock_code} 的基础信息...")
     print(f"获取时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("-" * 60)
 
-    result = {}
+    # 各数据源并发获取，单只股票不需要限速
+    engine = SourceEngine(sources, delay=0, fields=fields)
+    print(f"正在从 {', '.join(engine.source_names)} 获取数据...")
+    result, errors = engine.fetch_stock(stock_code)
 
-    # 获取cninfo数据
-    print("正在从巨潮资讯(cninfo)获取数据...")
-    try:
-        en_info, cn_info = get_cninfo_info(stock_code)
-        if en_info:
-            result.update(en_info)
-            print("✓ cninfo数据获取成功")
+    for source in engine.sources:
+        if source.name in errors:
+            print(f"✗ {source.name}数据获取出错: {errors[source.name]}")
+        elif any(field.startswith(source.prefix) for field in result):
+            print(f"✓ {source.name}数据获取成功")
         else:
-            print("✗ cninfo数据获取失败")
-    except Exception as e:
-        print(f"✗ cninfo数据获取出错: {e}")
-
-    # 获取xqinfo数据
-    print("正在从雪球(xqinfo)获取数据...")
-    try:
-        xq_info = get_xqinfo_stock_info(stock_code)
-        if xq_info:
-            result.update(xq_info)
-            print("✓ xqinfo数据获取成功")
-        else:
-            print("✗ xqinfo数据获取失败")
-    except Exception as e:
-        print(f"✗ xqinfo数据获取出错: {e}")
+            print(f"✗ {source.name}数据获取失败")
 
     print("-" * 60)
 
     return result
 
-def get_xqinfo_stock_info(stock_code):
-    """
-    获取雪球股票信息的包装函数
-    """
-    try:
-        return get_xueqiu_stock_info(stock_code)
-    except ImportError as e:
-        print(f"导入stock_base_xqinfo模块失败: {e}")
-        return None
-
 
 def print_summary(result):
     """
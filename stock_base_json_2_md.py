@@ -5,9 +5,20 @@
 将 test_stock_base_info.json 转换为便于阅读的 Markdown 格式
 """
 
+import os
+import re
 import json
+import time
+import hashlib
+import argparse
 from datetime import datetime
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+
+from stock_base_md_split import stock_item_filename
+from stock_base_metrics import METRICS, MetricsExporter, default_metrics_files
+from stock_base_normalize import INDUSTRY_CODE_FIELD, INDUSTRY_NAME_FIELD, NORMALIZED_FLAG, ms_to_date
 
 # 字段中文说明映射
 FIELD_NAMES = {
@@ -62,22 +73,25 @@ FIELD_NAMES = {
     'xqinfo_affiliate_industry': '所属行业',
 }
 
+# 清单文件版本号，渲染格式变化时递增以触发全量重新生成
+MANIFEST_VERSION = 2
+
+# 汇总文档中每只股票片段的标题行：## 股票名 (股票代码)
+SECTION_HEADER_PATTERN = re.compile(r'^## .*\((\d+)\)$', re.MULTILINE)
+
 # 字段分组
 BASIC_FIELDS = ['code', 'name', 'market', 'update_time']
 CNINFO_FIELDS = [key for key in FIELD_NAMES.keys() if key.startswith('cninfo_')]
 XQINFO_FIELDS = [key for key in FIELD_NAMES.keys() if key.startswith('xqinfo_')]
 
 
-def timestamp_to_date(timestamp_ms):
-    """将Unix时间戳（毫秒）转换为日期字符串"""
-    if timestamp_ms is None:
-        return None
-    try:
-        timestamp_s = timestamp_ms / 1000
-        dt = datetime.fromtimestamp(timestamp_s)
-        return dt.strftime('%Y-%m-%d')
-    except:
+def timestamp_to_date(value):
+    """将Unix时间戳（毫秒）转换为北京时间日期字符串，已规范化的日期字符串原样输出"""
+    if value is None:
         return None
+    if isinstance(value, str):
+        return value
+    return ms_to_date(value)
 
 
 def format_capital(value):
@@ -94,6 +108,8 @@ def format_capital(value):
 
 def format_value(value):
     """格式化字段值"""
+    if isinstance(value, str):
+        return value
     if value is None:
         return '-'
     if isinstance(value, dict):
@@ -115,8 +131,129 @@ def format_dict(d):
     return ', '.join(f"{k}: {v}" for k, v in d.items())
 
 
+def _format_optional(value):
+    """格式化可选字段，值为None时不输出该字段"""
+    if value is None:
+        return None
+    return format_value(value)
+
+
+def _format_industry(industry):
+    """格式化雪球所属行业字段，如 银行 (BK0055)"""
+    if not industry or not isinstance(industry, dict):
+        return None
+    return f"{industry.get('ind_name', '')} ({industry.get('ind_code', '')})"
+
+
+NORMALIZED_REG_ASSET_LABEL = '注册资本(万元)'
+
+
+def _format_capital_wan(value):
+    """格式化规范化后以万元为单位的雪球注册资本，直接按万元输出，与巨潮资讯注册资本单位一致"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return f"{value:.2f}万元"
+    return str(value)
+
+
+def _format_flat_industry(stock_data):
+    """格式化规范化后展开的雪球所属行业字段"""
+    name = stock_data.get(INDUSTRY_NAME_FIELD)
+    code = stock_data.get(INDUSTRY_CODE_FIELD)
+    if name is None and code is None:
+        return None
+    return f"{name or ''} ({code or ''})"
+
+
+def compile_render_plan(normalized: bool = False):
+    """
+    根据字段分组编译渲染计划
+
+    特殊字段的格式化方式在编译时确定，渲染时不再逐字段查表和分支判断。
+    格式化函数返回None表示不输出该字段；普通字段的字符串值直接输出，不调用格式化函数。
+    字段名为None的条目以整条记录调用格式化函数，用于由多个字段组合输出的行。
+
+    参数:
+        normalized: 是否为规范化后的记录编译，注册资本单位和所属行业字段不同
+
+    返回:
+        List[Tuple[Tuple[str, str], List[Tuple[str, str, Callable, bool]]]]:
+            [((分组标题, 空行), [(字段名, 行前缀, 格式化函数, 是否普通字段), ...]), ...]
+    """
+    # 规范化后雪球注册资本以万元为单位
+    labels = {**FIELD_NAMES, 'xqinfo_reg_asset': NORMALIZED_REG_ASSET_LABEL} if normalized else FIELD_NAMES
+
+    def entry(field, formatter):
+        plain = formatter in (format_value, _format_optional)
+        return field, f"- **{labels.get(field, field)}**: ", formatter, plain
+
+    special_formatters = {
+        'xqinfo_established_date': timestamp_to_date,
+        'xqinfo_listed_date': timestamp_to_date,
+        'xqinfo_reg_asset': _format_capital_wan if normalized else format_capital,
+    }
+    # 基本字段的值为None时也输出（显示为-）
+    basic = [entry(field, format_value) for field in BASIC_FIELDS]
+    cninfo = [entry(field, _format_optional) for field in CNINFO_FIELDS]
+    # 所属行业字段放在雪球数据最后输出
+    xqinfo = [entry(field, special_formatters.get(field, _format_optional))
+              for field in XQINFO_FIELDS if field != 'xqinfo_affiliate_industry']
+    if normalized:
+        label = labels['xqinfo_affiliate_industry']
+        xqinfo.append((None, f"- **{label}**: ", _format_flat_industry, None))
+    else:
+        xqinfo.append(entry('xqinfo_affiliate_industry', _format_industry))
+
+    return [
+        (("### 基本信息", ""), basic),
+        (("### 巨潮资讯数据", ""), cninfo),
+        (("### 雪球数据", ""), xqinfo),
+    ]
+
+
+RENDER_PLAN = compile_render_plan()
+NORMALIZED_RENDER_PLAN = compile_render_plan(normalized=True)
+
+# 区分字段缺失与字段值为None
+_MISSING = object()
+
+
+def render_stock_md_into(buffer: List[str], stock_code, stock_data) -> None:
+    """按渲染计划将单个股票的Markdown行追加到buffer中"""
+    get = stock_data.get
+    append = buffer.append
+    append(f"## {get('name', '')} ({stock_code})")
+    append("")
+    plan = NORMALIZED_RENDER_PLAN if get(NORMALIZED_FLAG) else RENDER_PLAN
+    for heading, entries in plan:
+        buffer.extend(heading)
+        for field, prefix, formatter, plain in entries:
+            value = get(field, _MISSING)
+            if plain and value.__class__ is str:
+                append(prefix + value)
+            elif value is not _MISSING:
+                text = formatter(value)
+                if text is not None:
+                    append(prefix + text)
+            elif plain is None:
+                text = formatter(stock_data)
+                if text is not None:
+                    append(prefix + text)
+        append("")
+    append("---")
+    append("")
+
+
 def generate_stock_md(stock_code, stock_data):
     """生成单个股票的Markdown内容"""
+    buffer = []
+    render_stock_md_into(buffer, stock_code, stock_data)
+    return '\n'.join(buffer)
+
+
+def _generate_stock_md_reference(stock_code, stock_data):
+    """逐字段判断的原始渲染实现，仅用于基准测试和输出一致性校验"""
     md = []
     md.append(f"## {stock_data.get('name', '')} ({stock_code})")
     md.append("")
@@ -177,41 +314,163 @@ def generate_stock_md(stock_code, stock_data):
     return '\n'.join(md)
 
 
-def json_to_markdown(json_file, output_file):
-    """将JSON文件转换为Markdown文件"""
+def _render_chunk(items: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+    """在工作进程中渲染一组股票，按原顺序返回各股票的Markdown片段"""
+    return [generate_stock_md(code, stock_data) for code, stock_data in items]
+
+
+def _md_header(stock_count: int) -> List[str]:
+    """生成汇总文档的标题部分"""
+    return [
+        "# 股票基础信息汇总",
+        "",
+        f"本文档包含 {stock_count} 只股票的基础信息。",
+        "",
+        "---",
+        "",
+    ]
+
+
+def render_sections(codes: List[str], data: Dict[str, Dict[str, Any]], workers: int = 1,
+                    chunk_size: Optional[int] = None, show_progress: bool = True) -> List[str]:
+    """
+    按给定顺序渲染股票的Markdown片段
+
+    参数:
+        codes: 需要渲染的股票代码，结果与其顺序一致
+        data: 股票数据字典 {股票代码: 股票信息}
+        workers: 渲染进程数，1为单进程串行，None为使用全部CPU核心
+        chunk_size: 每个工作进程任务包含的股票数量，默认按进程数自动切分
+        show_progress: 是否打印处理进度
+
+    返回:
+        List[str]: 每只股票一段Markdown，多进程与串行结果逐字节一致
+    """
+    total = len(codes)
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1 or total < 2:
+        sections = []
+        for idx, code in enumerate(codes, 1):
+            if show_progress:
+                print(f"处理进度: {idx}/{total} - {code}")
+            sections.append(generate_stock_md(code, data[code]))
+        return sections
+
+    # 多进程模式：按代码顺序切块，各块渲染完成后按原顺序拼接
+    if not chunk_size:
+        chunk_size = max(1, -(-total // (workers * 4)))
+    chunks = [[(code, data[code]) for code in codes[start:start + chunk_size]]
+              for start in range(0, total, chunk_size)]
+
+    sections = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map按提交顺序返回结果，保证拼接顺序与串行一致
+        for chunk, rendered in zip(chunks, executor.map(_render_chunk, chunks)):
+            sections.extend(rendered)
+            if show_progress:
+                print(f"处理进度: {len(sections)}/{total} - {chunk[-1][0]}")
+    return sections
+
+
+def render_markdown(data: Dict[str, Dict[str, Any]], workers: int = 1,
+                    chunk_size: Optional[int] = None, show_progress: bool = True) -> str:
+    """
+    将股票数据渲染为完整的Markdown文本
+
+    参数:
+        data: 股票数据字典 {股票代码: 股票信息}
+        workers: 渲染进程数，1为单进程串行，None为使用全部CPU核心
+        chunk_size: 每个工作进程任务包含的股票数量，默认按进程数自动切分
+        show_progress: 是否打印处理进度
+
+    返回:
+        str: Markdown文本，多进程与串行输出逐字节一致
+    """
+    # 按股票代码排序
+    sorted_codes = sorted(data.keys())
+    workers = workers or os.cpu_count() or 1
+
+    if workers > 1:
+        sections = render_sections(sorted_codes, data, workers=workers,
+                                   chunk_size=chunk_size, show_progress=show_progress)
+        return '\n'.join(_md_header(len(data)) + sections)
+
+    # 串行模式：所有股票的行写入同一个缓冲区，最后只拼接一次
+    buffer = _md_header(len(data))
+    total = len(sorted_codes)
+    for idx, code in enumerate(sorted_codes, 1):
+        if show_progress:
+            print(f"处理进度: {idx}/{total} - {code}")
+        render_stock_md_into(buffer, code, data[code])
+    return '\n'.join(buffer)
+
+
+def write_stock_item(items_dir: str, stock_code: str, stock_data: Dict[str, Any], section: str) -> str:
+    """
+    将单只股票的Markdown片段写入 items_dir/{股票代码}_{股票名}.md
+
+    返回:
+        str: 写入的文件名
+    """
+    filename = stock_item_filename(stock_code, stock_data.get('name', ''))
+    with open(os.path.join(items_dir, filename), 'w', encoding='utf-8') as f:
+        f.write(section.strip())
+    return filename
+
+
+def json_to_markdown(json_file, output_file: Optional[str] = None, workers: int = 1,
+                     chunk_size: Optional[int] = None, items_dir: Optional[str] = None):
+    """
+    将JSON文件转换为Markdown文件
+
+    参数:
+        json_file: 股票基础信息JSON文件
+        output_file: 汇总Markdown文件，为None时不生成汇总文档
+        workers: 渲染进程数，1为单进程串行，None为使用全部CPU核心
+        chunk_size: 每个渲染任务包含的股票数量
+        items_dir: 单股Markdown文件目录，指定时直接按记录写出单股文件，
+                   无需再用stock_base_md_split拆分汇总文档
+    """
+    if not output_file and not items_dir:
+        print("错误: 汇总文档和单股文件目录至少需要指定一个")
+        return False
+
     print(f"正在读取 {json_file}...")
-    
+
     try:
         with open(json_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
-        
+
         print(f"成功读取 {len(data)} 只股票的数据")
-        
+
         # 生成Markdown内容
-        md_content = []
-        md_content.append("# 股票基础信息汇总")
-        md_content.append("")
-        md_content.append(f"本文档包含 {len(data)} 只股票的基础信息。")
-        md_content.append("")
-        md_content.append("---")
-        md_content.append("")
-        
-        # 按股票代码排序
+        print("正在生成Markdown内容..." if workers == 1 else f"正在生成Markdown内容（{workers or os.cpu_count()} 进程）...")
         sorted_codes = sorted(data.keys())
-        
-        print("正在生成Markdown内容...")
-        for idx, code in enumerate(sorted_codes, 1):
-            print(f"处理进度: {idx}/{len(sorted_codes)} - {code}")
-            md_content.append(generate_stock_md(code, data[code]))
-        
+        with METRICS.timer('render', mode='full'):
+            if items_dir:
+                sections = render_sections(sorted_codes, data, workers=workers, chunk_size=chunk_size)
+                content = '\n'.join(_md_header(len(data)) + sections)
+            else:
+                content = render_markdown(data, workers=workers, chunk_size=chunk_size)
+
         # 写入文件
-        print(f"正在写入文件 {output_file}...")
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(md_content))
-        
-        print(f"成功生成Markdown文件: {output_file}")
+        if output_file:
+            print(f"正在写入文件 {output_file}...")
+            with METRICS.timer('write_markdown', target='combined'), open(output_file, 'w', encoding='utf-8') as f:
+                f.write(content)
+            print(f"成功生成Markdown文件: {output_file}")
+
+        if items_dir:
+            print(f"正在写入单股文件到 {items_dir}...")
+            Path(items_dir).mkdir(parents=True, exist_ok=True)
+            with METRICS.timer('write_markdown', target='items'):
+                for code, section in zip(sorted_codes, sections):
+                    write_stock_item(items_dir, code, data[code], section)
+            print(f"成功生成 {len(sections)} 个单股文件: {items_dir}")
+
         return True
-        
+
     except FileNotFoundError:
         print(f"错误: 文件 {json_file} 不存在")
         return False
@@ -223,8 +482,282 @@ def json_to_markdown(json_file, output_file):
         return False
 
 
+def record_hash(stock_data: Dict[str, Any]) -> str:
+    """计算单只股票记录的内容哈希，字段顺序不影响结果"""
+    payload = json.dumps(stock_data, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def default_manifest_file(output_file: str) -> str:
+    """根据汇总文档路径推导清单文件路径，如 data/stock_base_info_manifest.json"""
+    return os.path.splitext(output_file)[0] + "_manifest.json"
+
+
+def load_manifest(manifest_file: str) -> Dict[str, Dict[str, str]]:
+    """
+    加载渲染清单
+
+    返回:
+        Dict[str, Dict[str, str]]: {股票代码: {"hash": 内容哈希, "file": 单股文件名}}，
+        清单不存在或版本不一致时返回空字典
+    """
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != MANIFEST_VERSION:
+            print(f"清单版本不一致，将全量重新生成: {manifest_file}")
+            return {}
+        return manifest.get('stocks', {})
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"加载清单文件失败，将全量重新生成: {e}")
+        return {}
+
+
+def save_manifest(manifest_file: str, stocks: Dict[str, Dict[str, str]]) -> None:
+    """保存渲染清单"""
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'stocks': stocks,
+    }
+    tmp_file = manifest_file + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, manifest_file)
+
+
+def read_md_sections(md_file: str) -> Dict[str, str]:
+    """
+    从已生成的汇总文档中读取每只股票的Markdown片段
+
+    返回:
+        Dict[str, str]: {股票代码: 片段内容}，与generate_stock_md的输出一致
+    """
+    try:
+        with open(md_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except FileNotFoundError:
+        return {}
+
+    sections = {}
+    headers = list(SECTION_HEADER_PATTERN.finditer(content))
+    for idx, match in enumerate(headers):
+        if idx + 1 < len(headers):
+            # 片段之间以一个换行符连接
+            end = headers[idx + 1].start() - 1
+        else:
+            end = len(content)
+        sections[match.group(1)] = content[match.start():end]
+    return sections
+
+
+def json_to_markdown_incremental(json_file: str, output_file: str, items_dir: str,
+                                 manifest_file: Optional[str] = None, workers: int = 1,
+                                 write_combined: bool = True) -> bool:
+    """
+    按记录内容哈希增量生成汇总文档和单股文件
+
+    只重新渲染内容哈希发生变化的股票，写入对应的单股文件，并删除已退市股票的文件；
+    未变化的股票直接复用上次生成的汇总文档片段。
+
+    参数:
+        json_file: 股票基础信息JSON文件
+        output_file: 汇总Markdown文件
+        items_dir: 单股Markdown文件目录
+        manifest_file: 清单文件路径，默认与汇总文档同目录
+        workers: 渲染进程数
+        write_combined: 是否生成汇总文档，为False时只维护单股文件
+
+    返回:
+        bool: 是否成功
+    """
+    manifest_file = manifest_file or default_manifest_file(output_file)
+    print(f"正在读取 {json_file}...")
+
+    try:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        print(f"成功读取 {len(data)} 只股票的数据")
+
+        old_manifest = load_manifest(manifest_file)
+        hashes = {code: record_hash(stock_data) for code, stock_data in data.items()}
+
+        # 汇总文档缺失时其中的片段无法复用，全部视为已变化
+        old_sections = read_md_sections(output_file) if old_manifest and write_combined else {}
+        changed_codes = sorted(
+            code for code, digest in hashes.items()
+            if old_manifest.get(code, {}).get('hash') != digest
+            or (write_combined and code not in old_sections)
+            or not os.path.exists(os.path.join(items_dir, old_manifest[code]['file']))
+        )
+        removed_codes = sorted(set(old_manifest) - set(data))
+
+        print(f"内容变化: {len(changed_codes)} 只, 已移除: {len(removed_codes)} 只, "
+              f"未变化: {len(data) - len(changed_codes)} 只")
+
+        if not changed_codes and not removed_codes:
+            print("✓ 没有需要更新的内容")
+            return True
+
+        Path(items_dir).mkdir(parents=True, exist_ok=True)
+        with METRICS.timer('render', mode='incremental'):
+            rendered = dict(zip(changed_codes, render_sections(changed_codes, data, workers=workers,
+                                                               show_progress=False)))
+
+        # 写入变化的单股文件，股票更名时删除旧文件
+        new_manifest = {}
+        for code in sorted(data):
+            old_entry = old_manifest.get(code)
+            if code not in rendered:
+                new_manifest[code] = old_entry
+                continue
+            filename = write_stock_item(items_dir, code, data[code], rendered[code])
+            if old_entry and old_entry['file'] != filename:
+                _remove_file(os.path.join(items_dir, old_entry['file']))
+            new_manifest[code] = {'hash': hashes[code], 'file': filename}
+        print(f"✓ 已更新 {len(rendered)} 个单股文件")
+
+        # 删除已消失股票的文件
+        for code in removed_codes:
+            _remove_file(os.path.join(items_dir, old_manifest[code]['file']))
+        if removed_codes:
+            print(f"✓ 已删除 {len(removed_codes)} 个单股文件")
+
+        # 重新拼接汇总文档，未变化的片段直接复用
+        if write_combined:
+            sections = [rendered[code] if code in rendered else old_sections[code] for code in sorted(data)]
+            with METRICS.timer('write_markdown', target='combined'), open(output_file, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(_md_header(len(data)) + sections))
+            print(f"✓ 已更新汇总文档: {output_file}")
+
+        save_manifest(manifest_file, new_manifest)
+        return True
+
+    except FileNotFoundError:
+        print(f"错误: 文件 {json_file} 不存在")
+        return False
+    except json.JSONDecodeError as e:
+        print(f"错误: JSON格式错误 - {e}")
+        return False
+    except Exception as e:
+        print(f"错误: {e}")
+        return False
+
+
+def _remove_file(file_path: str) -> None:
+    """删除文件，文件不存在时忽略"""
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
+
+
+def build_benchmark_data(sample_file: str, size: int) -> Dict[str, Dict[str, Any]]:
+    """以样例JSON中的股票为模板，构造指定数量的基准测试数据"""
+    with open(sample_file, 'r', encoding='utf-8') as f:
+        samples = list(json.load(f).values())
+
+    data = {}
+    for i in range(size):
+        code = f"{i:06d}"
+        data[code] = {**samples[i % len(samples)], 'code': code}
+    return data
+
+
+def benchmark_render(sample_file: str = "test_stock_base_info.json",
+                     sizes: Tuple[int, ...] = (5000, 50000),
+                     worker_counts: Optional[List[int]] = None) -> None:
+    """
+    对比串行与多进程渲染耗时
+
+    参数:
+        sample_file: 作为模板的样例JSON文件
+        sizes: 参与测试的股票数量
+        worker_counts: 参与测试的进程数，默认为1、2、4...直至CPU核心数
+    """
+    cpu_count = os.cpu_count() or 1
+    if not worker_counts:
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= cpu_count:
+            worker_counts.append(worker_counts[-1] * 2)
+        if worker_counts[-1] != cpu_count:
+            worker_counts.append(cpu_count)
+
+    print(f"CPU核心数: {cpu_count}")
+    for size in sizes:
+        data = build_benchmark_data(sample_file, size)
+        print(f"\n股票数量: {size}")
+        baseline = None
+        reference = None
+        for workers in worker_counts:
+            start = time.perf_counter()
+            content = render_markdown(data, workers=workers, show_progress=False)
+            elapsed = time.perf_counter() - start
+            if baseline is None:
+                baseline, reference = elapsed, content
+            identical = "一致" if content == reference else "不一致"
+            print(f"  进程数 {workers:>2}: {elapsed:.3f}秒  加速比 {baseline / elapsed:.2f}x  输出{identical}")
+
+
+def benchmark_render_plan(sample_file: str = "test_stock_base_info.json", size: int = 5440,
+                          rounds: int = 5) -> None:
+    """
+    对比逐字段判断的原始实现与渲染计划的单条记录耗时
+
+    参数:
+        sample_file: 作为模板的样例JSON文件
+        size: 构造的股票数量，默认与全量数据规模一致
+        rounds: 重复次数，取最短耗时
+    """
+    data = build_benchmark_data(sample_file, size)
+    items = sorted(data.items())
+
+    mismatched = [code for code, stock_data in items
+                  if generate_stock_md(code, stock_data) != _generate_stock_md_reference(code, stock_data)]
+    print(f"股票数量: {size}, 输出不一致: {len(mismatched)} 只")
+
+    def measure(render):
+        best = None
+        for _ in range(rounds):
+            start = time.perf_counter()
+            render()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    reference = measure(lambda: '\n'.join(_generate_stock_md_reference(code, d) for code, d in items))
+    plan = measure(lambda: '\n'.join(generate_stock_md(code, d) for code, d in items))
+    single = measure(lambda: render_markdown(data, show_progress=False))
+
+    for label, elapsed in (("原始实现", reference), ("渲染计划", plan), ("渲染计划+单一缓冲区", single)):
+        print(f"  {label}: 总计 {elapsed:.3f}秒, 单条 {elapsed / size * 1e6:.1f}微秒, "
+              f"加速比 {reference / elapsed:.2f}x")
+
+
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="股票基础信息JSON转Markdown工具")
+    parser.add_argument("command", nargs="?", choices=["bench", "bench-plan"],
+                        help="bench: 串行与多进程渲染基准测试; bench-plan: 渲染计划单条记录基准测试")
+    parser.add_argument("--workers", type=int, default=1, help="渲染进程数，0表示使用全部CPU核心（默认1）")
+    parser.add_argument("--chunk-size", type=int, default=None, help="每个渲染任务包含的股票数量")
+    parser.add_argument("--incremental", action="store_true",
+                        help="按记录内容哈希增量生成汇总文档和data/items单股文件")
+    parser.add_argument("--items", action="store_true",
+                        help="直接按记录写出data/items单股文件，无需再运行stock_base_md_split")
+    parser.add_argument("--no-combined", action="store_true",
+                        help="不生成汇总文档data/stock_base_info.md（需配合--items或--incremental）")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        benchmark_render()
+        return
+    if args.command == "bench-plan":
+        benchmark_render_plan()
+        return
+
     print("=" * 60)
     print("股票基础信息JSON转Markdown工具")
     print("=" * 60)
@@ -233,9 +766,17 @@ def main():
     # 文件路径
     json_file = "stock_base_info.json"
     output_file = "./data/stock_base_info.md"
-    
-    # 执行转换
-    json_to_markdown(json_file, output_file)
+    items_dir = "./data/items"
+
+    # 执行转换，结束后导出各阶段耗时
+    with MetricsExporter(*default_metrics_files(json_file, 'render'), interval=0):
+        if args.incremental:
+            json_to_markdown_incremental(json_file, output_file, items_dir, workers=args.workers or None,
+                                         write_combined=not args.no_combined)
+        else:
+            json_to_markdown(json_file, None if args.no_combined else output_file,
+                             workers=args.workers or None, chunk_size=args.chunk_size,
+                             items_dir=items_dir if args.items else None)
     
     print()
     print("=" * 60)
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+股票简称模糊查找
+对简称、曾用简称、公司全称、股票代码和拼音首字母预先建立查找结构，
+支持精确匹配、前缀匹配、子串匹配和基于二元组重合度的模糊匹配，返回按得分排序的候选股票。
+安装pypinyin时使用其拼音数据，未安装时按GB2312一级汉字的拼音排序推算首字母
+"""
+
+import re
+import sys
+import json
+import time
+import bisect
+import heapq
+import unicodedata
+from itertools import product
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    from pypinyin import Style, lazy_pinyin, pinyin
+except ImportError:
+    pinyin = None
+
+# 参与查找的字段：字段名 -> 键类型
+NAME_FIELDS = [
+    ('name', 'short_name'),
+    ('cninfo_short_name', 'short_name'),
+    ('xqinfo_org_short_name_cn', 'short_name'),
+    ('xqinfo_org_name_cn', 'full_name'),
+    ('cninfo_name', 'full_name'),
+]
+
+# 各类键命中时的得分权重
+KIND_WEIGHTS = {
+    'code': 1.0,
+    'short_name': 1.0,
+    'initials': 0.9,
+    'full_pinyin': 0.85,
+    'full_name': 0.7,
+}
+
+# 各匹配方式的基础得分
+EXACT_SCORE = 100.0
+PREFIX_SCORE = 80.0
+SUBSTRING_SCORE = 60.0
+FUZZY_SCORE = 40.0
+# 模糊匹配要求的最低相似度（Dice系数）
+FUZZY_MIN_SIMILARITY = 0.5
+# 前缀匹配最多检查的键数量，避免单字母前缀扫描过多键
+PREFIX_SCAN_LIMIT = 2000
+
+# 去除空白、*号和常见标点，ST、*ST 统一为 st
+_STRIP_PATTERN = re.compile(r'[\s*·\-_.,，。、()（）\[\]【】"\'“”]+')
+
+# GB2312一级汉字按拼音排序，各首字母起始编码（I、U、V不作为声母开头）
+_GB2312_INITIALS = [
+    (0xB0A1, 'a'), (0xB0C5, 'b'), (0xB2C1, 'c'), (0xB4EE, 'd'), (0xB6EA, 'e'), (0xB7A2, 'f'),
+    (0xB8C1, 'g'), (0xB9FE, 'h'), (0xBBF7, 'j'), (0xBFA6, 'k'), (0xC0AC, 'l'), (0xC2E8, 'm'),
+    (0xC4C3, 'n'), (0xC5B6, 'o'), (0xC5BE, 'p'), (0xC6DA, 'q'), (0xC8BB, 'r'), (0xC8F6, 's'),
+    (0xCBFA, 't'), (0xCDDA, 'w'), (0xCEF4, 'x'), (0xD1B9, 'y'), (0xD4D1, 'z'),
+]
+_GB2312_STARTS = [start for start, _ in _GB2312_INITIALS]
+_GB2312_LEVEL1_END = 0xD7F9
+
+# 股票简称中常见的多音字及全部可能的首字母，GB2312排序只给出其中一个读音
+POLYPHONE_INITIALS = {
+    '行': 'hx', '长': 'cz', '重': 'zc', '厦': 'xs', '乐': 'ly', '藏': 'zc', '参': 'cs',
+    '传': 'cz', '调': 'td', '会': 'hk', '单': 'ds', '朝': 'cz', '都': 'dd', '发': 'f',
+    '广': 'g', '华': 'h', '信': 'x', '奇': 'qj', '泊': 'bp', '亳': 'b', '蚌': 'bb',
+    '莘': 'xs', '尉': 'wy', '番': 'pf', '六': 'll', '石': 'sd', '系': 'xj', '圳': 'z',
+    '沪': 'h', '鑫': 'x', '晟': 'sc', '昱': 'y', '祺': 'q', '骅': 'h', '珑': 'l', '铖': 'c',
+}
+
+# 单个名称生成的拼音首字母组合上限
+MAX_INITIAL_VARIANTS = 8
+
+
+def normalize_name(text: Any) -> str:
+    """
+    名称归一化：全角转半角、英文转小写、去除空白和标点
+
+    如 "万  科Ａ" -> "万科a"，"*ST国华" -> "st国华"
+    """
+    if text is None:
+        return ''
+    return _STRIP_PATTERN.sub('', unicodedata.normalize('NFKC', str(text)).lower())
+
+
+def _char_initials(char: str) -> str:
+    """单个字符可能的拼音首字母，非汉字原样返回"""
+    if not '一' <= char <= '鿿':
+        return char
+    if char in POLYPHONE_INITIALS:
+        return POLYPHONE_INITIALS[char]
+    try:
+        encoded = char.encode('gb2312')
+    except UnicodeEncodeError:
+        return ''
+    code = (encoded[0] << 8) | encoded[1]
+    if not _GB2312_STARTS[0] <= code < _GB2312_LEVEL1_END:
+        # GB2312二级汉字按部首排序，无法推算读音
+        return ''
+    return _GB2312_INITIALS[bisect.bisect_right(_GB2312_STARTS, code) - 1][1]
+
+
+def pinyin_initials(name: str) -> List[str]:
+    """
+    名称的拼音首字母，多音字展开为多个组合
+
+    如 "平安银行" -> ["payh", "payx"]
+    """
+    if pinyin is not None:
+        items = pinyin(name, style=Style.FIRST_LETTER, heteronym=True, errors=lambda chars: list(chars))
+        options = [''.join(dict.fromkeys(''.join(item))) for item in items]
+    else:
+        options = [_char_initials(char) for char in name]
+    if any(not option for option in options):
+        return []
+
+    variants = []
+    for combination in product(*options):
+        variants.append(''.join(combination))
+        if len(variants) >= MAX_INITIAL_VARIANTS:
+            break
+    return variants
+
+
+def full_pinyin(name: str) -> Optional[str]:
+    """名称的全拼，需要pypinyin"""
+    if pinyin is None:
+        return None
+    return ''.join(lazy_pinyin(name))
+
+
+def _bigrams(text: str) -> Set[str]:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class NameLookup:
+    """股票名称查找索引"""
+
+    def __init__(self, data: Dict[str, Dict[str, Any]]):
+        self.codes: List[str] = []
+        self.names: List[str] = []
+        # 全部查找键及其所属股票和类型，同一股票的相同键只保留权重最高的一个
+        self.keys: List[str] = []
+        self.key_stock: List[int] = []
+        self.key_kind: List[str] = []
+        self._build(data)
+
+    @classmethod
+    def from_json(cls, json_file: str = "stock_base_info.json") -> 'NameLookup':
+        """从JSON文件加载数据并建立索引"""
+        with open(json_file, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def from_code_names(cls, code_names: Dict[str, str]) -> 'NameLookup':
+        """从 {股票代码: 简称} 字典建立索引，如stock_code_name的输出"""
+        return cls({code: {'name': name} for code, name in code_names.items()})
+
+    def _stock_keys(self, code: str, stock_data: Dict[str, Any]) -> Dict[str, str]:
+        """单只股票的全部查找键 -> 键类型"""
+        keys: Dict[str, str] = {code: 'code'}
+
+        def add(key: str, kind: str) -> None:
+            if key and (key not in keys or KIND_WEIGHTS[kind] > KIND_WEIGHTS[keys[key]]):
+                keys[key] = kind
+
+        for field, kind in NAME_FIELDS:
+            value = stock_data.get(field)
+            if not value:
+                continue
+            # 雪球曾用简称以分号分隔，如 "深振业;振业集团"
+            for part in str(value).split(';'):
+                name = normalize_name(part)
+                add(name, kind)
+                if kind != 'short_name':
+                    continue
+                for initials in pinyin_initials(name):
+                    add(initials, 'initials')
+                add(full_pinyin(name), 'full_pinyin')
+        return keys
+
+    def _build(self, data: Dict[str, Dict[str, Any]]) -> None:
+        for code in sorted(data):
+            stock_data = data[code] or {}
+            stock_id = len(self.codes)
+            self.codes.append(code)
+            self.names.append(stock_data.get('name') or stock_data.get('cninfo_short_name') or '')
+            for key, kind in self._stock_keys(code, stock_data).items():
+                self.keys.append(key)
+                self.key_stock.append(stock_id)
+                self.key_kind.append(kind)
+
+        # 精确匹配：键 -> 键编号列表
+        self._exact: Dict[str, List[int]] = {}
+        # 子串和模糊匹配：二元组 -> 键编号集合；单字查询使用字符 -> 键编号集合
+        self._grams: Dict[str, Set[int]] = {}
+        self._chars: Dict[str, Set[int]] = {}
+        for key_id, key in enumerate(self.keys):
+            self._exact.setdefault(key, []).append(key_id)
+            for gram in _bigrams(key):
+                self._grams.setdefault(gram, set()).add(key_id)
+            for char in set(key):
+                self._chars.setdefault(char, set()).add(key_id)
+        # 前缀匹配：按键排序后二分查找区间
+        self._sorted_keys = sorted((key, key_id) for key_id, key in enumerate(self.keys))
+        self._sorted_strings = [key for key, _ in self._sorted_keys]
+
+    def _substring_candidates(self, query: str) -> Set[int]:
+        """包含查询串全部二元组的键，再由调用方逐个确认子串"""
+        if len(query) == 1:
+            return self._chars.get(query, set())
+        postings = sorted((self._grams.get(gram, set()) for gram in _bigrams(query)), key=len)
+        if not postings or not postings[0]:
+            return set()
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+            if not result:
+                break
+        return result
+
+    def search(self, query: str, limit: int = 10, fuzzy: bool = True) -> List[Dict[str, Any]]:
+        """
+        查找股票
+
+        参数:
+            query: 简称、全称片段、股票代码或拼音首字母，如 "万科"、"ST国华"、"payh"
+            limit: 返回候选数量
+            fuzzy: 精确、前缀、子串匹配结果不足时，是否按二元组重合度补充模糊匹配
+
+        返回:
+            List[Dict[str, Any]]: 按得分从高到低排列的候选，包含 code、name、score、matched、kind
+        """
+        q = normalize_name(query)
+        if not q:
+            return []
+
+        # 股票编号 -> (得分, 命中的键编号)
+        best: Dict[int, Tuple[float, int]] = {}
+
+        def consider(key_id: int, base_score: float) -> None:
+            key = self.keys[key_id]
+            # 键越短与查询越接近，作为同一匹配方式内的次要排序
+            score = base_score * KIND_WEIGHTS[self.key_kind[key_id]] + 10.0 * len(q) / len(key)
+            stock_id = self.key_stock[key_id]
+            if stock_id not in best or score > best[stock_id][0]:
+                best[stock_id] = (score, key_id)
+
+        for key_id in self._exact.get(q, []):
+            consider(key_id, EXACT_SCORE)
+
+        start = bisect.bisect_left(self._sorted_strings, q)
+        for position in range(start, min(start + PREFIX_SCAN_LIMIT, len(self._sorted_strings))):
+            key, key_id = self._sorted_keys[position]
+            if not key.startswith(q):
+                break
+            if key != q:
+                consider(key_id, PREFIX_SCORE)
+
+        for key_id in self._substring_candidates(q):
+            key = self.keys[key_id]
+            if q in key and not key.startswith(q):
+                consider(key_id, SUBSTRING_SCORE)
+
+        if fuzzy and len(best) < limit and len(q) >= 2:
+            self._fuzzy(q, consider)
+
+        top = heapq.nlargest(limit, best.items(), key=lambda item: (item[1][0], -item[0]))
+        return [{
+            'code': self.codes[stock_id],
+            'name': self.names[stock_id],
+            'score': round(score, 2),
+            'matched': self.keys[key_id],
+            'kind': self.key_kind[key_id],
+        } for stock_id, (score, key_id) in top]
+
+    def _fuzzy(self, q: str, consider) -> None:
+        """
+        匹配存在错别字或多余字符的查询
+
+        至少共有一个二元组的键作为候选，相似度取二元组与字符集合Dice系数的较大值：
+        四字简称错一个字会破坏三个二元组中的两个，但仍有四分之三的字符相同
+        """
+        query_grams = _bigrams(q)
+        query_chars = set(q)
+        overlaps: Dict[int, int] = {}
+        for gram in query_grams:
+            for key_id in self._grams.get(gram, ()):
+                overlaps[key_id] = overlaps.get(key_id, 0) + 1
+        for key_id, overlap in overlaps.items():
+            key = self.keys[key_id]
+            gram_similarity = 2 * overlap / (len(query_grams) + max(len(key) - 1, 1))
+            key_chars = set(key)
+            char_similarity = 2 * len(query_chars & key_chars) / (len(query_chars) + len(key_chars))
+            similarity = max(gram_similarity, char_similarity)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                consider(key_id, FUZZY_SCORE * similarity)
+
+
+def linear_search(data: Dict[str, Dict[str, Any]], query: str) -> List[str]:
+    """逐条比较简称是否包含查询串的参考实现，用于基准测试"""
+    q = normalize_name(query)
+    result = []
+    for code, stock_data in data.items():
+        for field in ('name', 'cninfo_short_name', 'xqinfo_org_short_name_cn'):
+            if q and q in normalize_name(stock_data.get(field)):
+                result.append(code)
+                break
+    return sorted(result)
+
+
+def check_lookup(sample_file: str = "test_stock_base_info.json") -> bool:
+    """用样例数据校验常见查找方式"""
+    lookup = NameLookup.from_json(sample_file)
+    cases = [
+        ('万科', '000002'), ('万  科Ａ', '000002'), ('ST国华', '000004'), ('*st国华', '000004'),
+        ('payh', '000001'), ('PAYH', '000001'), ('国华网安', '000004'), ('振业集团', '000006'),
+        ('深物业', '000011'), ('000001', '000001'), ('9209', '920964'), ('润农', '920964'),
+        ('锦波生物医药', '920982'), ('神洲高铁', '000008'),
+    ]
+    # 没有雪球数据的股票，只能经巨潮资讯的公司全称命中
+    full_name_cases = [('山西大禹', '920970'), ('杭州凯大', '920974')]
+    all_passed = True
+    for query, expected in cases + full_name_cases:
+        results = lookup.search(query, limit=5)
+        passed = bool(results) and results[0]['code'] == expected
+        if (query, expected) in full_name_cases:
+            passed = passed and results[0]['kind'] == 'full_name'
+        all_passed = all_passed and passed
+        top = results[0] if results else {}
+        print(f"  {'✓' if passed else '✗'} {query!r:>16} -> {top.get('code')} {top.get('name')} "
+              f"({top.get('kind')}: {top.get('matched')}, {top.get('score')})")
+    return all_passed
+
+
+def benchmark_lookup(sample_file: str = "test_stock_base_info.json", size: int = 50000,
+                     rounds: int = 200) -> None:
+    """随机生成简称测试索引查找与逐条扫描的耗时"""
+    import random
+
+    with open(sample_file, 'r', encoding='utf-8') as f:
+        sample = json.load(f)
+    alphabet = sorted({char for stock_data in sample.values()
+                       for char in normalize_name(stock_data.get('name')) if '一' <= char <= '鿿'})
+    rng = random.Random(0)
+    data = {f"{i:06d}": {'name': ''.join(rng.choice(alphabet) for _ in range(4))} for i in range(size)}
+
+    start = time.perf_counter()
+    lookup = NameLookup(data)
+    print(f"股票数量: {size}, 建立索引耗时 {time.perf_counter() - start:.2f}秒, 查找键 {len(lookup.keys)} 个")
+
+    names = [stock_data['name'] for stock_data in data.values()]
+    queries = [names[7][:2], names[123], lookup.keys[lookup.key_kind.index('initials')][:3], names[999][1:3]]
+    for query in queries:
+        begin = time.perf_counter()
+        for _ in range(rounds):
+            results = lookup.search(query)
+        index_time = (time.perf_counter() - begin) / rounds
+
+        begin = time.perf_counter()
+        scanned = linear_search(data, query)
+        scan_time = time.perf_counter() - begin
+        print(f"  {query!r}: 索引 {index_time * 1e6:.0f}微秒 (前{len(results)}条), "
+              f"逐条扫描 {scan_time * 1000:.1f}ms ({len(scanned)} 条), 加速比 {scan_time / index_time:.0f}x")
+
+
+def main():
+    """命令行入口"""
+    command = sys.argv[1] if len(sys.argv) > 1 else "help"
+    if command == "check":
+        print("拼音数据: " + ("pypinyin" if pinyin is not None else "GB2312一级汉字排序（未安装pypinyin）"))
+        print("全部通过" if check_lookup() else "存在失败项")
+    elif command == "bench":
+        benchmark_lookup()
+    elif command == "help":
+        print("使用方法:")
+        print("  python stock_base_lookup.py 万科        # 查找股票")
+        print("  python stock_base_lookup.py payh        # 拼音首字母查找")
+        print("  python stock_base_lookup.py check       # 用样例数据校验")
+        print("  python stock_base_lookup.py bench       # 性能测试")
+    else:
+        lookup = NameLookup.from_json()
+        for result in lookup.search(' '.join(sys.argv[1:])):
+            print(f"  {result['code']} {result['name']:<8} {result['score']:>6.2f}  "
+                  f"{result['kind']}: {result['matched']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,16 +8,73 @@
 
 import os
 import re
+import sys
+import time
+import tempfile
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 
 
-def split_stock_md_file(input_file, output_dir):
+# 股票信息块的标题行：## 股票名 (股票代码)
+SECTION_HEADER_PATTERN = re.compile(r'^##\s+([^(\n]+)\s*\((\d+)\)\s*$')
+
+
+def clean_filename(name):
+    """
+    清理文件名中的特殊字符，只保留字母、数字、中文
+
+    Args:
+        name (str): 原始名称
+
+    Returns:
+        str: 清理后的名称，其他特殊字符替换为下划线
+    """
+    result = ""
+    for char in name:
+        # 保留中文字符、英文字母、数字
+        if ('\u4e00' <= char <= '\u9fff' or  # 中文
+            'a' <= char <= 'z' or 'A' <= char <= 'Z' or  # 英文
+            '0' <= char <= '9'):  # 数字
+            result += char
+        # 特殊处理一些常见字符
+        elif char in 'ＡＢＣＤＥＦＧＨＩＪＫＬＭＮＯＰＱＲＳＴＵＶＷＸＹＺ':
+            result += char
+        elif char == '科':
+            result += char
+        elif char == 'Ａ':
+            result += 'A'
+        elif char == 'Ｂ':
+            result += 'B'
+        # 其他特殊字符替换为下划线
+        else:
+            result += '_'
+    return result
+
+
+def stock_item_filename(stock_code, stock_name):
+    """
+    生成单只股票文件名：股票代码_股票名.md
+
+    Args:
+        stock_code (str): 股票代码
+        stock_name (str): 股票名称
+
+    Returns:
+        str: 文件名
+    """
+    # 清理股票名称，去除多余空格和特殊字符
+    clean_name = stock_name.strip().replace(' ', '').replace('\n', '')
+    return f"{stock_code}_{clean_filename(clean_name)}.md"
+
+
+def split_stock_md_file(input_file, output_dir, show_progress=True):
     """
     拆分股票Markdown文件
 
     Args:
         input_file (str): 输入的股票汇总文件路径
         output_dir (str): 输出目录路径
+        show_progress (bool): 是否打印每个生成的文件
     """
     # 确保输出目录存在
     Path(output_dir).mkdir(parents=True, exist_ok=True)
@@ -40,52 +97,129 @@ def split_stock_md_file(input_file, output_dir):
     for match in matches:
         full_content, stock_name, stock_code = match
 
-        # 清理股票名称，去除多余空格和特殊字符
-        clean_name = stock_name.strip().replace(' ', '').replace('\n', '')
-
-        # 清理文件名中的特殊字符，只保留字母、数字、中文
-        import unicodedata
-        def clean_filename(name):
-            result = ""
-            for char in name:
-                # 保留中文字符、英文字母、数字
-                if ('\u4e00' <= char <= '\u9fff' or  # 中文
-                    'a' <= char <= 'z' or 'A' <= char <= 'Z' or  # 英文
-                    '0' <= char <= '9'):  # 数字
-                    result += char
-                # 特殊处理一些常见字符
-                elif char in 'ＡＢＣＤＥＦＧＨＩＪＫＬＭＮＯＰＱＲＳＴＵＶＷＸＹＺ':
-                    result += char
-                elif char == '科':
-                    result += char
-                elif char == 'Ａ':
-                    result += 'A'
-                elif char == 'Ｂ':
-                    result += 'B'
-                # 其他特殊字符替换为下划线
-                else:
-                    result += '_'
-            return result
-
-        clean_name = clean_filename(clean_name)
-
         # 生成文件名：股票代码_股票名.md
-        filename = f"{stock_code}_{clean_name}.md"
+        filename = stock_item_filename(stock_code, stock_name)
         filepath = os.path.join(output_dir, filename)
 
         # 写入文件
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(full_content.strip())
 
-        print(f"已生成: {filename}")
+        if show_progress:
+            print(f"已生成: {filename}")
         split_count += 1
 
     print(f"\n拆分完成！共生成 {split_count} 个文件")
     return split_count
 
 
+def _write_section(output_dir, stock_code, stock_name, lines):
+    """将一个股票信息块写入单独的文件，返回文件名"""
+    filename = stock_item_filename(stock_code, stock_name)
+    with open(os.path.join(output_dir, filename), 'w', encoding='utf-8') as f:
+        f.write(''.join(lines).strip())
+    return filename
+
+
+def split_stock_md_file_streaming(input_file, output_dir, show_progress=True):
+    """
+    流式拆分股票Markdown文件
+
+    逐行读取输入文件，遇到 ## 股票名 (股票代码) 标题行时将上一只股票的信息块写出，
+    内存占用只与单只股票的信息块大小有关，耗时与文件大小线性相关。
+    输出文件与split_stock_md_file一致。
+
+    Args:
+        input_file (str): 输入的股票汇总文件路径
+        output_dir (str): 输出目录路径
+        show_progress (bool): 是否打印每个生成的文件
+
+    Returns:
+        int: 生成的文件数量
+    """
+    # 确保输出目录存在
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    split_count = 0
+    current = None  # 当前股票的 (股票代码, 股票名)
+    lines = []
+
+    with open(input_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            match = SECTION_HEADER_PATTERN.match(line)
+            if match:
+                if current:
+                    filename = _write_section(output_dir, current[0], current[1], lines)
+                    split_count += 1
+                    if show_progress:
+                        print(f"已生成: {filename}")
+                current = (match.group(2), match.group(1))
+                lines = [line]
+            elif current:
+                lines.append(line)
+
+    if current:
+        filename = _write_section(output_dir, current[0], current[1], lines)
+        split_count += 1
+        if show_progress:
+            print(f"已生成: {filename}")
+
+    print(f"\n拆分完成！共生成 {split_count} 个文件")
+    return split_count
+
+
+def _run_split_benchmark(split_func, input_file, output_dir):
+    """在独立进程中执行一次拆分，返回 (耗时秒数, 峰值内存MB)"""
+    import resource
+
+    start = time.perf_counter()
+    split_func(input_file, output_dir, show_progress=False)
+    elapsed = time.perf_counter() - start
+
+    # Linux下ru_maxrss单位为KB，macOS下为字节
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    return elapsed, peak_mb
+
+
+def benchmark_split(sample_file="test_stock_base_info.json", sizes_mb=(100, 200)):
+    """
+    对比正则拆分与流式拆分的耗时和峰值内存
+
+    Args:
+        sample_file (str): 作为模板的样例JSON文件
+        sizes_mb (tuple): 构造的输入文件大小（MB）
+    """
+    # 延迟导入，避免与stock_base_json_2_md循环导入
+    from stock_base_json_2_md import build_benchmark_data, render_markdown
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size_mb in sizes_mb:
+            input_file = os.path.join(work_dir, f"bench_{size_mb}mb.md")
+            # 先按少量记录估算单只股票的平均大小，再构造目标大小的输入
+            probe = render_markdown(build_benchmark_data(sample_file, 200), show_progress=False)
+            stock_count = int(size_mb * 1024 * 1024 / (len(probe.encode('utf-8')) / 200))
+            with open(input_file, 'w', encoding='utf-8') as f:
+                f.write(render_markdown(build_benchmark_data(sample_file, stock_count), show_progress=False))
+            actual_mb = os.path.getsize(input_file) / (1024 * 1024)
+            print(f"\n输入文件: {actual_mb:.1f} MB, {stock_count} 只股票")
+
+            for label, split_func in (("正则拆分", split_stock_md_file),
+                                      ("流式拆分", split_stock_md_file_streaming)):
+                output_dir = os.path.join(work_dir, f"items_{size_mb}_{split_func.__name__}")
+                # 每次在新进程中运行，峰值内存互不影响
+                with ProcessPoolExecutor(max_workers=1) as executor:
+                    elapsed, peak_mb = executor.submit(_run_split_benchmark, split_func,
+                                                       input_file, output_dir).result()
+                print(f"  {label}: {elapsed:.2f}秒, {actual_mb / elapsed:.1f} MB/秒, 峰值内存 {peak_mb:.1f} MB")
+
+
 def main():
     """主函数"""
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        benchmark_split()
+        return
+
     # 文件路径配置
     current_dir = os.path.dirname(os.path.abspath(__file__))
     input_file = os.path.join(current_dir, "data", "stock_base_info.md")
@@ -98,7 +232,7 @@ def main():
 
     # 执行拆分
     try:
-        count = split_stock_md_file(input_file, output_dir)
+        count = split_stock_md_file_streaming(input_file, output_dir)
         print(f"\n成功拆分 {count} 只股票信息到 {output_dir}")
     except Exception as e:
         print(f"拆分过程中出现错误: {str(e)}")
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流水线各阶段的耗时统计
+在接口请求、结果提取、限速等待、记录合并、进度输出、断点保存、数据保存和Markdown渲染等阶段记录耗时直方图和事件计数，
+运行中定期、运行结束时导出为JSON摘要和Prometheus文本格式（可由 node_exporter 的 textfile 采集器读取），
+用于定位批量获取的时间花在哪里
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# 耗时直方图的桶上界（秒），覆盖从微秒级的字典合并到分钟级的全表请求
+BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+# Prometheus 指标名
+STAGE_METRIC = 'stock_base_stage_seconds'
+EVENT_METRIC = 'stock_base_events_total'
+DEFAULT_EXPORT_INTERVAL = 60.0
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """固定桶的耗时直方图，调用方负责加锁"""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """按桶内线性插值估计分位数，结果限制在实际的最小值和最大值之间"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                value = lower + (upper - lower) * (rank - seen) / count
+                return min(max(value, self.min), self.max)
+            seen += count
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'min': round(self.min, 6) if self.count else 0.0,
+            'p50': round(self.quantile(0.5), 6),
+            'p90': round(self.quantile(0.9), 6),
+            'p99': round(self.quantile(0.99), 6),
+            'max': round(self.max, 6),
+        }
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _prom_labels(pairs: Labels) -> str:
+    escaped = [(key, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for key, value in pairs]
+    return ','.join(f'{key}="{value}"' for key, value in escaped)
+
+
+class MetricsRegistry:
+    """线程安全的阶段耗时和事件计数登记表，按 (阶段或事件, 标签) 分别统计"""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.started = time.time()
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, **labels) -> None:
+        """记录一次阶段耗时（秒）"""
+        key = (stage, _labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def inc(self, event: str, amount: float = 1, **labels) -> None:
+        """事件计数加 amount"""
+        key = (event, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, stage: str, **labels) -> Iterator[None]:
+        """统计 with 块的耗时，块内抛出异常时同样记录"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, **labels)
+
+    def reset(self) -> None:
+        """清空统计，重新计时"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        JSON摘要
+
+        返回:
+            Dict: {"started", "exported", "elapsed", "stages": [{stage, labels, count, sum, mean, ...}],
+                   "events": [{event, labels, value}]}，阶段按总耗时从大到小排列
+        """
+        with self._lock:
+            stages = [{'stage': stage, 'labels': dict(labels), **histogram.summary()}
+                      for (stage, labels), histogram in self._histograms.items()]
+            events = [{'event': event, 'labels': dict(labels), 'value': value}
+                      for (event, labels), value in sorted(self._counters.items())]
+        now = time.time()
+        return {
+            'started': datetime.fromtimestamp(self.started).strftime('%Y-%m-%d %H:%M:%S'),
+            'exported': datetime.fromtimestamp(now).strftime('%Y-%m-%d %H:%M:%S'),
+            'elapsed': round(now - self.started, 3),
+            'stages': sorted(stages, key=lambda item: item['sum'], reverse=True),
+            'events': events,
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus 文本格式：阶段耗时为一个带 stage 标签的直方图，事件为一个带 event 标签的计数器"""
+        lines = [f'# HELP {STAGE_METRIC} 批量获取流水线各阶段耗时',
+                 f'# TYPE {STAGE_METRIC} histogram']
+        with self._lock:
+            for (stage, labels), histogram in sorted(self._histograms.items()):
+                pairs = (('stage', stage),) + labels
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{STAGE_METRIC}_bucket{{{_prom_labels(pairs + (("le", le),))}}} {cumulative}')
+                lines.append(f'{STAGE_METRIC}_sum{{{_prom_labels(pairs)}}} {histogram.sum:.6f}')
+                lines.append(f'{STAGE_METRIC}_count{{{_prom_labels(pairs)}}} {histogram.count}')
+            lines += [f'# HELP {EVENT_METRIC} 批量获取过程中的事件计数',
+                      f'# TYPE {EVENT_METRIC} counter']
+            for (event, labels), value in sorted(self._counters.items()):
+                lines.append(f'{EVENT_METRIC}{{{_prom_labels((("event", event),) + labels)}}} {value:g}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, json_file: str, prom_file: Optional[str] = None) -> bool:
+        """写出JSON摘要和Prometheus文本文件，先写临时文件再替换，读取方不会读到写了一半的文件"""
+        try:
+            outputs = [(json_file, json.dumps(self.snapshot(), ensure_ascii=False, indent=2))]
+            if prom_file:
+                outputs.append((prom_file, self.to_prometheus()))
+            for file_path, text in outputs:
+                tmp_file = file_path + ".tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.replace(tmp_file, file_path)
+            return True
+        except Exception as e:
+            print(f"✗ 导出耗时统计失败: {e}")
+            return False
+
+
+# 进程内共用的登记表，各模块直接记录到这里
+METRICS = MetricsRegistry()
+
+
+def default_metrics_files(output_file: str, job: str = 'crawl') -> Tuple[str, str]:
+    """根据数据文件路径推导耗时统计文件路径，如 stock_base_info_crawl_metrics.json / .prom"""
+    stem = f"{os.path.splitext(output_file)[0]}_{job}_metrics"
+    return stem + ".json", stem + ".prom"
+
+
+class MetricsExporter:
+    """运行期间按固定间隔在后台导出耗时统计，结束时再导出一次"""
+
+    def __init__(self, json_file: str, prom_file: Optional[str] = None,
+                 interval: float = DEFAULT_EXPORT_INTERVAL, registry: MetricsRegistry = METRICS):
+        """
+        参数:
+            json_file / prom_file: 导出文件
+            interval: 导出间隔（秒），0为只在结束时导出
+            registry: 登记表
+        """
+        self.json_file = json_file
+        self.prom_file = prom_file
+        self.interval = interval
+        self.registry = registry
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        if self.interval > 0:
+            self._thread = threading.Thread(target=self._loop, name="metrics-exporter", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.registry.export(self.json_file, self.prom_file):
+            print(f"✓ 耗时统计已导出到 {self.json_file}" + (f" 和 {self.prom_file}" if self.prom_file else ""))
+        return False
+
+    def _loop(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.registry.export(self.json_file, self.prom_file)
+
+
+def print_summary(summary: Dict[str, Any], limit: int = 20) -> None:
+    """打印JSON摘要中总耗时最多的阶段和全部事件计数"""
+    print(f"统计区间: {summary['started']} ~ {summary['exported']} ({summary['elapsed']:.1f}秒)")
+    print(f"  {'阶段':<22}{'次数':>8}{'总耗时(秒)':>12}{'平均':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'最大':>10}")
+    for item in summary['stages'][:limit]:
+        label = item['stage'] + ''.join(f" {value}" for value in item['labels'].values())
+        print(f"  {label:<24}{item['count']:>8}{item['sum']:>14.3f}{item['mean']:>12.4f}"
+              f"{item['p50']:>10.4f}{item['p90']:>10.4f}{item['p99']:>10.4f}{item['max']:>10.4f}")
+    if summary['events']:
+        print("  事件: " + ', '.join(f"{item['event']}" + ''.join(f" {value}" for value in item['labels'].values())
+                                   + f" {item['value']:g}" for item in summary['events']))
+
+
+def benchmark(rounds: int = 200000, threads: int = 4) -> None:
+    """测量计时的开销：单线程和多线程并发时每次 timer 的耗时"""
+    registry = MetricsRegistry()
+
+    def work(n: int) -> None:
+        for _ in range(n):
+            with registry.timer('bench', source='cninfo'):
+                pass
+
+    start = time.perf_counter()
+    work(rounds)
+    single = time.perf_counter() - start
+
+    workers = [threading.Thread(target=work, args=(rounds // threads,)) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    concurrent = time.perf_counter() - start
+
+    print(f"单线程: {rounds} 次, 每次 {single / rounds * 1e6:.2f}微秒")
+    print(f"{threads} 线程: {rounds // threads * threads} 次, 每次 {concurrent / (rounds // threads * threads) * 1e6:.2f}微秒")
+    print(f"  共记录 {sum(item['count'] for item in registry.snapshot()['stages'])} 次")
+
+
+def main():
+    """命令行入口: python stock_base_metrics.py show [统计文件] | bench"""
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        benchmark()
+    elif len(sys.argv) > 1 and sys.argv[1] == "show":
+        json_file = sys.argv[2] if len(sys.argv) > 2 else default_metrics_files("stock_base_info.json")[0]
+        with open(json_file, 'r', encoding='utf-8') as f:
+            print_summary(json.load(f))
+    else:
+        print("使用方法: python stock_base_metrics.py show [统计文件] | bench")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,17 @@
 # -*- coding: utf-8 -*-
 """
 A股股票基础信息批量获取脚本
-从stock_code_name.py获取所有股票代码，从stock_base_handle.py获取基础信息
+从stock_code_universe.py获取所有股票代码，通过数据源插件引擎（stock_base_sources.py）并发获取基础信息
 最终将所有股票信息保存到JSON文件
 """
 
 import sys
 import os
 import json
-import random
+import signal
+import threading
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import time
 import traceback
 
@@ -19,99 +20,14 @@ import traceback
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
-from stock_code_name import stock_info_a_code_name_json
-from stock_base_handle import get_stock_info
-
-
-class SmartDelayController:
-    """智能延迟控制器"""
-
-    def __init__(self, base_delay: float = 1.0, max_delay: float = 5.0):
-        self.base_delay = base_delay
-        self.max_delay = max_delay
-        self.current_delay = base_delay
-        self.consecutive_errors = 0
-        self.request_times = []
-
-    def get_delay(self) -> float:
-        """获取当前应该使用的延迟时间"""
-        # 添加随机变化，避免固定模式
-        random_factor = random.uniform(0.7, 1.3)
-        delay = min(self.current_delay * random_factor, self.max_delay)
-
-        # 如果最近请求过于频繁，适当增加延迟
-        if len(self.request_times) >= 3:
-            recent_requests = self.request_times[-3:]
-            if recent_requests[-1] - recent_requests[0] < 2:  # 3次请求在2秒内
-                delay *= 1.5
-
-        return max(delay, 0.1)  # 最小延迟0.1秒
-
-    def record_success(self):
-        """记录成功请求"""
-        self.consecutive_errors = 0
-        self.current_delay = max(self.current_delay * 0.95, self.base_delay)  # 逐渐恢复
-        self.request_times.append(time.time())
-        # 只保留最近的请求记录
-        self.request_times = self.request_times[-10:]
-
-    def record_error(self):
-        """记录错误请求"""
-        self.consecutive_errors += 1
-        # 连续错误时增加延迟
-        if self.consecutive_errors >= 2:
-            self.current_delay = min(self.current_delay * 1.5, self.max_delay)
-
-
-class SafeRequestHandler:
-    """安全的请求处理器"""
-
-    def __init__(self, max_retries: int = 3):
-        self.max_retries = max_retries
-
-    def safe_request(self, stock_code: str, delay_controller: SmartDelayController) -> Dict[str, Any]:
-        """安全地获取股票信息"""
-        last_error = None
-
-        for attempt in range(self.max_retries):
-            try:
-                print(f"  尝试获取 {stock_code} (第{attempt + 1}次)")
-
-                # 执行请求
-                stock_info = get_stock_info(stock_code)
-
-                if stock_info:
-                    delay_controller.record_success()
-                    return stock_info
-                else:
-                    # API返回空数据
-                    delay_controller.record_error()
-                    last_error = "API返回空数据"
-
-            except Exception as e:
-                last_error = str(e)
-                delay_controller.record_error()
-
-                # 检查是否是网络相关错误
-                if any(keyword in str(e).lower() for keyword in ['timeout', 'connection', 'network']):
-                    print(f"  网络错误，等待重试: {e}")
-                    time.sleep(2 * (attempt + 1))  # 网络错误时增加等待时间
-                else:
-                    print(f"  请求失败，等待重试: {e}")
-
-            # 如果不是最后一次尝试，则等待后重试
-            if attempt < self.max_retries - 1:
-                wait_time = delay_controller.get_delay()
-                print(f"  等待 {wait_time:.1f} 秒后重试...")
-                time.sleep(wait_time)
-
-        # 所有重试都失败了
-        error_info = {
-            'status': 'failed',
-            'error': last_error or '未知错误',
-            'attempts': self.max_retries
-        }
-        return error_info
+from stock_code_universe import get_stock_universe
+from stock_base_metrics import DEFAULT_EXPORT_INTERVAL, METRICS, MetricsExporter, default_metrics_files
+from stock_base_normalize import normalize_dataset
+from stock_base_sources import SourceEngine, print_sources, resolve_sources
+from stock_base_status import DEFAULT_ECHO_INTERVAL, ProgressTracker, StatusReporter, default_status_file
+from stock_base_reconcile import default_reconcile_file, run_reconciliation
+from stock_base_scheduler import CrawlQueue, default_queue_file, load_watchlist, schedule
+from stock_base_stats import compute_stats, default_stats_file, print_stats, write_stats_report
 
 
 class CheckpointManager:
@@ -150,7 +66,7 @@ class CheckpointManager:
                 'total_processed': self.total_processed,
                 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
-            with open(self.checkpoint_file, 'w', encoding='utf-8') as f:
+            with METRICS.timer('checkpoint_save'), open(self.checkpoint_file, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
             return True
         except Exception as e:
@@ -185,15 +101,89 @@ class CheckpointManager:
                 f"总计: {self.total_processed}")
 
 
+def parse_duration(text: str) -> float:
+    """
+    解析时间预算，支持秒数或带单位的时长，如 3600、90s、45m、1.5h
+
+    返回:
+        float: 秒数
+    """
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    text = text.strip().lower()
+    if text and text[-1] in units:
+        seconds = float(text[:-1]) * units[text[-1]]
+    else:
+        seconds = float(text)
+    if seconds <= 0:
+        raise ValueError(f"时间预算需大于0: {text}")
+    return seconds
+
+
+def base_stock_info(code: str, basic_info: Dict[str, Any]) -> Dict[str, Any]:
+    """股票记录的基本字段：代码、名称、市场、更新时间"""
+    return {
+        'code': code,
+        'name': basic_info.get('name', ''),
+        'market': basic_info.get('market', ''),
+        'update_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def format_errors(errors: Dict[str, str]) -> str:
+    """各数据源的错误信息合并为一条"""
+    return '; '.join(f"{name}: {error}" for name, error in errors.items()) or 'API返回空数据'
+
+
+def install_stop_signal(engine: SourceEngine):
+    """
+    收到SIGTERM时停止引擎：不再开始新的股票，在途请求完成后保存结果和断点
+
+    返回:
+        原信号处理函数，非主线程无法设置时为None
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return None
+
+    def handle_sigterm(signum, frame):
+        print(f"\n⏹️ 收到SIGTERM，等待在途请求完成后保存退出...")
+        engine.stop("收到SIGTERM")
+
+    return signal.signal(signal.SIGTERM, handle_sigterm)
+
+
 def get_all_stocks_base_info(batch_size: int = 10, delay: float = 2.0,
-                           test_mode: bool = False, checkpoint_file: str = None) -> Dict[str, Dict[str, Any]]:
+                           test_mode: bool = False, checkpoint_file: str = None,
+                           sources: Optional[List[str]] = None,
+                           max_workers: Optional[int] = None,
+                           fields: Optional[List[str]] = None,
+                           existing_file: Optional[str] = None,
+                           watchlist: Optional[List[str]] = None,
+                           time_budget: Optional[float] = None,
+                           request_budget: Optional[int] = None,
+                           adaptive: bool = False,
+                           timeouts: Optional[Dict[str, float]] = None,
+                           quiet: bool = False,
+                           status_file: Optional[str] = None,
+                           status_port: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
     """
     获取所有A股股票的基础信息
 
     参数:
         batch_size (int): 每批处理的股票数量，用于控制进度显示
-        delay (float): 每只股票之间的延迟时间（秒），避免请求过于频繁
+        delay (float): 同一网站相邻两次请求的间隔（秒），避免请求过于频繁
         test_mode (bool): 是否为测试模式，只获取前10+后10只股票
+        sources (List[str]): 数据源名称，None为默认的cninfo和xqinfo
+        max_workers (int): 并发线程数，默认为数据源数的2倍
+        fields (List[str]): 只获取这些字段，只请求提供这些字段的数据源，None为全部字段
+        existing_file (str): 已有数据集文件，未重新获取的股票保留其中的记录，并据此安排获取顺序
+        watchlist (List[str]): 关注列表，排在其余过期股票之前获取
+        time_budget (float): 时间预算（秒），用完后不再开始新的股票，在途请求完成后保存断点并返回
+        request_budget (int): 请求数预算（含重试），用完后同上；收到SIGTERM时同样处理
+        adaptive (bool): 是否按延迟和限流信号自适应调整每个网站的并发数
+        timeouts (Dict[str, float]): 超时设置 connect_timeout/read_timeout/call_timeout，未指定的用默认值
+        quiet (bool): 安静模式，不输出逐只股票的进度和批次统计，改为每30秒输出一行状态
+        status_file (str): 实时状态文件，运行中每5秒更新，None为不写
+        status_port (int): 实时状态HTTP接口端口，None为不启动
 
     返回:
         Dict[str, Dict[str, Any]]: 所有股票的基础信息，格式为 {股票代码: 股票信息字典}
@@ -210,7 +200,7 @@ def get_all_stocks_base_info(batch_size: int = 10, delay: float = 2.0,
 
     # 1. 获取所有股票代码
     print("步骤1: 获取所有A股股票代码列表...")
-    stock_codes = stock_info_a_code_name_json()
+    stock_codes = get_stock_universe()
 
     if not stock_codes:
         print("错误: 无法获取股票代码列表")
@@ -233,15 +223,27 @@ def get_all_stocks_base_info(batch_size: int = 10, delay: float = 2.0,
     print(f"\n步骤2: 初始化断点续传...")
     has_checkpoint = checkpoint_manager.load_checkpoint()
 
-    # 3. 初始化安全请求处理器和智能延迟控制器
-    print(f"\n步骤3: 初始化安全请求处理器...")
-    delay_controller = SmartDelayController(base_delay=delay, max_delay=10.0)
-    request_handler = SafeRequestHandler(max_retries=3)
-
-    print(f"  基础延迟: {delay}秒")
+    # 3. 初始化数据源获取引擎，每个网站一个智能延迟限速器
+    print(f"\n步骤3: 初始化数据源获取引擎...")
+    engine = SourceEngine(sources, delay=delay, max_delay=10.0, max_retries=3, max_workers=max_workers,
+                          fields=fields, time_budget=time_budget, request_budget=request_budget, adaptive=adaptive,
+                          verbose=not quiet, **(timeouts or {}))
+
+    print(f"  数据源: {', '.join(engine.source_names)}")
+    if fields:
+        print(f"  字段投影: {', '.join(fields)}")
+    print(f"  并发线程: {engine.max_workers}")
+    if adaptive:
+        print("  自适应并发: 每个网站按延迟和限流信号调整")
+    print(f"  基础延迟: {delay}秒（同一网站）")
     print(f"  最大延迟: 10.0秒")
     print(f"  最大重试次数: 3次")
+    print(f"  调用超时: {engine.call_timeout}秒（超时按临时失败重试）")
     print(f"  断点文件: {checkpoint_file}")
+    if time_budget:
+        print(f"  时间预算: {time_budget:g}秒")
+    if request_budget:
+        print(f"  请求预算: {request_budget}次")
 
     # 4. 筛选待处理的股票（排除已处理的）
     total_codes = set(stock_codes.keys())
@@ -260,89 +262,140 @@ def get_all_stocks_base_info(batch_size: int = 10, delay: float = 2.0,
         print("✓ 所有股票已处理完成")
         return {}
 
-    # 加载已存在的数据
+    # 加载已存在的数据，运行中断时尚未重新获取的股票保留原有记录
     existing_data = {}
-    if has_checkpoint:
+    if existing_file and os.path.exists(existing_file):
+        existing_data = load_stock_base_info_from_json(existing_file)
+    elif has_checkpoint:
         existing_data_file = "existing_data_temp.json"
         if os.path.exists(existing_data_file):
             existing_data = load_stock_base_info_from_json(existing_data_file)
 
+    # 按优先级排列：新上市、缺少数据源、关注列表、更新时间最旧，队列持久化供断点续传沿用
+    queue_file = default_queue_file(checkpoint_file)
+    pending_codes = schedule([code for code in filtered_stock_codes if not checkpoint_manager.is_processed(code)],
+                             existing_data, engine, queue_file, watchlist or [], resume=has_checkpoint)
+
     actual_total = len(filtered_stock_codes)
     print(f"\n步骤4: 开始处理剩余 {actual_total} 只股票...")
-    all_stock_info = existing_data
+    all_stock_info = dict(existing_data)
     success_count = 0
     fail_count = 0
     batch_processed = 0
 
-    try:
-        for i, (code, basic_info) in enumerate(filtered_stock_codes.items(), 1):
-            print(f"\n处理进度: {i}/{actual_total} ({i/actual_total*100:.1f}%) [总计: {len(checkpoint_manager.processed_codes)+i}]")
-            print(f"正在处理: {code} - {basic_info.get('name', '未知')} ({basic_info.get('market', 'unknown')})")
-
-            # 跳过已处理的股票（双重保险）
-            if checkpoint_manager.is_processed(code):
-                print(f"⏭️  跳过已处理的股票: {code}")
-                continue
-
-            # 使用安全请求处理器获取数据
-            stock_info_result = request_handler.safe_request(code, delay_controller)
-
-            # 合并基本信息
-            base_info = {
-                'code': code,
-                'name': basic_info.get('name', ''),
-                'market': basic_info.get('market', ''),
-                'update_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            }
-
-            if 'status' not in stock_info_result:  # 成功获取
-                combined_info = {**base_info, **stock_info_result}
-                all_stock_info[code] = combined_info
-                checkpoint_manager.mark_processed(code)
-                success_count += 1
-                batch_processed += 1
-                print(f"✓ 成功获取 {code} 的信息，共 {len(stock_info_result)} 个字段")
-            else:  # 获取失败
-                error_info = {**base_info, **stock_info_result}
-                all_stock_info[code] = error_info
-                checkpoint_manager.mark_failed(code)
-                fail_count += 1
-                batch_processed += 1
-                print(f"✗ 获取 {code} 信息失败: {stock_info_result.get('error', '未知错误')}")
-
-            # 每处理一定数量后保存断点
-            if batch_processed >= batch_size:
-                if checkpoint_manager.save_checkpoint():
-                    print(f"💾 已保存断点: {checkpoint_manager.get_summary()}")
-                    batch_processed = 0
-
-            # 显示批次统计
-            if i % batch_size == 0:
-                batch_time = datetime.now().strftime('%H:%M:%S')
-                current_delay = delay_controller.get_delay()
-                print(f"\n批次统计 ({i}/{actual_total}):")
-                print(f"  成功: {success_count}, 失败: {fail_count}")
-                print(f"  当前时间: {batch_time}")
-                print(f"  当前延迟: {current_delay:.2f}秒")
-                print(f"  剩余: {checkpoint_manager.get_remaining_count(total_codes)} 只")
-
-            # 智能延迟控制
-            if i < actual_total:  # 最后一只股票不需要延迟
-                wait_time = delay_controller.get_delay()
-                print(f"  等待 {wait_time:.1f} 秒...")
-                time.sleep(wait_time)
-
-    except KeyboardInterrupt:
-        print(f"\n\n⏹️ 用户中断了程序执行")
-        print(f"💾 正在保存断点...")
-        checkpoint_manager.save_checkpoint()
-        print(f"✓ 断点已保存，下次可以从这里继续")
-        print(f"  当前进度: {checkpoint_manager.get_summary()}")
-        print(f"  剩余股票: {checkpoint_manager.get_remaining_count(total_codes)} 只")
-        return all_stock_info
+    # 实时状态：状态文件和可选的HTTP接口，安静模式下定期输出一行状态代替逐只股票的输出
+    tracker = ProgressTracker(len(pending_codes), [source.name for source in engine.stock_sources], engine)
+    reporter = StatusReporter(tracker, status_file, port=status_port,
+                              echo_interval=DEFAULT_ECHO_INTERVAL if quiet else None)
+    previous_handler = install_stop_signal(engine)
+    with reporter:
+        try:
+            # 各股票的数据源请求并发进行，按优先级顺序提交、按完成顺序逐只返回
+            for i, (code, fields, errors) in enumerate(engine.run(pending_codes), 1):
+                basic_info = filtered_stock_codes[code]
+                if not quiet:
+                    with METRICS.timer('progress_output'):
+                        print(f"\n处理进度: {i}/{actual_total} ({i/actual_total*100:.1f}%) [总计: {len(checkpoint_manager.processed_codes)+i}]")
+                        print(f"已完成: {code} - {basic_info.get('name', '未知')} ({basic_info.get('market', 'unknown')})")
+
+                # 合并基本信息
+                merge_start = time.perf_counter()
+                base_info = base_stock_info(code, basic_info)
+
+                if fields or not engine.stock_sources:  # 至少一个数据源获取成功，或只选择了全表数据源
+                    combined_info = {**base_info, **fields}
+                    all_stock_info[code] = combined_info
+                    checkpoint_manager.mark_processed(code)
+                    success_count += 1
+                    batch_processed += 1
+                    METRICS.observe('merge', time.perf_counter() - merge_start)
+                    METRICS.inc('stock', outcome='success')
+                    tracker.record(code, True, errors)
+                    if not quiet:
+                        failed_sources = f"，失败数据源: {', '.join(errors)}" if errors else ""
+                        print(f"✓ 成功获取 {code} 的信息，共 {len(fields)} 个字段{failed_sources}")
+                elif engine.stop_reason:  # 停止后未重试完的股票不记为失败，留待下次运行
+                    METRICS.inc('stock', outcome='stopped')
+                    if not quiet:
+                        print(f"⏹️ {code} 停止时未获取成功，下次运行继续")
+                else:  # 获取失败
+                    error_message = format_errors(errors)
+                    error_info = {**base_info, 'status': 'failed', 'error': error_message, 'attempts': engine.max_retries}
+                    previous = existing_data.get(code)
+                    if previous and previous.get('status') not in ['failed', 'error']:
+                        # 保留上次获取成功的记录，更新时间不变，下次运行仍排在前面
+                        all_stock_info[code] = previous
+                    else:
+                        all_stock_info[code] = error_info
+                    checkpoint_manager.mark_failed(code)
+                    fail_count += 1
+                    batch_processed += 1
+                    METRICS.observe('merge', time.perf_counter() - merge_start)
+                    METRICS.inc('stock', outcome='failed')
+                    tracker.record(code, False, errors)
+                    if not quiet:
+                        print(f"✗ 获取 {code} 信息失败: {error_message}")
+
+                # 每处理一定数量后保存断点
+                if batch_processed >= batch_size:
+                    if checkpoint_manager.save_checkpoint():
+                        if not quiet:
+                            print(f"💾 已保存断点: {checkpoint_manager.get_summary()}")
+                        batch_processed = 0
+
+                # 显示批次统计，安静模式下由状态输出代替
+                if i % batch_size == 0 and not quiet:
+                    batch_start = time.perf_counter()
+                    batch_time = datetime.now().strftime('%H:%M:%S')
+                    print(f"\n批次统计 ({i}/{actual_total}):")
+                    print(f"  成功: {success_count}, 失败: {fail_count}")
+                    print(f"  当前时间: {batch_time}")
+                    delays = ', '.join(limiter.describe() for limiter in engine.limiters.values())
+                    print(f"  当前延迟: {delays}")
+                    print(f"  超时次数: {engine.describe_timeouts()}")
+                    print(f"  剩余: {checkpoint_manager.get_remaining_count(total_codes)} 只")
+                    METRICS.observe('progress_output', time.perf_counter() - batch_start)
+
+        except KeyboardInterrupt:
+            print(f"\n\n⏹️ 用户中断了程序执行")
+            print(f"💾 正在保存断点...")
+            checkpoint_manager.save_checkpoint()
+            print(f"✓ 断点已保存，下次可以从这里继续")
+            print(f"  当前进度: {checkpoint_manager.get_summary()}")
+            print(f"  剩余股票: {checkpoint_manager.get_remaining_count(total_codes)} 只")
+            with METRICS.timer('normalize'):
+                return normalize_dataset(all_stock_info)
+        finally:
+            if previous_handler is not None:
+                signal.signal(signal.SIGTERM, previous_handler)
+            tracker.finish(stopped=tracker.done < tracker.total)
 
     # 最终保存断点
     checkpoint_manager.save_checkpoint()
+    if engine.stop_reason:
+        # 提前停止：队列保留，下次运行按原顺序继续
+        remaining = [code for code in pending_codes if not checkpoint_manager.is_processed(code)]
+        print(f"\n⏹️ 提前停止: {engine.stop_reason}")
+        print(f"✓ 断点已保存，下次可以从这里继续")
+        print(f"  当前进度: {checkpoint_manager.get_summary()}")
+        print(f"  已发起请求: {engine.request_count} 次")
+        print(f"  超时次数: {engine.describe_timeouts()}")
+        print(f"  剩余股票: {len(remaining)} 只" + (f"，接下来依次为 {', '.join(remaining[:10])}" if remaining else ""))
+    else:
+        CrawlQueue(queue_file).clear()
+
+    # 全表数据源每次运行只请求一次，向量化关联到获取成功的股票；提前停止时留到下次运行
+    if engine.table_sources and engine.stop_reason:
+        print(f"\n步骤5: 已提前停止，跳过全表数据源 {', '.join(source.name for source in engine.table_sources)}")
+    elif engine.table_sources:
+        print(f"\n步骤5: 关联全表数据源 {', '.join(source.name for source in engine.table_sources)}...")
+        succeeded = {code: info for code, info in all_stock_info.items()
+                     if info.get('status') not in ['failed', 'error']}
+        for name, result in engine.merge_tables(succeeded).items():
+            if 'error' in result:
+                print(f"✗ {name} 失败: {result['error']}")
+            else:
+                print(f"✓ {name} 关联 {result['matched']} 只股票")
 
     # 合并已处理的数据
     final_processed = len(checkpoint_manager.processed_codes)
@@ -355,10 +408,13 @@ def get_all_stocks_base_info(batch_size: int = 10, delay: float = 2.0,
     print(f"成功: {success_count} 只")
     print(f"失败: {fail_count} 只")
     print(f"成功率: {success_count/total_stocks*100:.1f}%")
+    print(f"超时次数: {engine.describe_timeouts()}")
     print(f"结束时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 80)
 
-    return all_stock_info
+    # 按列批量规范化日期、单位和类型，保存和后续处理直接使用规范化后的值
+    with METRICS.timer('normalize'):
+        return normalize_dataset(all_stock_info)
 
 
 def save_stock_base_info_to_json(stock_data: Dict[str, Dict[str, Any]],
@@ -388,7 +444,7 @@ def save_stock_base_info_to_json(stock_data: Dict[str, Dict[str, Any]],
             os.makedirs(save_dir, exist_ok=True)
 
         # 保存到文件
-        with open(file_path, 'w', encoding='utf-8') as f:
+        with METRICS.timer('save_json'), open(file_path, 'w', encoding='utf-8') as f:
             json.dump(stock_data, f, ensure_ascii=False, indent=2)
 
         file_size = os.path.getsize(file_path) / (1024 * 1024)  # MB
@@ -441,22 +497,23 @@ def clear_checkpoint(checkpoint_file: str = "stock_progress_checkpoint.json"):
         else:
             print(f"✓ 断点文件不存在: {checkpoint_file}")
 
-        # 同时删除临时数据文件
-        temp_file = "existing_data_temp.json"
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
-            print(f"✓ 已删除临时数据文件: {temp_file}")
+        # 同时删除临时数据文件和获取队列
+        for temp_file in ["existing_data_temp.json", default_queue_file(checkpoint_file)]:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+                print(f"✓ 已删除临时数据文件: {temp_file}")
 
     except Exception as e:
         print(f"✗ 删除断点文件时出错: {e}")
 
 
-def generate_summary_report(stock_data: Dict[str, Dict[str, Any]]) -> None:
+def generate_summary_report(stock_data: Dict[str, Dict[str, Any]], report_file: Optional[str] = None) -> None:
     """
     生成数据摘要报告
 
     参数:
         stock_data: 股票基础信息数据
+        report_file: 统计报告JSON文件路径，为None时只打印摘要
     """
     if not stock_data:
         print("没有数据可分析")
@@ -466,154 +523,263 @@ def generate_summary_report(stock_data: Dict[str, Dict[str, Any]]) -> None:
     print("数据摘要报告")
     print("=" * 80)
 
-    total_stocks = len(stock_data)
-    success_stocks = len([s for s in stock_data.values() if s.get('status') != 'failed' and s.get('status') != 'error'])
-    failed_stocks = total_stocks - success_stocks
+    stats = compute_stats(stock_data)
+    print_stats(stats)
+    if report_file and write_stats_report(stats, report_file):
+        print(f"\n✓ 统计报告已保存到 {report_file}")
 
-    print(f"总股票数量: {total_stocks}")
-    print(f"成功获取: {success_stocks} ({success_stocks/total_stocks*100:.1f}%)")
-    print(f"获取失败: {failed_stocks} ({failed_stocks/total_stocks*100:.1f}%)")
-
-    # 市场分布
-    market_count = {}
-    for stock in stock_data.values():
-        market = stock.get('market', 'unknown')
-        market_count[market] = market_count.get(market, 0) + 1
+    print("=" * 80)
 
-    print(f"\n市场分布:")
-    for market, count in sorted(market_count.items()):
-        print(f"  {market}: {count} 只股票")
 
-    # 字段统计
-    if success_stocks > 0:
-        success_stock = next(s for s in stock_data.values() if s.get('status') != 'failed' and s.get('status') != 'error')
-        field_count = len(success_stock) - 4  # 减去 code, name, market, update_time
-        print(f"\n平均字段数量: {field_count}")
-        print(f"主要字段示例: {list(success_stock.keys())[:10]}")
+def projected_files(output_file: str) -> Tuple[str, str]:
+    """
+    字段投影运行的输出文件和断点文件，与完整数据集分开保存
 
-    print("=" * 80)
+    返回:
+        Tuple[str, str]: (如 stock_base_info_projected.json, stock_base_info_projected_checkpoint.json)
+    """
+    stem = os.path.splitext(output_file)[0] + "_projected"
+    return stem + ".json", stem + "_checkpoint.json"
 
 
-def test_stock_info():
+def test_stock_info(sources: Optional[List[str]] = None, max_workers: Optional[int] = None,
+                    fields: Optional[List[str]] = None, watchlist: Optional[List[str]] = None,
+                    time_budget: Optional[float] = None, request_budget: Optional[int] = None,
+                    adaptive: bool = False, timeouts: Optional[Dict[str, float]] = None,
+                    metrics_interval: float = DEFAULT_EXPORT_INTERVAL, quiet: bool = False,
+                    status_port: Optional[int] = None):
     """
     测试函数 - 仅获取前10+后10只股票信息
+
+    参数:
+        sources (List[str]): 数据源名称，None为默认数据源
+        max_workers (int): 并发线程数
+        fields (List[str]): 只获取这些字段，结果保存为投影数据集
+        watchlist (List[str]): 关注列表
+        time_budget (float): 时间预算（秒）
+        request_budget (int): 请求数预算
+        adaptive (bool): 是否自适应调整并发
+        timeouts (Dict[str, float]): 超时设置
+        metrics_interval (float): 耗时统计的导出间隔（秒），0为只在结束时导出
+        quiet (bool): 安静模式，不输出逐只股票的进度
+        status_port (int): 实时状态HTTP接口端口
     """
     print("测试股票基础信息获取功能")
     print("=" * 80)
 
     # 测试模式配置
     test_output_file = "test_stock_base_info.json"
+    checkpoint_file = None
     batch_size = 5   # 每5只股票显示一次进度
     delay = 0.5      # 测试时缩短请求间隔
+    if fields:
+        test_output_file, checkpoint_file = projected_files(test_output_file)
 
-    try:
-        # 获取测试股票基础信息（前10+后10只）
-        stock_data = get_all_stocks_base_info(batch_size=batch_size, delay=delay, test_mode=True)
-
-        if stock_data:
-            # 保存到测试JSON文件
-            print(f"\n正在保存测试数据到 {test_output_file}...")
-            if save_stock_base_info_to_json(stock_data, test_output_file):
-                # 生成测试摘要报告
-                generate_summary_report(stock_data)
-
-                print(f"\n测试完成！测试股票基础信息已保存到 {test_output_file}")
-
-                # 显示测试的股票代码列表
-                print(f"\n测试股票代码列表:")
-                for code, info in stock_data.items():
-                    status = "成功" if info.get('status') not in ['failed', 'error'] else "失败"
-                    print(f"  {code} - {info.get('name', '未知')} [{status}]")
+    # 运行中定期、结束时导出各阶段耗时统计
+    with MetricsExporter(*default_metrics_files(test_output_file), interval=metrics_interval):
+        try:
+            # 获取测试股票基础信息（前10+后10只）
+            stock_data = get_all_stocks_base_info(batch_size=batch_size, delay=delay, test_mode=True,
+                                                  checkpoint_file=checkpoint_file, sources=sources,
+                                                  max_workers=max_workers, fields=fields,
+                                                  existing_file=test_output_file, watchlist=watchlist,
+                                                  time_budget=time_budget, request_budget=request_budget,
+                                                  adaptive=adaptive, timeouts=timeouts, quiet=quiet,
+                                                  status_file=default_status_file(test_output_file),
+                                                  status_port=status_port)
+
+            if stock_data:
+                # 保存到测试JSON文件
+                print(f"\n正在保存测试数据到 {test_output_file}...")
+                if save_stock_base_info_to_json(stock_data, test_output_file):
+                    # 投影数据集只包含部分字段，不生成摘要和核对报告
+                    if not fields:
+                        # 生成测试摘要报告
+                        generate_summary_report(stock_data, default_stats_file(test_output_file))
+                        # 巨潮资讯与雪球交叉核对
+                        run_reconciliation(stock_data, default_reconcile_file(test_output_file))
+
+                    print(f"\n测试完成！测试股票基础信息已保存到 {test_output_file}")
+
+                    # 显示测试的股票代码列表
+                    print(f"\n测试股票代码列表:")
+                    for code, info in stock_data.items():
+                        status = "成功" if info.get('status') not in ['failed', 'error'] else "失败"
+                        print(f"  {code} - {info.get('name', '未知')} [{status}]")
 
+                else:
+                    print("\n测试保存文件失败")
             else:
-                print("\n测试保存文件失败")
-        else:
-            print("\n测试没有获取到任何股票信息")
+                print("\n测试没有获取到任何股票信息")
 
-    except KeyboardInterrupt:
-        print(f"\n\n用户中断了测试")
-    except Exception as e:
-        print(f"\n测试过程中发生错误: {e}")
-        import traceback
-        traceback.print_exc()
+        except KeyboardInterrupt:
+            print(f"\n\n用户中断了测试")
+        except Exception as e:
+            print(f"\n测试过程中发生错误: {e}")
+            import traceback
+            traceback.print_exc()
 
 
-def main():
+def main(sources: Optional[List[str]] = None, max_workers: Optional[int] = None,
+         fields: Optional[List[str]] = None, watchlist: Optional[List[str]] = None,
+         time_budget: Optional[float] = None, request_budget: Optional[int] = None,
+         adaptive: bool = False, timeouts: Optional[Dict[str, float]] = None,
+         metrics_interval: float = DEFAULT_EXPORT_INTERVAL, quiet: bool = False,
+         status_port: Optional[int] = None):
     """
     主函数 - 执行完整的股票信息获取和保存流程
+
+    参数:
+        sources (List[str]): 数据源名称，None为默认数据源
+        max_workers (int): 并发线程数
+        fields (List[str]): 只获取这些字段，结果保存为投影数据集 stock_base_info_projected.json
+        watchlist (List[str]): 关注列表
+        time_budget (float): 时间预算（秒）
+        request_budget (int): 请求数预算
+        adaptive (bool): 是否自适应调整并发
+        timeouts (Dict[str, float]): 超时设置
+        metrics_interval (float): 耗时统计的导出间隔（秒），0为只在结束时导出
+        quiet (bool): 安静模式，不输出逐只股票的进度
+        status_port (int): 实时状态HTTP接口端口
     """
     print("A股股票基础信息批量获取脚本")
     print("=" * 80)
 
     # 配置参数 - 生产环境使用更保守的设置
     output_file = "stock_base_info.json"
+    checkpoint_file = None
     batch_size = 10  # 每10只股票显示一次进度
     delay = 2.0     # 增加请求间隔到2秒，降低封禁风险
+    if fields:
+        output_file, checkpoint_file = projected_files(output_file)
 
-    try:
-        # 获取所有股票基础信息
-        stock_data = get_all_stocks_base_info(batch_size=batch_size, delay=delay)
-
-        if stock_data:
-            # 保存到JSON文件
-            print(f"\n正在保存数据到 {output_file}...")
-            if save_stock_base_info_to_json(stock_data, output_file):
-                # 生成摘要报告
-                generate_summary_report(stock_data)
-
-                print(f"\n任务完成！股票基础信息已保存到 {output_file}")
+    # 运行中定期、结束时导出各阶段耗时统计
+    with MetricsExporter(*default_metrics_files(output_file), interval=metrics_interval):
+        try:
+            # 获取所有股票基础信息
+            stock_data = get_all_stocks_base_info(batch_size=batch_size, delay=delay, checkpoint_file=checkpoint_file,
+                                                  sources=sources, max_workers=max_workers, fields=fields,
+                                                  existing_file=output_file, watchlist=watchlist,
+                                                  time_budget=time_budget, request_budget=request_budget,
+                                                  adaptive=adaptive, timeouts=timeouts, quiet=quiet,
+                                                  status_file=default_status_file(output_file),
+                                                  status_port=status_port)
+
+            if stock_data:
+                # 保存到JSON文件
+                print(f"\n正在保存数据到 {output_file}...")
+                if save_stock_base_info_to_json(stock_data, output_file):
+                    # 投影数据集只包含部分字段，不生成摘要和核对报告
+                    if not fields:
+                        # 生成摘要报告
+                        generate_summary_report(stock_data, default_stats_file(output_file))
+                        # 巨潮资讯与雪球交叉核对
+                        run_reconciliation(stock_data, default_reconcile_file(output_file))
+
+                    print(f"\n任务完成！股票基础信息已保存到 {output_file}")
+                else:
+                    print("\n保存文件失败")
             else:
-                print("\n保存文件失败")
-        else:
-            print("\n没有获取到任何股票信息")
+                print("\n没有获取到任何股票信息")
 
-    except KeyboardInterrupt:
-        print(f"\n\n用户中断了程序执行")
-    except Exception as e:
-        print(f"\n程序执行过程中发生错误: {e}")
-        import traceback
-        traceback.print_exc()
+        except KeyboardInterrupt:
+            print(f"\n\n用户中断了程序执行")
+        except Exception as e:
+            print(f"\n程序执行过程中发生错误: {e}")
+            import traceback
+            traceback.print_exc()
 
 
 if __name__ == "__main__":
-    import sys
-
-    # 检查命令行参数
-    if len(sys.argv) > 1:
-        command = sys.argv[1]
-
-        if command == "test":
-            # 运行测试模式
-            test_stock_info()
-        elif command == "clear":
-            # 清理断点文件
-            checkpoint_file = sys.argv[2] if len(sys.argv) > 2 else "stock_progress_checkpoint.json"
-            clear_checkpoint(checkpoint_file)
-            print("断点文件已清理，下次运行将从头开始")
-        elif command == "help":
-            # 显示帮助信息
-            print("A股股票基础信息批量获取脚本")
-            print("=" * 50)
-            print("使用方法:")
-            print("  python stock_base_multi_handle.py           # 完整模式（获取所有股票）")
-            print("  python stock_base_multi_handle.py test       # 测试模式（前10+后10只股票）")
-            print("  python stock_base_multi_handle.py clear      # 清理断点文件")
-            print("  python stock_base_multi_handle.py clear [文件名] # 清理指定断点文件")
-            print("  python stock_base_multi_handle.py help       # 显示帮助信息")
-            print("")
-            print("断点续传:")
-            print("  - 程序会自动保存进度到 stock_progress_checkpoint.json")
-            print("  - 如果中断，下次运行会自动从断点继续")
-            print("  - 使用 'clear' 命令可以重置进度")
-            print("")
-            print("安全特性:")
-            print("  - 智能延迟控制，避免API封禁")
-            print("  - 自动重试机制（最多3次）")
-            print("  - 断点续传，支持中断后继续")
-            print("  - 错误处理和状态记录")
-        else:
-            print(f"未知命令: {command}")
-            print("使用 'python stock_base_multi_handle.py help' 查看帮助信息")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="A股股票基础信息批量获取脚本", add_help=False)
+    parser.add_argument('command', nargs='?', default='run', choices=['run', 'test', 'clear', 'sources', 'help'])
+    parser.add_argument('checkpoint_file', nargs='?', default="stock_progress_checkpoint.json",
+                        help="clear命令要清理的断点文件")
+    parser.add_argument('--sources', help="逗号分隔的数据源名称，all为全部，默认cninfo,xqinfo")
+    parser.add_argument('--workers', type=int, help="并发线程数，默认为数据源数的2倍")
+    parser.add_argument('--watchlist', help="关注列表文件（每行一个股票代码）或逗号分隔的股票代码，排在其余过期股票之前获取")
+    parser.add_argument('--time-budget', help="时间预算，如 3600、45m、1.5h，用完后保存进度退出")
+    parser.add_argument('--request-budget', type=int, help="请求数预算（含重试），用完后保存进度退出")
+    parser.add_argument('--adaptive', action='store_true', help="按延迟和限流信号自适应调整每个网站的并发数")
+    parser.add_argument('--connect-timeout', type=float, help="HTTP连接超时（秒），默认5")
+    parser.add_argument('--read-timeout', type=float, help="HTTP读取超时（秒），默认20")
+    parser.add_argument('--call-timeout', type=float, help="单次接口调用总时限（秒），默认60")
+    parser.add_argument('--metrics-interval', type=float, default=DEFAULT_EXPORT_INTERVAL,
+                        help="各阶段耗时统计的导出间隔（秒），默认60，0为只在结束时导出")
+    parser.add_argument('--quiet', action='store_true', help="不输出逐只股票的进度，每30秒输出一行状态")
+    parser.add_argument('--status-port', type=int, help="在本机该端口提供实时状态HTTP接口（GET /status）")
+    parser.add_argument('--fields', help="逗号分隔的字段名，只请求这些字段需要的数据源，如 cninfo_industry,xqinfo_staff_num")
+    args = parser.parse_args()
+
+    try:
+        # 提前校验数据源名称和字段名
+        sources = [source.name for source in resolve_sources(args.sources)] if args.sources else None
+        fields = [field.strip() for field in args.fields.split(',') if field.strip()] if args.fields else None
+        if fields:
+            SourceEngine(sources, fields=fields)
+        time_budget = parse_duration(args.time_budget) if args.time_budget else None
+    except ValueError as e:
+        parser.error(str(e))
+    watchlist = load_watchlist(args.watchlist)
+    timeouts = {name: value for name, value in [('connect_timeout', args.connect_timeout),
+                                                ('read_timeout', args.read_timeout),
+                                                ('call_timeout', args.call_timeout)] if value is not None}
+
+    if args.command == "test":
+        # 运行测试模式
+        test_stock_info(sources=sources, max_workers=args.workers, fields=fields, watchlist=watchlist,
+                        time_budget=time_budget, request_budget=args.request_budget, adaptive=args.adaptive,
+                        timeouts=timeouts, metrics_interval=args.metrics_interval, quiet=args.quiet,
+                        status_port=args.status_port)
+    elif args.command == "clear":
+        # 清理断点文件
+        clear_checkpoint(args.checkpoint_file)
+        print("断点文件已清理，下次运行将从头开始")
+    elif args.command == "sources":
+        print_sources()
+    elif args.command == "help":
+        # 显示帮助信息
+        print("A股股票基础信息批量获取脚本")
+        print("=" * 50)
+        print("使用方法:")
+        print("  python stock_base_multi_handle.py           # 完整模式（获取所有股票）")
+        print("  python stock_base_multi_handle.py test       # 测试模式（前10+后10只股票）")
+        print("  python stock_base_multi_handle.py clear      # 清理断点文件")
+        print("  python stock_base_multi_handle.py clear [文件名] # 清理指定断点文件")
+        print("  python stock_base_multi_handle.py sources    # 列出可用数据源")
+        print("  python stock_base_multi_handle.py help       # 显示帮助信息")
+        print("")
+        print("选项:")
+        print("  --sources cninfo,xqinfo,em  # 选择数据源，all为全部数据源")
+        print("  --workers 8                 # 并发线程数")
+        print("  --fields cninfo_industry,xqinfo_staff_num  # 只获取指定字段，保存为 *_projected.json")
+        print("  --watchlist watchlist.txt   # 关注列表文件或逗号分隔的股票代码")
+        print("  --time-budget 45m           # 时间预算（秒，或带 s/m/h 单位）")
+        print("  --request-budget 5000       # 请求数预算（含重试）")
+        print("  --adaptive                  # 自适应并发（AIMD），上游健康时提高并发，限流时减半")
+        print("  --connect-timeout 5 --read-timeout 20 --call-timeout 60  # 连接/读取超时和单次调用总时限（秒）")
+        print("  --metrics-interval 60       # 各阶段耗时统计的导出间隔（秒），导出到 *_crawl_metrics.json/.prom")
+        print("  --quiet                     # 安静模式：不输出逐只股票的进度，每30秒输出一行状态")
+        print("  --status-port 8766          # 在本机提供实时状态HTTP接口，状态文件为 *_status.json")
+        print("")
+        print("断点续传:")
+        print("  - 程序会自动保存进度到 stock_progress_checkpoint.json")
+        print("  - 如果中断，下次运行会自动从断点继续")
+        print("  - 获取顺序: 新上市 > 缺少数据源或上次失败 > 关注列表 > 更新时间最旧")
+        print("  - 获取队列保存到 stock_progress_checkpoint_queue.json，续传时沿用原顺序")
+        print("  - 预算用完或收到SIGTERM时不再开始新的股票，在途请求完成后保存结果和断点")
+        print("  - 使用 'clear' 命令可以重置进度")
+        print("")
+        print("安全特性:")
+        print("  - 每个网站独立的智能延迟控制，不同网站并发请求，避免API封禁")
+        print("  - 每个数据源自动重试（最多3次）")
+        print("  - 断点续传，支持中断后继续")
+        print("  - 错误处理和状态记录")
     else:
         # 运行完整模式
-        main()
\ No newline at end of file
+        main(sources=sources, max_workers=args.workers, fields=fields, watchlist=watchlist,
+             time_budget=time_budget, request_budget=args.request_budget, adaptive=args.adaptive,
+             timeouts=timeouts, metrics_interval=args.metrics_interval, quiet=args.quiet,
+             status_port=args.status_port)
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+股票基础信息规范化
+数据获取完成后按列批量转换字段类型和单位：日期统一为ISO格式（北京时间），注册资本统一为万元，
+员工人数、高管人数为整数，雪球所属行业展开为行业代码和行业名称两个字段。
+规范化后的记录带有normalized标记，渲染、统计、导出只需格式化，不再各自换算
+"""
+
+import sys
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# 规范化标记字段及版本号，规范化规则变化时递增
+NORMALIZED_FLAG = 'normalized'
+NORMALIZED_VERSION = 1
+
+# 日期统一按北京时间换算，结果与运行环境的时区无关。
+# 雪球时间戳为北京时间零点，1986-1991年中国实行夏令时，需使用时区数据而非固定的UTC+8
+CHINA_TZ_NAME = 'Asia/Shanghai'
+try:
+    from zoneinfo import ZoneInfo
+    CHINA_TZ = ZoneInfo(CHINA_TZ_NAME)
+except Exception:
+    CHINA_TZ = timezone(timedelta(hours=8))
+DATE_FORMAT = '%Y-%m-%d'
+
+# 日期字段：巨潮资讯为日期字符串，雪球为毫秒时间戳
+DATE_FIELDS = ['cninfo_establish_date', 'cninfo_list_date', 'xqinfo_established_date', 'xqinfo_listed_date']
+# 注册资本字段 -> 换算为万元的除数
+CAPITAL_FIELDS = {'cninfo_capital': 1, 'xqinfo_reg_asset': 10000}
+INT_FIELDS = ['xqinfo_staff_num', 'xqinfo_executives_nums']
+FLOAT_FIELDS = ['xqinfo_issue_price']
+
+# 雪球所属行业 {'ind_code': ..., 'ind_name': ...} 展开后的字段
+INDUSTRY_FIELD = 'xqinfo_affiliate_industry'
+INDUSTRY_CODE_FIELD = 'xqinfo_ind_code'
+INDUSTRY_NAME_FIELD = 'xqinfo_ind_name'
+
+
+def is_normalized(stock_data: Dict[str, Any]) -> bool:
+    """记录是否已经规范化"""
+    return stock_data.get(NORMALIZED_FLAG) == NORMALIZED_VERSION
+
+
+def ms_to_date(timestamp_ms) -> Optional[str]:
+    """毫秒时间戳转换为北京时间日期字符串，无效值返回None"""
+    try:
+        return datetime.fromtimestamp(timestamp_ms / 1000, CHINA_TZ).strftime(DATE_FORMAT)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def _column(records: List[Dict[str, Any]], field: str) -> pd.Series:
+    """从记录列表中取出一个字段组成对象列，缺失为None"""
+    return pd.Series([record.get(field) for record in records], dtype=object)
+
+
+def _to_python(values: pd.Series) -> List[Any]:
+    """转换为Python原生类型列表，缺失值为None，便于JSON序列化"""
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def _iso_dates(datetimes: pd.Series) -> pd.Series:
+    """日期时间列格式化为 YYYY-MM-DD，缺失值为NaN；按天截断后由numpy输出ISO字符串，比strftime快得多"""
+    days = datetimes.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    return pd.Series(days.astype(str), index=datetimes.index, dtype=object).where(datetimes.notna())
+
+
+def normalize_dates(values: pd.Series) -> List[Optional[str]]:
+    """
+    日期列转换为 YYYY-MM-DD
+
+    数值按毫秒时间戳换算为北京时间日期；字符串取前10位按日期解析，无法解析的非空字符串原样保留
+    """
+    is_text = values.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+    numbers = pd.to_numeric(values.where(~is_text), errors='coerce')
+    local = (pd.to_datetime(numbers, unit='ms', utc=True, errors='coerce')
+             .dt.tz_convert(CHINA_TZ_NAME).dt.tz_localize(None))
+    from_ms = _iso_dates(local)
+
+    texts = values.where(is_text).str.strip().replace('', np.nan)
+    parsed = _iso_dates(pd.to_datetime(texts.str[:10], format=DATE_FORMAT, errors='coerce'))
+    from_text = parsed.where(parsed.notna(), texts)
+
+    return _to_python(from_ms.where(numbers.notna(), from_text))
+
+
+def normalize_numbers(values: pd.Series, divisor: float = 1, integer: bool = False) -> List[Any]:
+    """数值列转换为浮点数或整数，无法转换的值为None"""
+    numbers = pd.to_numeric(values, errors='coerce') / divisor
+    if integer:
+        return numbers.round().astype('Int64').to_numpy(dtype=object, na_value=None).tolist()
+    return _to_python(numbers)
+
+
+def normalize_dataset(stock_data: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    按列批量规范化股票数据，已规范化的记录原样保留
+
+    参数:
+        stock_data: 股票基础信息数据 {股票代码: 股票信息}
+
+    返回:
+        Dict[str, Dict[str, Any]]: 规范化后的新字典，股票顺序与输入一致
+    """
+    pending = [code for code, record in stock_data.items() if not is_normalized(record)]
+    if not pending:
+        return dict(stock_data)
+    records = [stock_data[code] for code in pending]
+
+    columns: Dict[str, List[Any]] = {}
+    for field in DATE_FIELDS:
+        columns[field] = normalize_dates(_column(records, field))
+    for field, divisor in CAPITAL_FIELDS.items():
+        columns[field] = normalize_numbers(_column(records, field), divisor)
+    for field in INT_FIELDS:
+        columns[field] = normalize_numbers(_column(records, field), integer=True)
+    for field in FLOAT_FIELDS:
+        columns[field] = normalize_numbers(_column(records, field))
+
+    industries = _column(records, INDUSTRY_FIELD)
+    columns[INDUSTRY_CODE_FIELD] = [value.get('ind_code') if isinstance(value, dict) else None for value in industries]
+    columns[INDUSTRY_NAME_FIELD] = [value.get('ind_name') if isinstance(value, dict) else None for value in industries]
+
+    result = dict(stock_data)
+    for position, (code, record) in enumerate(zip(pending, records)):
+        normalized = dict(record)
+        normalized.pop(INDUSTRY_FIELD, None)
+        for field, values in columns.items():
+            value = values[position]
+            # 原本缺失且规范化后仍为空的字段保持缺失
+            if value is not None or field in normalized:
+                normalized[field] = value
+        normalized[NORMALIZED_FLAG] = NORMALIZED_VERSION
+        result[code] = normalized
+    return result
+
+
+def normalize_record(stock_data: Dict[str, Any]) -> Dict[str, Any]:
+    """规范化单只股票记录"""
+    return normalize_dataset({'': stock_data})['']
+
+
+def _normalize_record_reference(stock_data: Dict[str, Any]) -> Dict[str, Any]:
+    """逐字段转换的参考实现，用于校验向量化结果和基准测试"""
+    if is_normalized(stock_data):
+        return dict(stock_data)
+
+    def date_value(value):
+        if value is None or isinstance(value, bool):
+            return None
+        if isinstance(value, (int, float)):
+            return ms_to_date(value) if value == value else None
+        text = str(value).strip()
+        if not text:
+            return None
+        try:
+            return datetime.strptime(text[:10], DATE_FORMAT).strftime(DATE_FORMAT)
+        except ValueError:
+            return text
+
+    def number_value(value, divisor=1, integer=False):
+        try:
+            number = float(value) / divisor
+        except (TypeError, ValueError):
+            return None
+        if number != number:
+            return None
+        return int(round(number)) if integer else number
+
+    normalized = dict(stock_data)
+    normalized.pop(INDUSTRY_FIELD, None)
+    converted = {}
+    for field in DATE_FIELDS:
+        converted[field] = date_value(stock_data.get(field))
+    for field, divisor in CAPITAL_FIELDS.items():
+        converted[field] = number_value(stock_data.get(field), divisor)
+    for field in INT_FIELDS:
+        converted[field] = number_value(stock_data.get(field), integer=True)
+    for field in FLOAT_FIELDS:
+        converted[field] = number_value(stock_data.get(field))
+    industry = stock_data.get(INDUSTRY_FIELD)
+    converted[INDUSTRY_CODE_FIELD] = industry.get('ind_code') if isinstance(industry, dict) else None
+    converted[INDUSTRY_NAME_FIELD] = industry.get('ind_name') if isinstance(industry, dict) else None
+
+    for field, value in converted.items():
+        if value is not None or field in normalized:
+            normalized[field] = value
+    normalized[NORMALIZED_FLAG] = NORMALIZED_VERSION
+    return normalized
+
+
+def check_normalize(sample_file: str = "test_stock_base_info.json") -> bool:
+    """
+    校验向量化规范化与逐字段参考实现一致，且规范化前后渲染的Markdown相同；
+    雪球注册资本规范化后按万元输出，该行单独校验
+    """
+    # 延迟导入，规范化模块本身不依赖渲染模块
+    from stock_base_json_2_md import FIELD_NAMES, NORMALIZED_REG_ASSET_LABEL, generate_stock_md
+
+    raw_label = f"- **{FIELD_NAMES['xqinfo_reg_asset']}**: "
+    wan_label = f"- **{NORMALIZED_REG_ASSET_LABEL}**: "
+
+    def same_markdown_except_capital(code, normalized_record, record):
+        normalized_lines = generate_stock_md(code, normalized_record).split('\n')
+        raw_lines = generate_stock_md(code, record).split('\n')
+        if len(normalized_lines) != len(raw_lines):
+            return False
+        capital = normalized_record.get('xqinfo_reg_asset')
+        for normalized_line, raw_line in zip(normalized_lines, raw_lines):
+            if normalized_line != raw_line and not (raw_line.startswith(raw_label)
+                                                    and normalized_line == f"{wan_label}{capital:.2f}万元"):
+                return False
+        return True
+
+    with open(sample_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    # 补充边界情况：空值、空字符串、无法解析的日期、字符串形式的数值。
+    # 无法解析的数值规范化后为空，该记录只校验规范化结果，不比较渲染输出
+    boundary_code = '999998'
+    data[boundary_code] = {'code': '999998', 'name': '边界样例', 'cninfo_list_date': '',
+                      'cninfo_establish_date': '未知', 'xqinfo_listed_date': None,
+                      'xqinfo_staff_num': '120', 'xqinfo_reg_asset': 'abc', 'xqinfo_affiliate_industry': {}}
+
+    normalized = normalize_dataset(data)
+    all_passed = True
+    for code, record in data.items():
+        reference = _normalize_record_reference(record)
+        same_values = json.dumps(normalized[code], sort_keys=True) == json.dumps(reference, sort_keys=True)
+        same_markdown = (code == boundary_code
+                         or same_markdown_except_capital(code, normalized[code], record))
+        passed = same_values and same_markdown
+        all_passed = all_passed and passed
+        if not passed:
+            print(f"  ✗ {code}: 参考实现{'一致' if same_values else '不一致'}, "
+                  f"渲染{'一致' if same_markdown else '不一致'}")
+
+    again = normalize_dataset(normalized)
+    if again != normalized:
+        print("  ✗ 重复规范化结果发生变化")
+        all_passed = False
+    print(f"  {'✓' if all_passed else '✗'} 共校验 {len(data)} 只股票")
+    return all_passed
+
+
+def benchmark_normalize(sample_file: str = "test_stock_base_info.json", size: int = 50000) -> None:
+    """对比逐条规范化与按列批量规范化的耗时"""
+    from stock_base_json_2_md import build_benchmark_data
+
+    data = build_benchmark_data(sample_file, size)
+
+    start = time.perf_counter()
+    reference = {code: _normalize_record_reference(record) for code, record in data.items()}
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    normalized = normalize_dataset(data)
+    vector_time = time.perf_counter() - start
+
+    identical = "一致" if normalized == reference else "不一致"
+    print(f"股票数量: {size}, 逐条 {loop_time:.2f}秒, 按列批量 {vector_time:.2f}秒, "
+          f"加速比 {loop_time / vector_time:.1f}x, 结果{identical}")
+
+
+def main():
+    """命令行入口：规范化已有的JSON文件"""
+    command = sys.argv[1] if len(sys.argv) > 1 else "help"
+    if command == "check":
+        print("全部通过" if check_normalize() else "存在失败项")
+    elif command == "bench":
+        benchmark_normalize()
+    elif command == "help":
+        print("使用方法:")
+        print("  python stock_base_normalize.py stock_base_info.json [输出文件]  # 规范化已有数据文件")
+        print("  python stock_base_normalize.py check                           # 校验")
+        print("  python stock_base_normalize.py bench                           # 性能测试")
+    else:
+        input_file = command
+        output_file = sys.argv[2] if len(sys.argv) > 2 else input_file
+        with open(input_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        pending = sum(1 for record in data.values() if not is_normalized(record))
+        normalized = normalize_dataset(data)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(normalized, f, ensure_ascii=False, indent=2)
+        print(f"✓ 已规范化 {pending} 只股票（共 {len(data)} 只），保存到 {output_file}")
+
+
+if __name__ == "__main__":
+    main()
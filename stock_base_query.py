@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+股票基础信息内存查询接口
+一次加载stock_base_info.json，对代码、简称、行业、省份、市场、H股代码、公司分类建立哈希索引，
+组合条件查询时对各条件命中的代码集合求交集，不再逐条扫描全部股票
+"""
+
+import re
+import sys
+import json
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+# 表示字段有值（非空）的查询条件，如 where(h_code=ANY) 查询有H股的公司
+ANY = object()
+
+PROVINCE_SUFFIX_PATTERN = re.compile(r'(壮族自治区|回族自治区|维吾尔自治区|自治区|特别行政区|省|市)$')
+
+
+def _normalize_text(value: Any) -> Optional[str]:
+    """索引键统一为去除首尾空白的字符串，空值返回None"""
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def _normalize_province(value: Any) -> Optional[str]:
+    """省份去除省、市、自治区等后缀，广东省与广东视为同一省份"""
+    text = _normalize_text(value)
+    if text is None:
+        return None
+    return PROVINCE_SUFFIX_PATTERN.sub('', text) or text
+
+
+def _affiliate_industry_name(stock_data: Dict[str, Any]) -> Any:
+    """雪球所属行业名称，兼容规范化后展开的xqinfo_ind_name字段"""
+    industry = stock_data.get('xqinfo_affiliate_industry')
+    if isinstance(industry, dict):
+        return industry.get('ind_name')
+    return stock_data.get('xqinfo_ind_name')
+
+
+# 索引定义：索引名 -> (取值字段或取值函数列表, 索引键归一化函数)
+INDEX_FIELDS = {
+    'code': (['code'], _normalize_text),
+    'name': (['name', 'cninfo_short_name', 'xqinfo_org_short_name_cn'], _normalize_text),
+    'industry': (['cninfo_industry', _affiliate_industry_name], _normalize_text),
+    'province': (['xqinfo_provincial_name'], _normalize_province),
+    'market': (['market'], _normalize_text),
+    'h_code': (['cninfo_h_code'], _normalize_text),
+    'classi_name': (['xqinfo_classi_name'], _normalize_text),
+}
+
+
+class StockSelection:
+    """查询结果，可继续叠加条件"""
+
+    def __init__(self, query: 'StockQuery', codes: Set[str]):
+        self._query = query
+        self._codes = codes
+
+    def where(self, **criteria) -> 'StockSelection':
+        """叠加查询条件，与当前结果求交集"""
+        return StockSelection(self._query, self._query.match(criteria, self._codes))
+
+    def exclude(self, **criteria) -> 'StockSelection':
+        """排除满足条件的股票"""
+        return StockSelection(self._query, self._codes - self._query.match(criteria))
+
+    def codes(self) -> List[str]:
+        """按代码排序的股票代码列表"""
+        return sorted(self._codes)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """按代码排序的股票记录列表"""
+        return [self._query.data[code] for code in self.codes()]
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.records())
+
+
+class StockQuery:
+    """股票基础信息索引查询"""
+
+    def __init__(self, data: Dict[str, Dict[str, Any]]):
+        self.data = data
+        self.all_codes = set(data)
+        # 索引名 -> {索引键: 股票代码集合}
+        self.indexes: Dict[str, Dict[str, Set[str]]] = {name: {} for name in INDEX_FIELDS}
+        # 索引名 -> 该字段有值的股票代码集合
+        self.non_empty: Dict[str, Set[str]] = {name: set() for name in INDEX_FIELDS}
+        self._build_indexes()
+
+    @classmethod
+    def from_json(cls, json_file: str = "stock_base_info.json") -> 'StockQuery':
+        """从JSON文件加载数据并建立索引"""
+        with open(json_file, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _build_indexes(self) -> None:
+        """为每只股票建立全部索引"""
+        for code, stock_data in self.data.items():
+            for name, (getters, normalize) in INDEX_FIELDS.items():
+                index = self.indexes[name]
+                for getter in getters:
+                    value = getter(stock_data) if callable(getter) else stock_data.get(getter)
+                    key = normalize(value)
+                    if key is None:
+                        continue
+                    index.setdefault(key, set()).add(code)
+                    self.non_empty[name].add(code)
+
+    def lookup(self, index_name: str, value: Any) -> Set[str]:
+        """
+        查询单个索引
+
+        参数:
+            index_name: 索引名，见INDEX_FIELDS
+            value: 查询值；列表/元组/集合表示任一匹配，ANY表示字段有值
+
+        返回:
+            Set[str]: 命中的股票代码集合
+        """
+        if index_name not in self.indexes:
+            raise KeyError(f"未知的索引: {index_name}，可用索引: {list(INDEX_FIELDS)}")
+        if value is ANY:
+            return self.non_empty[index_name]
+
+        index = self.indexes[index_name]
+        normalize = INDEX_FIELDS[index_name][1]
+        if isinstance(value, (list, tuple, set, frozenset)):
+            result = set()
+            for item in value:
+                result |= index.get(normalize(item), set())
+            return result
+        return index.get(normalize(value), set())
+
+    def match(self, criteria: Dict[str, Any], within: Optional[Set[str]] = None) -> Set[str]:
+        """对各条件命中的代码集合求交集，从最小的集合开始"""
+        hits = sorted((self.lookup(name, value) for name, value in criteria.items()), key=len)
+        if within is not None:
+            hits.insert(0, within)
+        if not hits:
+            return set(self.all_codes)
+
+        result = set(hits[0])
+        for hit in hits[1:]:
+            if not result:
+                break
+            result &= hit
+        return result
+
+    def where(self, **criteria) -> StockSelection:
+        """
+        组合条件查询，如 where(industry='货币金融服务', province='广东')
+
+        返回:
+            StockSelection: 查询结果，可继续调用where/exclude叠加条件
+        """
+        return StockSelection(self, self.match(criteria))
+
+    def get(self, code: str) -> Optional[Dict[str, Any]]:
+        """按股票代码获取记录"""
+        return self.data.get(code)
+
+    def values(self, index_name: str) -> List[str]:
+        """某个索引的全部取值，如全部行业"""
+        return sorted(self.indexes[index_name])
+
+
+def linear_scan(data: Dict[str, Dict[str, Any]], **criteria) -> List[str]:
+    """逐条扫描全部股票的参考实现，与StockQuery.where结果一致，用于基准测试"""
+    result = []
+    for code, stock_data in data.items():
+        matched = True
+        for name, value in criteria.items():
+            getters, normalize = INDEX_FIELDS[name]
+            keys = {normalize(getter(stock_data) if callable(getter) else stock_data.get(getter))
+                    for getter in getters}
+            keys.discard(None)
+            if value is ANY:
+                matched = bool(keys)
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                matched = bool(keys & {normalize(item) for item in value})
+            else:
+                matched = normalize(value) in keys
+            if not matched:
+                break
+        if matched:
+            result.append(code)
+    return sorted(result)
+
+
+def benchmark_query(sample_file: str = "test_stock_base_info.json", size: int = 50000,
+                    rounds: int = 20) -> None:
+    """对比索引查询与逐条扫描的耗时"""
+    # 延迟导入，查询模块本身不依赖渲染模块
+    from stock_base_json_2_md import build_benchmark_data
+
+    data = build_benchmark_data(sample_file, size)
+    start = time.perf_counter()
+    query = StockQuery(data)
+    print(f"股票数量: {size}, 建立索引耗时 {time.perf_counter() - start:.3f}秒")
+
+    cases: List[Dict[str, Any]] = [
+        {'industry': '货币金融服务', 'province': '广东'},
+        {'h_code': ANY},
+        {'market': 'bj', 'classi_name': '民营企业', 'province': ['河北', '安徽']},
+        {'name': '平安银行'},
+    ]
+    for criteria in cases:
+        def measure(func: Callable[[], Iterable[str]]):
+            begin = time.perf_counter()
+            for _ in range(rounds):
+                result = func()
+            return (time.perf_counter() - begin) / rounds, result
+
+        scan_time, scanned = measure(lambda: linear_scan(data, **criteria))
+        index_time, indexed = measure(lambda: query.where(**criteria).codes())
+        identical = "一致" if scanned == indexed else "不一致"
+        printable = {k: ('ANY' if v is ANY else v) for k, v in criteria.items()}
+        print(f"  {printable}: 命中 {len(indexed)} 只, 扫描 {scan_time * 1000:.2f}ms, "
+              f"索引 {index_time * 1000:.3f}ms, 加速比 {scan_time / index_time:.0f}x, 结果{identical}")
+
+
+def main():
+    """命令行查询，如 python stock_base_query.py industry=货币金融服务 province=广东"""
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        benchmark_query()
+        return
+
+    criteria = {}
+    for arg in sys.argv[1:]:
+        name, _, value = arg.partition('=')
+        criteria[name] = ANY if value == '*' else value.split(',') if ',' in value else value
+
+    query = StockQuery.from_json()
+    selection = query.where(**criteria)
+    print(f"共 {len(selection)} 只股票")
+    for stock in selection:
+        print(f"  {stock.get('code')} {stock.get('name', '')} {stock.get('cninfo_industry') or ''} "
+              f"{stock.get('xqinfo_provincial_name') or ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+巨潮资讯与雪球数据交叉核对
+将两个数据源都提供的公司全称、法人代表、成立/上市日期、官网、注册/办公地址、注册资本按列对齐，
+统一格式和单位后对全部股票向量化比较，输出按字段和按股票的冲突报告
+"""
+
+import os
+import re
+import sys
+import json
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from stock_base_normalize import NORMALIZED_FLAG, normalize_dates
+
+# 核对状态
+MATCH = 'match'
+SIMILAR = 'similar'
+CONFLICT = 'conflict'
+MISSING_CNINFO = 'missing_cninfo'
+MISSING_XUEQIU = 'missing_xueqiu'
+MISSING_BOTH = 'missing_both'
+STATUSES = [MATCH, SIMILAR, CONFLICT, MISSING_CNINFO, MISSING_XUEQIU, MISSING_BOTH]
+
+# 注册资本相对误差在此范围内视为一致
+CAPITAL_TOLERANCE = 1e-4
+
+# 多个网址之间的分隔符
+_MULTI_VALUE_SEPARATOR = r'[;；、,，\s]+'
+# 比较文本时忽略的标点，不含分隔多个地址的分号
+_PUNCTUATION = r'[\s·・\-—_.,，。、:：()（）\[\]【】"\'“”]+'
+_WEBSITE_PREFIX = re.compile(r'^(https?://)?(www\.)?')
+
+
+def _text(values: pd.Series) -> pd.Series:
+    """全角转半角、英文转小写，空字符串视为缺失"""
+    text = values.where(values.notna()).astype(object)
+    text = text.where(text.isna(), text.astype(str))
+    return text.str.normalize('NFKC').str.lower().str.strip().replace('', np.nan)
+
+
+def _plain_text(values: pd.Series) -> pd.Series:
+    """公司名称、人名：忽略空白和标点"""
+    return _text(values).str.replace(_PUNCTUATION, '', regex=True).replace('', np.nan)
+
+
+def _join_parts(split: pd.Series, cleanup: Callable[[str], str] = None) -> pd.Series:
+    """多值字段拆分后的列表逐项清理、排序去重，以 | 连接"""
+    joined = []
+    for items in split:
+        if not isinstance(items, list):
+            joined.append(np.nan)
+            continue
+        if cleanup is not None:
+            items = [cleanup(item) for item in items]
+        joined.append('|'.join(sorted({item for item in items if item})) or np.nan)
+    return pd.Series(joined, index=split.index, dtype=object)
+
+
+def _addresses(values: pd.Series) -> pd.Series:
+    """地址：忽略标点，多个地址以分号分隔"""
+    text = _text(values).str.replace(_PUNCTUATION, '', regex=True)
+    return _join_parts(text.str.split(r'[;；]+'))
+
+
+def _website_part(part: str) -> str:
+    return _WEBSITE_PREFIX.sub('', part).rstrip('/')
+
+
+def _websites(values: pd.Series) -> pd.Series:
+    """官网：忽略协议和www前缀，多个网址以顿号、分号等分隔"""
+    return _join_parts(_text(values).str.split(_MULTI_VALUE_SEPARATOR), _website_part)
+
+
+def _dates(values: pd.Series) -> pd.Series:
+    return pd.Series(normalize_dates(values), index=values.index, dtype=object)
+
+
+def _capital_pair(cninfo: pd.Series, xueqiu: pd.Series, normalized: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """注册资本统一为万元，原始记录中雪球注册资本单位为元"""
+    cninfo = pd.to_numeric(cninfo, errors='coerce')
+    xueqiu = pd.to_numeric(xueqiu, errors='coerce')
+    return cninfo, xueqiu.where(normalized, xueqiu / 10000)
+
+
+# 核对字段：(字段, 巨潮资讯字段, 雪球字段, 归一化函数)
+PAIRED_FIELDS: List[Tuple[str, str, str, Callable[[pd.Series], pd.Series]]] = [
+    ('company_name', 'cninfo_name', 'xqinfo_org_name_cn', _plain_text),
+    ('legal_rep', 'cninfo_legal_rep', 'xqinfo_legal_representative', _plain_text),
+    ('establish_date', 'cninfo_establish_date', 'xqinfo_established_date', _dates),
+    ('list_date', 'cninfo_list_date', 'xqinfo_listed_date', _dates),
+    ('website', 'cninfo_website', 'xqinfo_org_website', _websites),
+    ('reg_address', 'cninfo_reg_address', 'xqinfo_reg_address_cn', _addresses),
+    ('office_address', 'cninfo_office_address', 'xqinfo_office_address_cn', _addresses),
+    ('capital', 'cninfo_capital', 'xqinfo_reg_asset', None),
+]
+
+# 允许"相近"判定的字段：一方是另一方的子序列（如地址多出区县），或多值字段有交集
+_SIMILAR_FIELDS = {'company_name', 'website', 'reg_address', 'office_address'}
+
+
+def _is_subsequence(short: str, long: str) -> bool:
+    iterator = iter(long)
+    return all(char in iterator for char in short)
+
+
+def _similar(left: str, right: str) -> bool:
+    """两个归一化后的值是否相近"""
+    if '|' in left or '|' in right:
+        if set(left.split('|')) & set(right.split('|')):
+            return True
+    short, long = sorted((left, right), key=len)
+    return _is_subsequence(short, long)
+
+
+def _column(records: List[Dict[str, Any]], field: str, index: pd.Index) -> pd.Series:
+    return pd.Series([record.get(field) for record in records], index=index, dtype=object)
+
+
+def compare_fields(stock_data: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+    """
+    逐字段比较两个数据源
+
+    返回:
+        pd.DataFrame: 以股票代码为索引、核对字段为列的状态表
+    """
+    codes = pd.Index(list(stock_data), name='code')
+    records = list(stock_data.values())
+    normalized = _column(records, NORMALIZED_FLAG, codes).notna()
+
+    statuses = {}
+    for field, cninfo_field, xueqiu_field, normalize in PAIRED_FIELDS:
+        cninfo_raw = _column(records, cninfo_field, codes)
+        xueqiu_raw = _column(records, xueqiu_field, codes)
+        if normalize is None:
+            left, right = _capital_pair(cninfo_raw, xueqiu_raw, normalized)
+            scale = np.maximum(left.abs(), right.abs()).replace(0, 1)
+            equal = ((left - right).abs() / scale) <= CAPITAL_TOLERANCE
+        else:
+            left, right = normalize(cninfo_raw), normalize(xueqiu_raw)
+            equal = left == right
+
+        has_left, has_right = left.notna(), right.notna()
+        status = np.select(
+            [has_left & has_right & equal, has_left & has_right, has_left, has_right],
+            [MATCH, CONFLICT, MISSING_XUEQIU, MISSING_CNINFO],
+            default=MISSING_BOTH,
+        ).astype(object)
+
+        if field in _SIMILAR_FIELDS:
+            # 只对不一致的少数行逐个判断是否相近
+            left_values, right_values = left.to_numpy(), right.to_numpy()
+            for position in np.flatnonzero(status == CONFLICT):
+                if _similar(left_values[position], right_values[position]):
+                    status[position] = SIMILAR
+        statuses[field] = status
+
+    return pd.DataFrame(statuses, index=codes)
+
+
+def reconcile(stock_data: Dict[str, Dict[str, Any]], include_similar: bool = False) -> Dict[str, Any]:
+    """
+    生成交叉核对报告
+
+    参数:
+        stock_data: 股票基础信息数据
+        include_similar: 按股票列出时是否包含"相近"的字段
+
+    返回:
+        Dict[str, Any]: 按字段统计和按股票列出的冲突报告
+    """
+    table = compare_fields(stock_data)
+    total = len(table)
+
+    fields = {}
+    for field in table.columns:
+        counts = table[field].value_counts()
+        summary = {status: int(counts.get(status, 0)) for status in STATUSES}
+        compared = summary[MATCH] + summary[SIMILAR] + summary[CONFLICT]
+        summary['conflict_rate'] = round(summary[CONFLICT] / compared, 4) if compared else 0.0
+        fields[field] = summary
+
+    flagged = {CONFLICT, SIMILAR} if include_similar else {CONFLICT}
+    # 按位置取numpy数组逐行组装，避免对每只股票做 .loc/.at 标签查找
+    values = table.to_numpy()
+    mask = np.isin(values, list(flagged))
+    conflict_counts = mask.sum(axis=1)
+    order = np.argsort(-conflict_counts, kind='stable')
+    order = order[conflict_counts[order] > 0]
+    codes = table.index.to_numpy()
+
+    stocks = {}
+    for row in order:
+        code = codes[row]
+        record = stock_data[code]
+        conflicts = {}
+        for column in np.flatnonzero(mask[row]):
+            field, cninfo_field, xueqiu_field, _ = PAIRED_FIELDS[column]
+            conflicts[field] = {
+                'status': values[row, column],
+                'cninfo': record.get(cninfo_field),
+                'xueqiu': record.get(xueqiu_field),
+            }
+        stocks[code] = {'name': record.get('name'), 'conflicts': conflicts}
+
+    return {
+        'generated_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'total_stocks': total,
+        'stocks_with_conflicts': len(stocks),
+        'fields': fields,
+        'stocks': stocks,
+    }
+
+
+def default_reconcile_file(output_file: str) -> str:
+    """根据数据文件路径推导核对报告路径，如 stock_base_info_reconcile.json"""
+    return os.path.splitext(output_file)[0] + "_reconcile.json"
+
+
+def print_reconcile_summary(report: Dict[str, Any]) -> None:
+    """打印按字段的核对结果"""
+    print(f"交叉核对: {report['total_stocks']} 只股票, {report['stocks_with_conflicts']} 只存在冲突")
+    print(f"  {'字段':<16}{'一致':>8}{'相近':>8}{'冲突':>8}{'缺巨潮':>8}{'缺雪球':>8}{'冲突率':>9}")
+    for field, summary in report['fields'].items():
+        print(f"  {field:<16}{summary[MATCH]:>8}{summary[SIMILAR]:>8}{summary[CONFLICT]:>8}"
+              f"{summary[MISSING_CNINFO]:>8}{summary[MISSING_XUEQIU]:>8}{summary['conflict_rate']:>9.1%}")
+
+
+def run_reconciliation(stock_data: Dict[str, Dict[str, Any]], report_file: str) -> bool:
+    """核对并保存报告，供批量获取结束时调用"""
+    report = reconcile(stock_data)
+    print_reconcile_summary(report)
+    try:
+        tmp_file = report_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, report_file)
+        print(f"✓ 核对报告已保存到 {report_file}")
+        return True
+    except Exception as e:
+        print(f"✗ 保存核对报告失败: {e}")
+        return False
+
+
+def benchmark_reconcile(sample_file: str = "test_stock_base_info.json", sizes: List[int] = (5440, 50000)) -> None:
+    """测试不同数据量下的核对耗时"""
+    # 延迟导入，核对模块本身不依赖渲染模块
+    from stock_base_json_2_md import build_benchmark_data
+
+    for size in sizes:
+        data = build_benchmark_data(sample_file, size)
+        start = time.perf_counter()
+        report = reconcile(data)
+        print(f"  {size:>7} 只股票: 核对耗时 {time.perf_counter() - start:.2f}秒, "
+              f"{report['stocks_with_conflicts']} 只存在冲突")
+
+
+def main():
+    """命令行入口"""
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        benchmark_reconcile()
+        return
+
+    json_file = sys.argv[1] if len(sys.argv) > 1 else "stock_base_info.json"
+    report_file = sys.argv[2] if len(sys.argv) > 2 else default_reconcile_file(json_file)
+    with open(json_file, 'r', encoding='utf-8') as f:
+        stock_data = json.load(f)
+    run_reconciliation(stock_data, report_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+交易所IPO审核注册信息批量获取
+stock_register_sh/sz/bj 一次返回各板块全部IPO申报记录（最新状态、保荐机构、律师事务所、会计师事务所等），
+每次运行并发获取三张表并缓存到本地，归一化列名后以向量化合并关联到股票记录，代替逐只股票请求。
+接口返回的表中没有证券代码列，按公司全称（巨潮资讯公司名称，缺失时用雪球公司名称）关联
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import akshare as ak
+import pandas as pd
+
+from stock_code_market import normalize_codes
+
+DEFAULT_CACHE_FILE = "stock_register_cache.json"
+DEFAULT_TTL_HOURS = 24.0
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 交易所注册表：(名称, 所属市场, 获取函数)
+REGISTER_BOARDS = [
+    ('上交所', 'sh', ak.stock_register_sh),
+    ('深交所', 'sz', ak.stock_register_sz),
+    ('北交所', 'bj', ak.stock_register_bj),
+]
+
+# 接口列名 -> 字段名（保存时加register_前缀）
+REGISTER_COLUMNS = {
+    '企业名称': 'company_name',
+    '最新状态': 'status',
+    '注册地': 'reg_place',
+    '行业': 'industry',
+    '保荐机构': 'sponsor',
+    '律师事务所': 'law_firm',
+    '会计师事务所': 'accounting_firm',
+    '受理日期': 'accept_date',
+    '更新日期': 'update_date',
+    '拟上市地点': 'listing_board',
+    '招股说明书': 'prospectus_url',
+}
+REGISTER_FIELDS = list(REGISTER_COLUMNS.values())
+DATE_COLUMNS = ['accept_date', 'update_date']
+# 接口今后若返回证券代码列，优先按代码关联
+CODE_COLUMNS = ['证券代码', 'SECURITY_CODE', '股票代码']
+
+# 关联股票记录时依次使用的公司全称字段
+NAME_KEY_FIELDS = ['cninfo_name', 'xqinfo_org_name_cn']
+
+
+def company_key(names: pd.Series) -> pd.Series:
+    """公司全称归一化为关联键：全角转半角、去除空白，空值为NaN"""
+    text = names.where(names.notna()).astype(object)
+    text = text.where(text.isna(), text.astype(str))
+    return (text.str.normalize('NFKC').str.replace(r'\s+', '', regex=True)
+            .replace({'': None, 'N/A': None, 'nan': None}))
+
+
+def normalize_register_frame(df: pd.DataFrame, market: str) -> pd.DataFrame:
+    """
+    将单个交易所的注册表归一化为统一格式
+
+    Args:
+        df (pd.DataFrame): 接口返回的原始数据
+        market (str): 所属市场（sh/sz/bj）
+
+    Returns:
+        pd.DataFrame: REGISTER_FIELDS 列加上 market、name_key、code 列，日期为 YYYY-MM-DD 字符串
+    """
+    missing = [column for column in REGISTER_COLUMNS if column not in df.columns]
+    if missing:
+        raise KeyError(f"注册表缺少列 {missing}，实际列名: {list(df.columns)}")
+
+    result = df.rename(columns=REGISTER_COLUMNS)[REGISTER_FIELDS].copy()
+    for column in DATE_COLUMNS:
+        result[column] = pd.to_datetime(result[column], errors='coerce').dt.strftime('%Y-%m-%d')
+    result['market'] = market
+    result['name_key'] = company_key(result['company_name'])
+    code_column = next((column for column in CODE_COLUMNS if column in df.columns), None)
+    result['code'] = normalize_codes(df[code_column]) if code_column else ''
+    return result
+
+
+def latest_per_company(table: pd.DataFrame) -> pd.DataFrame:
+    """同一公司多次申报时保留更新日期最新的一条"""
+    return (table.sort_values('update_date', kind='stable', na_position='first')
+            .drop_duplicates('name_key', keep='last')
+            .dropna(subset=['name_key'])
+            .reset_index(drop=True))
+
+
+def _fetch_board(board: str, market: str, fetch_func) -> Dict[str, Any]:
+    """获取并归一化单个交易所的注册表，返回包含数据和耗时的结果"""
+    start = time.perf_counter()
+    try:
+        frame = normalize_register_frame(fetch_func(), market)
+        error = None
+    except Exception as e:
+        frame = None
+        error = str(e)
+    return {
+        'board': board,
+        'frame': frame,
+        'rows': 0 if frame is None else len(frame),
+        'seconds': time.perf_counter() - start,
+        'error': error,
+    }
+
+
+def fetch_register_tables(boards: Optional[List[Tuple]] = None) -> Tuple[Optional[pd.DataFrame], List[Dict[str, Any]]]:
+    """
+    并发获取沪深京三张注册表并合并
+
+    Returns:
+        Tuple[Optional[pd.DataFrame], List[Dict[str, Any]]]:
+            (合并后每家公司一条的注册表，任一交易所失败时为None; 各交易所的耗时报告)
+    """
+    boards = boards or REGISTER_BOARDS
+    with ThreadPoolExecutor(max_workers=len(boards)) as executor:
+        futures = [executor.submit(_fetch_board, *board) for board in boards]
+        reports = [future.result() for future in futures]
+
+    if any(report['error'] for report in reports):
+        return None, reports
+    merged = pd.concat([report['frame'] for report in reports], ignore_index=True)
+    return latest_per_company(merged), reports
+
+
+class RegisterCache:
+    """注册表本地缓存，有效期内不再请求接口"""
+
+    def __init__(self, cache_file: str = DEFAULT_CACHE_FILE, ttl_hours: float = DEFAULT_TTL_HOURS):
+        self.cache_file = cache_file
+        self.ttl = timedelta(hours=ttl_hours)
+        self.table = None
+        self.timestamp = None
+
+    def load(self) -> bool:
+        """加载缓存文件"""
+        try:
+            if not os.path.exists(self.cache_file):
+                return False
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.table = pd.DataFrame(data.get('rows', []), columns=[*REGISTER_FIELDS, 'market', 'name_key', 'code'])
+            self.timestamp = data.get('timestamp')
+            return True
+        except Exception as e:
+            print(f"✗ 加载注册表缓存失败: {e}")
+            return False
+
+    def save(self) -> bool:
+        """保存缓存文件"""
+        try:
+            rows = self.table.astype(object).where(self.table.notna(), None).to_dict('records')
+            tmp_file = self.cache_file + ".tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'timestamp': self.timestamp, 'rows': rows}, f, ensure_ascii=False)
+            os.replace(tmp_file, self.cache_file)
+            return True
+        except Exception as e:
+            print(f"✗ 保存注册表缓存失败: {e}")
+            return False
+
+    def is_fresh(self) -> bool:
+        """缓存是否在有效期内"""
+        if self.table is None or not self.timestamp:
+            return False
+        try:
+            cache_time = datetime.strptime(self.timestamp, TIME_FORMAT)
+        except ValueError:
+            return False
+        return datetime.now() - cache_time < self.ttl
+
+    def refresh(self) -> bool:
+        """重新获取三张注册表并保存缓存"""
+        start = time.perf_counter()
+        table, reports = fetch_register_tables()
+        for report in reports:
+            status = f"{report['rows']} 条" if not report['error'] else f"失败: {report['error']}"
+            print(f"  {report['board']:<6} {report['seconds']:>6.2f}秒  {status}")
+        print(f"  并发总耗时 {time.perf_counter() - start:.2f}秒")
+        if table is None:
+            return False
+        self.table = table
+        self.timestamp = datetime.now().strftime(TIME_FORMAT)
+        return self.save()
+
+
+def load_register_table(cache_file: str = DEFAULT_CACHE_FILE, ttl_hours: float = DEFAULT_TTL_HOURS,
+                        force_refresh: bool = False) -> pd.DataFrame:
+    """
+    获取合并后的注册表，缓存在有效期内时不再请求接口
+
+    Returns:
+        pd.DataFrame: 每家公司一条的注册表
+
+    Raises:
+        RuntimeError: 接口获取失败且没有缓存
+    """
+    cache = RegisterCache(cache_file, ttl_hours)
+    cache.load()
+    if not force_refresh and cache.is_fresh():
+        print(f"✓ 使用注册表缓存: {len(cache.table)} 家公司 (更新于 {cache.timestamp})")
+        return cache.table
+
+    print("正在获取沪深京IPO注册表...")
+    if cache.refresh():
+        print(f"✓ 已更新注册表缓存: {len(cache.table)} 家公司")
+    elif cache.table is not None:
+        print(f"✓ 使用过期的注册表缓存: {len(cache.table)} 家公司 (更新于 {cache.timestamp})")
+    else:
+        raise RuntimeError("获取注册表失败且没有缓存")
+    return cache.table
+
+
+def join_register_table(stock_data: Dict[str, Dict[str, Any]], table: pd.DataFrame) -> pd.DataFrame:
+    """
+    将注册表关联到股票记录
+
+    有证券代码时按代码关联，否则按公司全称关联
+
+    Args:
+        stock_data: 股票基础信息数据 {股票代码: 股票信息}
+        table: load_register_table 返回的注册表
+
+    Returns:
+        pd.DataFrame: 以股票代码为索引、REGISTER_FIELDS 为列，只包含关联上的股票
+    """
+    records = list(stock_data.values())
+    names = pd.Series([None] * len(records), dtype=object)
+    for field in NAME_KEY_FIELDS:
+        names = names.fillna(company_key(pd.Series([record.get(field) for record in records], dtype=object)))
+    stocks = pd.DataFrame({'code': pd.Series(list(stock_data), dtype=object), 'name_key': names})
+
+    by_code = table[table['code'].fillna('') != '']
+    matched_by_code = stocks[['code']].merge(by_code[['code', *REGISTER_FIELDS]], on='code', how='inner')
+    remaining = stocks[~stocks['code'].isin(matched_by_code['code'])].dropna(subset=['name_key'])
+    by_name = table.drop(columns='code').drop_duplicates('name_key', keep='last')
+    matched_by_name = remaining.merge(by_name[['name_key', *REGISTER_FIELDS]], on='name_key', how='inner')
+
+    joined = pd.concat([matched_by_code, matched_by_name.drop(columns='name_key')], ignore_index=True)
+    return joined.set_index('code')[REGISTER_FIELDS]
+
+
+def _join_loop(stock_data: Dict[str, Dict[str, Any]], table: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """逐只股票查找的参考实现，用于校验和基准测试"""
+    def key_of(value):
+        if value is None or value != value:
+            return None
+        key = re.sub(r'\s+', '', unicodedata.normalize('NFKC', str(value)))
+        return None if key in ('', 'N/A', 'nan') else key
+
+    rows = {row['name_key']: row for row in table.to_dict('records')}
+    result = {}
+    for code, record in stock_data.items():
+        key = next((key for key in (key_of(record.get(field)) for field in NAME_KEY_FIELDS) if key), None)
+        if key in rows:
+            result[code] = {field: rows[key][field] for field in REGISTER_FIELDS}
+    return result
+
+
+def benchmark_join(sample_file: str = "test_stock_base_info.json", size: int = 50000) -> None:
+    """对比向量化关联与逐只查找的耗时"""
+    from stock_base_json_2_md import build_benchmark_data
+
+    data = build_benchmark_data(sample_file, size)
+    # 每只股票使用不同的公司全称，注册表包含其中一半股票和同样数量的未上市公司
+    names = []
+    for position, record in enumerate(data.values()):
+        record['cninfo_name'] = f"{record.get('cninfo_name') or ''}{position}"
+        names.append(record['cninfo_name'])
+    names = names[::2] + [f"未上市公司{position}" for position in range(size // 2)]
+    table = latest_per_company(pd.DataFrame({
+        **{field: [f'{field}-{i}' for i in range(len(names))] for field in REGISTER_FIELDS},
+        'company_name': names, 'market': 'sh', 'code': '',
+        'name_key': company_key(pd.Series(names, dtype=object)),
+    }))
+
+    start = time.perf_counter()
+    reference = _join_loop(data, table)
+    loop_time = time.perf_counter() - start
+    start = time.perf_counter()
+    joined = join_register_table(data, table)
+    vector_time = time.perf_counter() - start
+
+    identical = "一致" if joined.to_dict('index') == reference else "不一致"
+    print(f"股票数量: {size}, 注册表 {len(table)} 家公司, 关联 {len(joined)} 只, "
+          f"逐只 {loop_time:.2f}秒, 向量化 {vector_time:.2f}秒, 结果{identical}")
+
+
+def main():
+    """命令行入口"""
+    command = sys.argv[1] if len(sys.argv) > 1 else "show"
+    if command == "refresh":
+        load_register_table(force_refresh=True)
+    elif command == "show":
+        table = load_register_table()
+        print(table['status'].value_counts().to_string())
+    elif command == "bench":
+        benchmark_join()
+    else:
+        print(f"未知命令: {command}")
+        print("使用方法: python stock_base_register.py [show|refresh|bench]")
+
+
+if __name__ == "__main__":
+    main()
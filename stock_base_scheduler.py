@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量获取的优先级调度
+按价值排列待获取的股票：新上市股票优先，其次是缺少数据源字段或上次获取失败的记录，
+再是关注列表中的股票，最后是其余股票；后两类内部按上次更新时间从旧到新。
+排好的队列持久化到文件，中断后按原顺序继续，运行被提前终止时最有价值的更新已经完成
+"""
+
+import os
+import sys
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from stock_base_sources import SourceEngine, StockSource
+from stock_code_universe import get_universe_diff
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 排队原因，按优先级从高到低
+REASON_NEW_LISTING = 'new_listing'
+REASON_MISSING = 'missing_sources'
+REASON_STALE = 'stale'
+
+
+def load_watchlist(watchlist: Optional[str]) -> List[str]:
+    """
+    读取关注列表
+
+    参数:
+        watchlist: 文件路径（每行或逗号分隔的股票代码，#开头为注释）或逗号分隔的股票代码
+
+    返回:
+        List[str]: 股票代码列表
+    """
+    if not watchlist:
+        return []
+    if os.path.exists(watchlist):
+        with open(watchlist, 'r', encoding='utf-8') as f:
+            text = '\n'.join(line.split('#')[0] for line in f)
+    else:
+        text = watchlist
+    return [code.strip() for code in text.replace(',', '\n').split() if code.strip()]
+
+
+def required_fields(source: StockSource, projection: Optional[Dict[str, set]]) -> List[str]:
+    """判断记录是否缺少某数据源时检查的字段（带前缀）"""
+    fields = source.fields if projection is None else sorted(projection[source.name])
+    return [source.prefix + field for field in fields]
+
+
+def missing_sources(records: List[Dict[str, Any]], engine: SourceEngine) -> np.ndarray:
+    """
+    记录是否缺少所选逐只股票数据源，或上次获取失败
+    数据源获取成功时会写入它的全部字段，因此一个字段都没有才视为缺少；
+    只看是否存在任一字段，也不受规范化时改名的字段影响
+
+    返回:
+        np.ndarray: 与records等长的布尔数组
+    """
+    failed = np.array([record.get('status') in ('failed', 'error') for record in records], dtype=bool)
+    missing = failed
+    for source in engine.stock_sources:
+        fields = required_fields(source, engine.projection)
+        missing = missing | np.array([not any(field in record for field in fields) for record in records], dtype=bool)
+    return missing
+
+
+def prioritize(codes: Iterable[str], existing: Dict[str, Dict[str, Any]], engine: SourceEngine,
+               new_listings: Iterable[str] = (), watchlist: Iterable[str] = ()) -> pd.DataFrame:
+    """
+    计算待获取股票的优先级顺序
+
+    参数:
+        codes: 待获取的股票代码
+        existing: 已有数据集 {股票代码: 股票信息}
+        engine: 本次运行的数据源引擎，用于判断缺少哪些数据源
+        new_listings: 新上市的股票代码
+        watchlist: 关注列表，其中的股票排在所有不在关注列表的过期股票之前，即使后者更新时间更旧
+
+    返回:
+        pd.DataFrame: 按优先级排序，列为 code、reason、update_time、watchlist
+    """
+    codes = list(codes)
+    records = [existing.get(code, {}) for code in codes]
+    frame = pd.DataFrame({
+        'code': codes,
+        'new_listing': pd.Index(codes).isin(list(new_listings)),
+        'missing': missing_sources(records, engine) | np.array([not record for record in records], dtype=bool),
+        'update_time': pd.to_datetime(pd.Series([record.get('update_time') for record in records], dtype=object),
+                                      format=TIME_FORMAT, errors='coerce'),
+        'watchlist': pd.Index(codes).isin(list(watchlist)),
+    })
+    frame['reason'] = np.select([frame['new_listing'], frame['missing']],
+                                [REASON_NEW_LISTING, REASON_MISSING], default=REASON_STALE)
+    # 关注列表是独立的优先级档位，排在更新时间之前；从未获取过的记录没有更新时间，视为最旧
+    frame = frame.sort_values(['new_listing', 'missing', 'watchlist', 'update_time', 'code'],
+                              ascending=[False, False, False, True, True], na_position='first', kind='stable')
+    return frame[['code', 'reason', 'update_time', 'watchlist']].reset_index(drop=True)
+
+
+def default_queue_file(checkpoint_file: str) -> str:
+    """根据断点文件路径推导队列文件路径，如 stock_progress_checkpoint_queue.json"""
+    return os.path.splitext(checkpoint_file)[0] + "_queue.json"
+
+
+class CrawlQueue:
+    """持久化的获取队列，中断后按原有优先级顺序继续"""
+
+    def __init__(self, queue_file: str):
+        self.queue_file = queue_file
+        self.codes: List[str] = []
+        self.reasons: Dict[str, str] = {}
+        self.sources: List[str] = []
+        self.created = None
+
+    def load(self) -> bool:
+        """加载队列文件"""
+        try:
+            if not os.path.exists(self.queue_file):
+                return False
+            with open(self.queue_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.codes = data.get('codes', [])
+            self.reasons = data.get('reasons', {})
+            self.sources = data.get('sources', [])
+            self.created = data.get('created')
+            return True
+        except Exception as e:
+            print(f"✗ 加载获取队列失败: {e}")
+            return False
+
+    def save(self) -> bool:
+        """保存队列文件"""
+        try:
+            tmp_file = self.queue_file + ".tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'created': self.created, 'sources': self.sources,
+                           'codes': self.codes, 'reasons': self.reasons}, f, ensure_ascii=False)
+            os.replace(tmp_file, self.queue_file)
+            return True
+        except Exception as e:
+            print(f"✗ 保存获取队列失败: {e}")
+            return False
+
+    def clear(self) -> None:
+        """队列处理完成后删除队列文件"""
+        if os.path.exists(self.queue_file):
+            os.remove(self.queue_file)
+
+    def build(self, plan: pd.DataFrame, sources: List[str]) -> None:
+        """用新的优先级顺序替换队列"""
+        self.codes = plan['code'].tolist()
+        self.reasons = {code: reason for code, reason in zip(plan['code'], plan['reason']) if reason != REASON_STALE}
+        self.sources = sources
+        self.created = datetime.now().strftime(TIME_FORMAT)
+
+
+def schedule(pending_codes: Iterable[str], existing: Dict[str, Dict[str, Any]], engine: SourceEngine,
+             queue_file: str, watchlist: Iterable[str] = (), resume: bool = False) -> List[str]:
+    """
+    给出本次运行的获取顺序并持久化
+
+    参数:
+        pending_codes: 尚未处理的股票代码
+        existing: 已有数据集
+        engine: 本次运行的数据源引擎
+        queue_file: 队列文件路径
+        watchlist: 关注列表
+        resume: 是否从断点继续；继续时沿用已保存队列的顺序，数据源不同或队列外的股票重新排序
+
+    返回:
+        List[str]: 按优先级排列的股票代码
+    """
+    pending = list(pending_codes)
+    pending_set = set(pending)
+    queue = CrawlQueue(queue_file)
+    sources = engine.source_names + sorted(f'{name}:{",".join(sorted(fields))}'
+                                           for name, fields in (engine.projection or {}).items())
+
+    ordered = []
+    if resume and queue.load() and queue.sources == sources:
+        ordered = [code for code in queue.codes if code in pending_set]
+        print(f"✓ 沿用获取队列 (创建于 {queue.created}): 剩余 {len(ordered)} 只")
+
+    queued = set(ordered)
+    rest = [code for code in pending if code not in queued]
+    if rest:
+        plan = prioritize(rest, existing, engine, get_universe_diff()['listed'], watchlist)
+        counts = plan['reason'].value_counts()
+        print(f"✓ 按优先级排列 {len(plan)} 只股票: 新上市 {counts.get(REASON_NEW_LISTING, 0)} 只, "
+              f"缺少数据 {counts.get(REASON_MISSING, 0)} 只, 按更新时间 {counts.get(REASON_STALE, 0)} 只, "
+              f"关注列表 {int(plan['watchlist'].sum())} 只")
+        if ordered:
+            queue.codes = ordered + plan['code'].tolist()
+            queue.reasons.update({code: reason for code, reason in zip(plan['code'], plan['reason'])
+                                  if reason != REASON_STALE})
+        else:
+            queue.build(plan, sources)
+        queue.save()
+    return queue.codes if rest else ordered
+
+
+def print_plan(plan: pd.DataFrame, limit: int = 20) -> None:
+    """打印排在最前面的股票及排队原因"""
+    labels = {REASON_NEW_LISTING: '新上市', REASON_MISSING: '缺少数据', REASON_STALE: '按更新时间'}
+    for row in plan.head(limit).itertuples():
+        update_time = row.update_time.strftime(TIME_FORMAT) if pd.notna(row.update_time) else '从未获取'
+        watch = ' ★关注' if row.watchlist else ''
+        print(f"  {row.Index + 1:>5}. {row.code}  {labels[row.reason]:<6} {update_time}{watch}")
+
+
+def main():
+    """命令行入口：查看已有数据集的获取优先级"""
+    json_file = sys.argv[1] if len(sys.argv) > 1 else "stock_base_info.json"
+    watchlist = load_watchlist(sys.argv[2] if len(sys.argv) > 2 else None)
+    with open(json_file, 'r', encoding='utf-8') as f:
+        existing = json.load(f)
+    plan = prioritize(existing, existing, SourceEngine(delay=0), get_universe_diff()['listed'], watchlist)
+    print(f"{json_file}: {len(plan)} 只股票, 获取顺序前 20 只:")
+    print_plan(plan)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+股票基础信息全文检索
+对经营范围、主营业务、公司简介等长文本字段按相邻两个字符（二元组）建立倒排索引，
+无需中文分词依赖。索引离线生成为单个二进制文件，查询时通过mmap零拷贝加载，
+多关键词查询按BM25打分排序
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+import unicodedata
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+# 参与全文检索的长文本字段
+SEARCH_FIELDS = [
+    'cninfo_business',
+    'cninfo_scope',
+    'cninfo_profile',
+    'xqinfo_main_operation_business',
+    'xqinfo_operating_scope',
+    'xqinfo_org_cn_introduction',
+]
+
+DEFAULT_INDEX_FILE = "./data/stock_search.idx"
+
+# 文件头：魔数、版本、文档数、词项数、倒排记录数、平均文档长度，补齐到64字节
+_MAGIC = b'SBSEARCH'
+_VERSION = 1
+_HEADER = struct.Struct('<8sIIIQd')
+_HEADER_SIZE = 64
+
+# 二元组编码为 (第一个字符码点 << 21) | 第二个字符码点，连续字符段的最后一个字符与0组合，
+# 因此每个字符出现位置恰好对应一个以它开头的键，单字查询可按键区间检索
+_CHAR_BITS = 21
+
+# BM25参数
+_K1 = 1.2
+_B = 0.75
+
+
+def normalize_text(text: str) -> str:
+    """全角转半角、英文转小写，索引和查询使用同一规则"""
+    return unicodedata.normalize('NFKC', text).lower()
+
+
+def _char_keys(text: str) -> np.ndarray:
+    """
+    将文本转换为二元组键数组
+
+    只有中文、数字和英文字母参与索引，其他字符作为分隔符截断二元组。
+    """
+    if not text:
+        return np.empty(0, dtype=np.uint64)
+    cps = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    is_word = (((cps >= 0x4e00) & (cps <= 0x9fff))
+               | ((cps >= ord('0')) & (cps <= ord('9')))
+               | ((cps >= ord('a')) & (cps <= ord('z'))))
+    if not is_word.any():
+        return np.empty(0, dtype=np.uint64)
+
+    # 后一个字符不是索引字符时，与0组合为字符段结尾键
+    following = np.zeros_like(cps)
+    following[:-1] = cps[1:]
+    following_is_word = np.zeros_like(is_word)
+    following_is_word[:-1] = is_word[1:]
+    following[~following_is_word] = 0
+
+    keys = (cps << np.uint64(_CHAR_BITS)) | following
+    return keys[is_word]
+
+
+def _document_text(stock_data: Dict[str, Any]) -> str:
+    """拼接参与检索的字段，字段之间以换行分隔"""
+    parts = [stock_data.get(field) for field in SEARCH_FIELDS]
+    return normalize_text('\n'.join(str(part) for part in parts if part))
+
+
+def _align(offset: int) -> int:
+    """按8字节对齐"""
+    return (offset + 7) & ~7
+
+
+def _section_layout(doc_count: int, term_count: int, posting_count: int):
+    """计算各数据段的 (名称, dtype, 元素个数, 偏移量)"""
+    doc_id_dtype = np.uint16 if doc_count <= np.iinfo(np.uint16).max else np.uint32
+    sections = [
+        ('codes', np.dtype('S6'), doc_count),
+        ('doc_lens', np.dtype(np.uint32), doc_count),
+        ('keys', np.dtype(np.uint64), term_count),
+        ('offsets', np.dtype(np.uint64), term_count + 1),
+        ('doc_ids', np.dtype(doc_id_dtype), posting_count),
+        ('tfs', np.dtype(np.uint16), posting_count),
+    ]
+    layout = []
+    offset = _HEADER_SIZE
+    for name, dtype, count in sections:
+        offset = _align(offset)
+        layout.append((name, dtype, count, offset))
+        offset += dtype.itemsize * count
+    return layout
+
+
+def build_search_index(data: Dict[str, Dict[str, Any]], index_file: str = DEFAULT_INDEX_FILE) -> Dict[str, Any]:
+    """
+    为股票数据离线生成全文检索索引文件
+
+    参数:
+        data: 股票数据字典 {股票代码: 股票信息}
+        index_file: 索引文件路径
+
+    返回:
+        Dict[str, Any]: 索引统计信息
+    """
+    codes = sorted(data)
+    doc_keys, doc_ids, doc_tfs = [], [], []
+    doc_lens = np.zeros(len(codes), dtype=np.uint32)
+
+    for doc_id, code in enumerate(codes):
+        keys = _char_keys(_document_text(data[code]))
+        doc_lens[doc_id] = len(keys)
+        if not len(keys):
+            continue
+        unique_keys, counts = np.unique(keys, return_counts=True)
+        doc_keys.append(unique_keys)
+        doc_ids.append(np.full(len(unique_keys), doc_id, dtype=np.uint32))
+        doc_tfs.append(np.minimum(counts, np.iinfo(np.uint16).max).astype(np.uint16))
+
+    if doc_keys:
+        all_keys = np.concatenate(doc_keys)
+        all_ids = np.concatenate(doc_ids)
+        all_tfs = np.concatenate(doc_tfs)
+    else:
+        all_keys = np.empty(0, dtype=np.uint64)
+        all_ids = np.empty(0, dtype=np.uint32)
+        all_tfs = np.empty(0, dtype=np.uint16)
+
+    # 按 (键, 文档号) 排序后，相同键的倒排记录连续存放
+    order = np.lexsort((all_ids, all_keys))
+    all_keys, all_ids, all_tfs = all_keys[order], all_ids[order], all_tfs[order]
+    term_keys, term_starts = np.unique(all_keys, return_index=True)
+    offsets = np.append(term_starts, len(all_keys)).astype(np.uint64)
+
+    avgdl = float(doc_lens.mean()) if len(codes) else 0.0
+    layout = _section_layout(len(codes), len(term_keys), len(all_keys))
+    arrays = {
+        'codes': np.array(codes, dtype='S6'),
+        'doc_lens': doc_lens,
+        'keys': term_keys.astype(np.uint64),
+        'offsets': offsets,
+        'doc_ids': all_ids,
+        'tfs': all_tfs,
+    }
+
+    index_dir = os.path.dirname(index_file)
+    if index_dir:
+        os.makedirs(index_dir, exist_ok=True)
+    tmp_file = index_file + ".tmp"
+    with open(tmp_file, 'wb') as f:
+        header = _HEADER.pack(_MAGIC, _VERSION, len(codes), len(term_keys), len(all_keys), avgdl)
+        f.write(header.ljust(_HEADER_SIZE, b'\0'))
+        for name, dtype, count, offset in layout:
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(arrays[name].astype(dtype, copy=False).tobytes())
+    os.replace(tmp_file, index_file)
+
+    return {
+        'documents': len(codes),
+        'terms': len(term_keys),
+        'postings': len(all_keys),
+        'size_mb': os.path.getsize(index_file) / (1024 * 1024),
+    }
+
+
+class SearchIndex:
+    """通过mmap加载的全文检索索引"""
+
+    def __init__(self, index_file: str = DEFAULT_INDEX_FILE):
+        self.index_file = index_file
+        self._file = open(index_file, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, doc_count, term_count, posting_count, avgdl = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError(f"不是有效的全文检索索引文件: {index_file}")
+
+        self.doc_count = doc_count
+        self.avgdl = avgdl or 1.0
+        for name, dtype, count, offset in _section_layout(doc_count, term_count, posting_count):
+            setattr(self, f"_{name}", np.frombuffer(self._mmap, dtype=dtype, count=count, offset=offset))
+        self.codes = [code.decode('ascii') for code in self._codes]
+        # BM25的文档长度归一化项只与文档有关，加载时预先计算
+        self._length_norm = (_K1 * (1 - _B + _B * self._doc_lens / self.avgdl)).astype(np.float32)
+
+    def close(self) -> None:
+        """释放mmap和文件句柄"""
+        for name in ('_codes', '_doc_lens', '_keys', '_offsets', '_doc_ids', '_tfs'):
+            self.__dict__.pop(name, None)
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> 'SearchIndex':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _unit_tf(self, key_range: Tuple[int, int]) -> np.ndarray:
+        """返回键区间 [lo, hi) 内所有倒排记录按文档累加的词频向量"""
+        lo = int(np.searchsorted(self._keys, np.uint64(key_range[0]), side='left'))
+        hi = int(np.searchsorted(self._keys, np.uint64(key_range[1]), side='left'))
+        if lo >= hi:
+            return np.zeros(self.doc_count, dtype=np.float32)
+        start, end = int(self._offsets[lo]), int(self._offsets[hi])
+        return np.bincount(self._doc_ids[start:end], weights=self._tfs[start:end],
+                           minlength=self.doc_count).astype(np.float32)
+
+    @staticmethod
+    def _term_units(term: str) -> List[Tuple[int, int]]:
+        """将查询词拆分为检索单元：二元组为单个键，单字为以该字开头的键区间"""
+        keys = _char_keys(term)
+        units = []
+        for key in keys:
+            key = int(key)
+            if key & ((1 << _CHAR_BITS) - 1):
+                units.append((key, key + 1))
+            elif len(keys) == 1 or not units:
+                # 单字查询词：匹配以该字开头的全部键
+                first = key >> _CHAR_BITS
+                units.append((first << _CHAR_BITS, (first + 1) << _CHAR_BITS))
+        return list(dict.fromkeys(units))
+
+    def search(self, query: str, limit: int = 20, require_all: bool = True) -> List[Tuple[str, float]]:
+        """
+        多关键词检索
+
+        参数:
+            query: 查询语句，多个关键词以空格分隔，如 "锂电池 储能"
+            limit: 返回结果数量
+            require_all: True为所有关键词都需命中，False为命中任一关键词即可
+
+        返回:
+            List[Tuple[str, float]]: 按BM25得分从高到低排列的 (股票代码, 得分)
+        """
+        terms = [term for term in normalize_text(query).split() if term]
+        if not terms or not self.doc_count:
+            return []
+
+        scores = np.zeros(self.doc_count, dtype=np.float32)
+        matched = np.ones(self.doc_count, dtype=bool) if require_all else np.zeros(self.doc_count, dtype=bool)
+
+        for term in terms:
+            units = self._term_units(term)
+            if not units:
+                continue
+            # 关键词的每个二元组都出现时才视为命中该关键词
+            term_matched = np.ones(self.doc_count, dtype=bool)
+            for unit in units:
+                tf = self._unit_tf(unit)
+                present = tf > 0
+                term_matched &= present
+                df = int(present.sum())
+                if not df:
+                    continue
+                idf = np.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+                scores += idf * tf * (_K1 + 1) / (tf + self._length_norm)
+            if require_all:
+                matched &= term_matched
+            else:
+                matched |= term_matched
+
+        candidates = np.flatnonzero(matched)
+        if not len(candidates):
+            return []
+        candidate_scores = scores[candidates]
+        if len(candidates) > limit:
+            top = np.argpartition(-candidate_scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.lexsort((candidates[top], -candidate_scores[top]))]
+        return [(self.codes[candidates[i]], float(candidate_scores[i])) for i in top]
+
+
+def benchmark_search(sample_file: str = "test_stock_base_info.json", size: int = 50000,
+                     rounds: int = 50) -> None:
+    """测试索引构建耗时和查询延迟，并与逐条字符串匹配对比"""
+    import tempfile
+    # 延迟导入，检索模块本身不依赖渲染模块
+    from stock_base_json_2_md import build_benchmark_data
+
+    data = build_benchmark_data(sample_file, size)
+    queries = ["锂电池", "银行 存款", "房地产 物业管理", "软件", "建筑 工程 施工"]
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        index_file = os.path.join(work_dir, "bench.idx")
+        start = time.perf_counter()
+        stats = build_search_index(data, index_file)
+        print(f"股票数量: {size}, 构建耗时 {time.perf_counter() - start:.2f}秒, "
+              f"词项 {stats['terms']}, 倒排记录 {stats['postings']}, 索引大小 {stats['size_mb']:.1f} MB")
+
+        start = time.perf_counter()
+        index = SearchIndex(index_file)
+        print(f"加载耗时 {(time.perf_counter() - start) * 1000:.2f}ms")
+
+        texts = {code: _document_text(stock_data) for code, stock_data in data.items()}
+        for query in queries:
+            latencies = []
+            for _ in range(rounds):
+                begin = time.perf_counter()
+                results = index.search(query)
+                latencies.append(time.perf_counter() - begin)
+            latencies.sort()
+
+            begin = time.perf_counter()
+            terms = normalize_text(query).split()
+            scanned = [code for code, text in texts.items() if all(term in text for term in terms)]
+            scan_time = time.perf_counter() - begin
+
+            print(f"  {query}: 命中前{len(results)}条, 中位数 {latencies[len(latencies) // 2] * 1000:.2f}ms, "
+                  f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f}ms, "
+                  f"逐条匹配 {scan_time * 1000:.1f}ms ({len(scanned)} 条)")
+        index.close()
+
+
+def main():
+    """命令行入口"""
+    command = sys.argv[1] if len(sys.argv) > 1 else "help"
+
+    if command == "build":
+        json_file = sys.argv[2] if len(sys.argv) > 2 else "stock_base_info.json"
+        index_file = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_INDEX_FILE
+        print(f"正在读取 {json_file}...")
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        start = time.perf_counter()
+        stats = build_search_index(data, index_file)
+        print(f"✓ 已生成索引 {index_file}: {stats['documents']} 只股票, {stats['terms']} 个词项, "
+              f"{stats['size_mb']:.2f} MB, 耗时 {time.perf_counter() - start:.2f}秒")
+    elif command == "search":
+        query = ' '.join(sys.argv[2:])
+        with SearchIndex() as index:
+            start = time.perf_counter()
+            results = index.search(query)
+            elapsed = (time.perf_counter() - start) * 1000
+        print(f"查询 \"{query}\" 共返回 {len(results)} 条, 耗时 {elapsed:.2f}ms")
+        for code, score in results:
+            print(f"  {code}  {score:.3f}")
+    elif command == "bench":
+        benchmark_search()
+    else:
+        print("使用方法:")
+        print("  python stock_base_search.py build [JSON文件] [索引文件]  # 生成索引")
+        print("  python stock_base_search.py search 锂电池 储能          # 多关键词检索")
+        print("  python stock_base_search.py bench                       # 性能测试")
+
+
+if __name__ == "__main__":
+    main()
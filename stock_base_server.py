@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+股票基础信息本地只读HTTP服务
+启动时加载一次stock_base_info.json，预先序列化每只股票的JSON字节并以内容哈希作为ETag，
+支持gzip压缩协商（压缩与未压缩的响应使用不同的ETag）和条件请求，数据文件变化后自动重新加载；附带压测命令统计吞吐量和延迟
+"""
+
+import os
+import json
+import gzip
+import time
+import random
+import hashlib
+import argparse
+import threading
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlsplit
+
+from stock_base_json_2_md import record_hash
+from stock_base_query import ANY, INDEX_FIELDS, StockQuery
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# 小于该字节数的响应不压缩
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+
+
+class StockDataset:
+    """一次加载的只读数据集：预序列化字节、ETag和查询索引"""
+
+    def __init__(self, json_file: str):
+        self.json_file = json_file
+        stat = os.stat(json_file)
+        self.file_signature = (stat.st_mtime_ns, stat.st_size)
+
+        with open(json_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        self.query = StockQuery(data)
+        self.codes = sorted(data)
+        # 股票代码 -> 序列化后的JSON字节
+        self.payloads: Dict[str, bytes] = {}
+        # 股票代码 -> ETag（带引号的内容哈希）
+        self.etags: Dict[str, str] = {}
+        for code, stock_data in data.items():
+            self.payloads[code] = json.dumps(stock_data, ensure_ascii=False).encode('utf-8')
+            self.etags[code] = f'"{record_hash(stock_data)}"'
+        # 单只股票的gzip结果按需生成后缓存
+        self._gzip_cache: Dict[str, bytes] = {}
+        self.loaded_at = time.strftime("%Y-%m-%d %H:%M:%S")
+
+    def gzip_payload(self, code: str) -> bytes:
+        """单只股票压缩后的字节，首次请求时生成"""
+        compressed = self._gzip_cache.get(code)
+        if compressed is None:
+            compressed = gzip.compress(self.payloads[code], GZIP_LEVEL, mtime=0)
+            self._gzip_cache[code] = compressed
+        return compressed
+
+    def batch(self, codes: List[str]) -> Tuple[bytes, str]:
+        """
+        拼接多只股票的预序列化字节
+
+        返回:
+            Tuple[bytes, str]: (响应体, 由各记录ETag组合得到的ETag)
+        """
+        found = [code for code in codes if code in self.payloads]
+        missing = [code for code in codes if code not in self.payloads]
+        parts = [b'{"count":', str(len(found)).encode(), b',"stocks":{']
+        parts.append(b','.join(b'"' + code.encode() + b'":' + self.payloads[code] for code in found))
+        parts.append(b'},"missing":')
+        parts.append(json.dumps(missing).encode())
+        parts.append(b'}')
+
+        digest = hashlib.sha1()
+        for code in found:
+            digest.update(code.encode())
+            digest.update(self.etags[code].encode())
+        digest.update(json.dumps(missing).encode())
+        return b''.join(parts), f'"{digest.hexdigest()}"'
+
+    def info(self) -> Dict[str, Any]:
+        """数据集状态"""
+        return {
+            'json_file': self.json_file,
+            'stocks': len(self.codes),
+            'loaded_at': self.loaded_at,
+            'file_mtime': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.file_signature[0] / 1e9)),
+        }
+
+
+class StockServer(ThreadingHTTPServer):
+    """持有当前数据集并在数据文件变化时重新加载的HTTP服务"""
+
+    daemon_threads = True
+
+    def __init__(self, json_file: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 reload_interval: float = 2.0, verbose: bool = False):
+        self.json_file = json_file
+        self.reload_interval = reload_interval
+        self.verbose = verbose
+        self.dataset = StockDataset(json_file)
+        self._stop_event = threading.Event()
+        super().__init__((host, port), StockRequestHandler)
+
+    def check_reload(self) -> bool:
+        """数据文件的修改时间或大小变化时重新加载，加载完成后整体替换数据集"""
+        try:
+            stat = os.stat(self.json_file)
+        except OSError:
+            return False
+        if (stat.st_mtime_ns, stat.st_size) == self.dataset.file_signature:
+            return False
+        try:
+            dataset = StockDataset(self.json_file)
+        except (OSError, ValueError) as e:
+            # 文件可能正在写入，保留旧数据集，下次检查时重试
+            print(f"✗ 重新加载 {self.json_file} 失败，继续使用旧数据: {e}")
+            return False
+        self.dataset = dataset
+        print(f"✓ 已重新加载 {self.json_file}，共 {len(dataset.codes)} 只股票")
+        return True
+
+    def _watch(self) -> None:
+        """后台线程定期检查数据文件"""
+        while not self._stop_event.wait(self.reload_interval):
+            self.check_reload()
+
+    def serve(self) -> None:
+        """启动服务直到Ctrl+C"""
+        watcher = threading.Thread(target=self._watch, daemon=True)
+        watcher.start()
+        host, port = self.server_address[:2]
+        print(f"✓ 已加载 {len(self.dataset.codes)} 只股票，服务地址 http://{host}:{port}")
+        try:
+            self.serve_forever()
+        except KeyboardInterrupt:
+            print("\n服务已停止")
+        finally:
+            self._stop_event.set()
+            self.server_close()
+
+
+class StockRequestHandler(BaseHTTPRequestHandler):
+    """
+    路由:
+        GET /stock/{code}                      单只股票
+        GET /stocks?codes=000001,600030        批量查询
+        GET /stocks?industry=...&province=...  按StockQuery索引条件过滤，逗号表示任一，*表示有值
+        GET /codes                             全部股票代码
+        GET /health                            数据集状态
+    """
+
+    protocol_version = "HTTP/1.1"
+    # 响应头和响应体分两次写出，keep-alive连接上需关闭Nagle算法，避免与延迟确认叠加产生约40ms等待
+    disable_nagle_algorithm = True
+    server: StockServer
+
+    def do_GET(self):
+        # 每个请求开始时取一次数据集引用，重新加载不会影响处理中的请求
+        dataset = self.server.dataset
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/')
+
+        if path.startswith('/stock/'):
+            code = path[len('/stock/'):]
+            if code not in dataset.payloads:
+                self._send_json(404, {'error': f'未找到股票 {code}'})
+                return
+            self._send_bytes(dataset.payloads[code], dataset.etags[code],
+                             lambda: dataset.gzip_payload(code))
+        elif path == '/stocks':
+            params = parse_qs(url.query)
+            codes = self._resolve_codes(dataset, params)
+            if codes is None:
+                return
+            body, etag = dataset.batch(codes)
+            self._send_bytes(body, etag)
+        elif path == '/codes':
+            self._send_json(200, dataset.codes)
+        elif path == '/health':
+            self._send_json(200, dataset.info())
+        else:
+            self._send_json(404, {'error': f'未知路径 {url.path}'})
+
+    def _resolve_codes(self, dataset: StockDataset, params: Dict[str, List[str]]) -> Optional[List[str]]:
+        """解析 codes 参数或过滤条件，参数错误时直接返回400"""
+        if 'codes' in params:
+            return [code.strip() for value in params['codes'] for code in value.split(',') if code.strip()]
+
+        criteria = {}
+        for name, values in params.items():
+            if name not in INDEX_FIELDS:
+                self._send_json(400, {'error': f'未知的过滤条件 {name}', 'available': list(INDEX_FIELDS)})
+                return None
+            value = values[-1]
+            criteria[name] = ANY if value == '*' else value.split(',') if ',' in value else value
+        return dataset.query.where(**criteria).codes()
+
+    def _accepts_gzip(self) -> bool:
+        """按Accept-Encoding的q值判断是否接受gzip，q=0表示不接受；未列出gzip时按*的q值"""
+        weights: Dict[str, float] = {}
+        for item in self.headers.get('Accept-Encoding', '').split(','):
+            coding, *params = [part.strip() for part in item.split(';')]
+            if not coding:
+                continue
+            weight = 1.0
+            for param in params:
+                name, _, value = param.partition('=')
+                if name.strip().lower() == 'q':
+                    try:
+                        weight = float(value)
+                    except ValueError:
+                        weight = 0.0
+            weights[coding.lower()] = weight
+        weight = weights.get('gzip', weights.get('x-gzip', weights.get('*', 0.0)))
+        return weight > 0
+
+    def _not_modified(self, etag: str) -> bool:
+        """If-None-Match 是否命中当前表示的ETag，按弱比较忽略 W/ 前缀"""
+        header = self.headers.get('If-None-Match')
+        if not header:
+            return False
+        if header.strip() == '*':
+            return True
+        candidates = [tag.strip() for tag in header.split(',')]
+        return any(tag == etag or tag == 'W/' + etag for tag in candidates)
+
+    def _send_bytes(self, body: bytes, etag: str, compressed=None) -> None:
+        """发送JSON字节，处理gzip协商和If-None-Match；gzip表示的ETag带 -gz 后缀，与未压缩表示区分"""
+        encoding = None
+        if self._accepts_gzip() and len(body) >= GZIP_MIN_SIZE:
+            encoding = 'gzip'
+            etag = etag[:-1] + '-gz"'
+
+        if self._not_modified(etag):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        if encoding:
+            body = compressed() if compressed else gzip.compress(body, GZIP_LEVEL, mtime=0)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        """发送不需要缓存的小型JSON响应"""
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """已排序数据的百分位数"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))
+    return sorted_values[index]
+
+
+def load_test(url: str = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", total_requests: int = 20000,
+              concurrency: int = 8, batch_size: int = 0, use_gzip: bool = False,
+              revalidate: bool = False, seed: int = 0) -> Dict[str, Any]:
+    """
+    对运行中的服务进行压测
+
+    参数:
+        url: 服务地址
+        total_requests: 总请求数
+        concurrency: 并发连接数，每个连接使用keep-alive
+        batch_size: 0表示请求 /stock/{code}，大于0表示每次批量请求该数量的代码
+        use_gzip: 是否发送 Accept-Encoding: gzip
+        revalidate: 是否携带上次响应的ETag发送条件请求
+        seed: 随机种子
+
+    返回:
+        Dict[str, Any]: 吞吐量、延迟分位数和状态码统计
+    """
+    target = urlsplit(url)
+    conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=10)
+    conn.request('GET', '/codes')
+    codes = json.loads(conn.getresponse().read())
+    conn.close()
+    if not codes:
+        raise ValueError("服务中没有股票数据")
+
+    per_worker = [total_requests // concurrency + (1 if i < total_requests % concurrency else 0)
+                  for i in range(concurrency)]
+    latencies: List[List[float]] = [[] for _ in range(concurrency)]
+    statuses: List[Dict[int, int]] = [{} for _ in range(concurrency)]
+    received = [0] * concurrency
+
+    def worker(index: int) -> None:
+        rng = random.Random(seed + index)
+        connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=10)
+        etags: Dict[str, str] = {}
+        for _ in range(per_worker[index]):
+            if batch_size:
+                path = '/stocks?codes=' + quote(','.join(rng.sample(codes, min(batch_size, len(codes)))), safe=',')
+            else:
+                path = f'/stock/{rng.choice(codes)}'
+            headers = {}
+            if use_gzip:
+                headers['Accept-Encoding'] = 'gzip'
+            if revalidate and path in etags:
+                headers['If-None-Match'] = etags[path]
+
+            begin = time.perf_counter()
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            body = response.read()
+            latencies[index].append(time.perf_counter() - begin)
+
+            statuses[index][response.status] = statuses[index].get(response.status, 0) + 1
+            received[index] += len(body)
+            etag = response.getheader('ETag')
+            if etag:
+                etags[path] = etag
+        connection.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = sorted(value for values in latencies for value in values)
+    status_counts: Dict[int, int] = {}
+    for counts in statuses:
+        for status, count in counts.items():
+            status_counts[status] = status_counts.get(status, 0) + count
+
+    return {
+        'requests': len(all_latencies),
+        'seconds': elapsed,
+        'requests_per_second': len(all_latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': _percentile(all_latencies, 50) * 1000,
+        'p99_ms': _percentile(all_latencies, 99) * 1000,
+        'max_ms': (all_latencies[-1] if all_latencies else 0.0) * 1000,
+        'received_mb': sum(received) / (1024 * 1024),
+        'statuses': status_counts,
+    }
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='股票基础信息本地只读HTTP服务')
+    subparsers = parser.add_subparsers(dest='command')
+
+    serve_parser = subparsers.add_parser('serve', help='启动服务')
+    serve_parser.add_argument('--json-file', default='stock_base_info.json', help='数据文件')
+    serve_parser.add_argument('--host', default=DEFAULT_HOST)
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('--reload-interval', type=float, default=2.0, help='检查数据文件变化的间隔（秒）')
+    serve_parser.add_argument('--verbose', action='store_true', help='打印每个请求的访问日志')
+
+    test_parser = subparsers.add_parser('loadtest', help='压测运行中的服务')
+    test_parser.add_argument('--url', default=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}")
+    test_parser.add_argument('--requests', type=int, default=20000, help='总请求数')
+    test_parser.add_argument('--concurrency', type=int, default=8, help='并发连接数')
+    test_parser.add_argument('--batch', type=int, default=0, help='每次批量请求的代码数，0为单只查询')
+    test_parser.add_argument('--gzip', action='store_true', help='请求gzip压缩')
+    test_parser.add_argument('--revalidate', action='store_true', help='携带ETag发送条件请求')
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        StockServer(args.json_file, args.host, args.port, args.reload_interval, args.verbose).serve()
+    elif args.command == 'loadtest':
+        result = load_test(args.url, args.requests, args.concurrency, args.batch, args.gzip, args.revalidate)
+        print(f"请求数: {result['requests']}, 耗时 {result['seconds']:.2f}秒")
+        print(f"吞吐量: {result['requests_per_second']:.0f} 请求/秒")
+        print(f"延迟: p50 {result['p50_ms']:.2f}ms, p99 {result['p99_ms']:.2f}ms, 最大 {result['max_ms']:.2f}ms")
+        print(f"接收数据: {result['received_mb']:.1f} MB, 状态码: {result['statuses']}")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,764 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据源插件注册表与并发获取引擎
+每个数据源以插件形式登记：名称、字段前缀、限速类别、股票代码->接口参数的转换函数、接口调用和结果提取函数。
+逐只股票的数据源按 (股票, 数据源) 调度，同一限速类别（同一网站）的请求共享一个限速器，不同网站之间并发进行；
+一次返回全市场数据的数据源（全表数据源）每次运行只请求一次，以向量化合并关联到股票记录。
+单只股票获取（stock_base_handle）和批量获取（stock_base_multi_handle）都由同一个引擎调度
+"""
+
+import sys
+import time
+import random
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import akshare as ak
+import numpy as np
+import pandas as pd
+
+from stock_base_cninfo import CNINFO_FIELDS, extract_profile_fields
+from stock_base_concurrency import AIMDController, is_throttle_error
+from stock_base_metrics import METRICS
+from stock_base_register import NAME_KEY_FIELDS, REGISTER_FIELDS, join_register_table, load_register_table
+from stock_base_timeout import (DEFAULT_CALL_TIMEOUT, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT,
+                                DEFAULT_TABLE_TIMEOUT, CallTimeoutError, call_with_timeout, is_timeout_error,
+                                set_request_timeouts)
+from stock_base_xqinfo import XQINFO_FIELDS, extract_basic_info
+from stock_code_market import normalize_codes, xueqiu_symbol
+
+# 限速类别：同一网站的接口共享请求间隔
+RATE_CNINFO = 'cninfo'
+RATE_XUEQIU = 'xueqiu'
+RATE_EASTMONEY = 'eastmoney'
+
+
+class StockSource:
+    """数据源插件"""
+
+    def __init__(self, name: str, prefix: str, rate_class: str,
+                 fetch: Callable[..., Any], extract: Optional[Callable[[Any, str], Optional[Dict[str, Any]]]] = None,
+                 symbol: Callable[[str], Any] = str,
+                 join: Optional[Callable[[Dict[str, Dict[str, Any]], Any], pd.DataFrame]] = None,
+                 fields: Iterable[str] = (), requires: Iterable[str] = (),
+                 default: bool = False, description: str = ''):
+        """
+        参数:
+            name: 数据源名称，命令行 --sources 使用
+            prefix: 字段前缀，如 cninfo_
+            rate_class: 限速类别，同一类别的请求共享限速器
+            fetch: 接口调用函数，参数为 symbol(股票代码) 的返回值；全表数据源不带参数
+            extract: 从接口返回数据中提取字段的函数 (原始数据, 股票代码) -> {字段名(不含前缀): 值}
+            symbol: 股票代码转换为接口参数的函数
+            join: 全表数据源的关联函数 (股票数据, 接口返回的全表) -> 以股票代码为索引、字段名(不含前缀)为列的
+                  DataFrame，只包含关联上的股票。设置后每次运行只调用一次接口，不逐只股票请求
+            fields: 提供的字段名（不含前缀），用于按字段选择数据源
+            requires: 关联时依赖的其他数据源字段（带前缀），按字段选择时一并获取
+            default: 未指定数据源时是否默认获取
+            description: 说明
+        """
+        self.name = name
+        self.prefix = prefix
+        self.rate_class = rate_class
+        self.fetch = fetch
+        self.extract = extract
+        self.symbol = symbol
+        self.join = join
+        self.fields = list(fields)
+        self.requires = list(requires)
+        self.default = default
+        self.description = description
+
+    @property
+    def is_table(self) -> bool:
+        """是否为全表数据源"""
+        return self.join is not None
+
+    def __repr__(self) -> str:
+        return f"StockSource({self.name!r}, prefix={self.prefix!r}, rate_class={self.rate_class!r})"
+
+
+SOURCE_REGISTRY: Dict[str, StockSource] = {}
+
+
+def register_source(source: StockSource) -> StockSource:
+    """登记数据源插件，名称或字段前缀重复时报错"""
+    if source.name in SOURCE_REGISTRY:
+        raise ValueError(f"数据源 {source.name} 已登记")
+    for other in SOURCE_REGISTRY.values():
+        if source.prefix.startswith(other.prefix) or other.prefix.startswith(source.prefix):
+            raise ValueError(f"数据源 {source.name} 的字段前缀 {source.prefix} 与 {other.name} 冲突")
+    SOURCE_REGISTRY[source.name] = source
+    return source
+
+
+def default_source_names() -> List[str]:
+    """未指定数据源时默认获取的数据源"""
+    return [name for name, source in SOURCE_REGISTRY.items() if source.default]
+
+
+def resolve_sources(names: Optional[Iterable[str]] = None) -> List[StockSource]:
+    """
+    将数据源名称解析为插件列表
+
+    参数:
+        names: 数据源名称列表或逗号分隔的字符串，None为默认数据源，all为全部数据源
+
+    返回:
+        List[StockSource]: 按登记顺序排列、去重后的插件列表
+    """
+    if names is None:
+        names = default_source_names()
+    elif isinstance(names, str):
+        names = [name.strip() for name in names.split(',') if name.strip()]
+    names = list(names)
+    if 'all' in names:
+        names = list(SOURCE_REGISTRY)
+
+    unknown = [name for name in names if name not in SOURCE_REGISTRY]
+    if unknown:
+        raise ValueError(f"未知数据源: {', '.join(unknown)}，可用数据源: {', '.join(SOURCE_REGISTRY)}")
+    if not names:
+        raise ValueError("至少需要指定一个数据源")
+    return [source for name, source in SOURCE_REGISTRY.items() if name in names]
+
+
+# 批量获取时每条记录都有的基本字段，不属于任何数据源
+BASE_FIELDS = ['code', 'name', 'market', 'update_time']
+
+
+def resolve_fields(fields: Iterable[str]) -> Tuple[List[StockSource], Dict[str, List[str]]]:
+    """
+    将字段名解析为需要请求的最少数据源
+
+    参数:
+        fields: 带前缀的字段名列表或逗号分隔的字符串，支持 cninfo_* 形式选择一个数据源的全部字段
+
+    返回:
+        Tuple[List[StockSource], Dict[str, List[str]]]:
+            (按登记顺序排列的数据源, {数据源名称: 需要的字段名(不含前缀)})
+    """
+    if isinstance(fields, str):
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+    fields = list(fields)
+    projection: Dict[str, List[str]] = {}
+    unknown = []
+    # 关联依赖的字段追加到末尾，循环中继续解析
+    for field in fields:
+        if field in BASE_FIELDS:
+            continue
+        source = next((source for source in SOURCE_REGISTRY.values() if field.startswith(source.prefix)), None)
+        name = field[len(source.prefix):] if source else None
+        if source is None or (name != '*' and name not in source.fields):
+            unknown.append(field)
+            continue
+        wanted = projection.setdefault(source.name, [])
+        for item in (source.fields if name == '*' else [name]):
+            if item not in wanted:
+                wanted.append(item)
+        fields.extend(required for required in source.requires if required not in fields)
+
+    if unknown:
+        raise ValueError(f"未知字段: {', '.join(unknown)}，字段需为数据源提供的字段并带前缀，"
+                         f"如 {', '.join(source.prefix + '*' for source in SOURCE_REGISTRY.values())}")
+    if not projection:
+        raise ValueError("至少需要指定一个数据源字段")
+    return [source for name, source in SOURCE_REGISTRY.items() if name in projection], projection
+
+
+def json_value(value: Any) -> Any:
+    """接口返回的numpy数值、日期、NaN转换为可JSON序列化的值"""
+    if value is pd.NaT:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _yyyymmdd(value: Any) -> Any:
+    """20100106 形式的日期转换为 2010-01-06，其他值原样返回"""
+    text = str(value)
+    if len(text) == 8 and text.isdigit():
+        return f"{text[:4]}-{text[4:6]}-{text[6:]}"
+    return value
+
+
+# ---------------------------------------------------------------- 数据源插件
+
+def _extract_cninfo(df: pd.DataFrame, code: str) -> Dict[str, Any]:
+    return extract_profile_fields(df)
+
+
+def _extract_xqinfo(df: pd.DataFrame, code: str) -> Dict[str, Any]:
+    return extract_basic_info(df)
+
+
+# 东方财富个股信息 item -> 字段名，不保存最新价等行情字段
+EM_FIELDS = {
+    '总股本': 'total_shares',
+    '流通股': 'float_shares',
+    '总市值': 'total_market_cap',
+    '流通市值': 'float_market_cap',
+    '行业': 'industry',
+    '上市时间': 'list_date',
+}
+
+
+def _extract_em(df: pd.DataFrame, code: str) -> Dict[str, Any]:
+    if df.empty:
+        return {}
+    items = dict(zip(df['item'], df['value']))
+    result = {field: items.get(item) for item, field in EM_FIELDS.items()}
+    result['list_date'] = _yyyymmdd(result['list_date'])
+    return result
+
+
+# 实际控制人持股变动列名 -> 字段名
+HOLD_CONTROL_FIELDS = {
+    '实际控制人名称': 'actual_controller',
+    '直接控制人名称': 'direct_controller',
+    '控制类型': 'control_type',
+    '控股数量': 'holding_shares',
+    '控股比例': 'holding_ratio',
+    '变动日期': 'change_date',
+}
+
+
+def _fetch_hold_control() -> pd.DataFrame:
+    """获取全市场实际控制人持股变动，每只股票保留最近一次变动，以股票代码为索引"""
+    df = ak.stock_hold_control_cninfo(symbol='全部')
+    latest = (df.assign(证券代码=normalize_codes(df['证券代码']))
+              .sort_values('变动日期', kind='stable', na_position='first')
+              .drop_duplicates('证券代码', keep='last'))
+    return latest.set_index('证券代码').rename(columns=HOLD_CONTROL_FIELDS)[list(HOLD_CONTROL_FIELDS.values())]
+
+
+def join_by_code(stock_data: Dict[str, Dict[str, Any]], table: pd.DataFrame) -> pd.DataFrame:
+    """以股票代码为索引的全表直接按代码关联"""
+    return table[table.index.isin(pd.Index(list(stock_data)))]
+
+
+def _fetch_register() -> pd.DataFrame:
+    return load_register_table()
+
+
+# 巨潮资讯上市相关列名 -> 字段名
+IPO_SUMMARY_FIELDS = {
+    '招股公告日期': 'prospectus_date',
+    '上网发行日期': 'issue_date',
+    '上市日期': 'list_date',
+    '每股面值': 'par_value',
+    '总发行数量': 'issue_shares',
+    '发行价格': 'issue_price',
+    '摊薄发行市盈率': 'issue_pe',
+    '募集资金净额': 'net_proceeds',
+    '发行费用总额': 'issue_cost',
+    '发行前每股净资产': 'nav_before_issue',
+    '发行后每股净资产': 'nav_after_issue',
+    '上网发行中签率': 'lottery_rate',
+    '主承销商': 'underwriter',
+}
+
+
+def _fetch_ipo_summary(symbol: str) -> pd.DataFrame:
+    try:
+        return ak.stock_ipo_summary_cninfo(symbol=symbol)
+    except IndexError:
+        # 接口对没有发行记录的股票返回空列表
+        return pd.DataFrame()
+
+
+def _extract_ipo_summary(df: pd.DataFrame, code: str) -> Dict[str, Any]:
+    if df.empty:
+        return {}
+    row = df.iloc[0]
+    return {field: row.get(column) for column, field in IPO_SUMMARY_FIELDS.items()}
+
+
+register_source(StockSource(
+    'cninfo', 'cninfo_', RATE_CNINFO, lambda symbol: ak.stock_profile_cninfo(symbol=symbol), _extract_cninfo,
+    fields=[field for _, field in CNINFO_FIELDS], default=True, description='巨潮资讯公司概况 stock_profile_cninfo'))
+register_source(StockSource(
+    'xqinfo', 'xqinfo_', RATE_XUEQIU, lambda symbol: ak.stock_individual_basic_info_xq(symbol=symbol),
+    _extract_xqinfo, symbol=xueqiu_symbol, fields=XQINFO_FIELDS, default=True,
+    description='雪球公司概况 stock_individual_basic_info_xq'))
+register_source(StockSource(
+    'em', 'em_', RATE_EASTMONEY, lambda symbol: ak.stock_individual_info_em(symbol=symbol), _extract_em,
+    fields=EM_FIELDS.values(),
+    description='东方财富个股信息 stock_individual_info_em（股本、市值、行业）'))
+register_source(StockSource(
+    'hold_control', 'control_', RATE_CNINFO, _fetch_hold_control, join=join_by_code,
+    fields=HOLD_CONTROL_FIELDS.values(),
+    description='巨潮资讯实际控制人持股变动 stock_hold_control_cninfo（全表）'))
+register_source(StockSource(
+    'ipo_summary', 'ipo_', RATE_CNINFO, _fetch_ipo_summary, _extract_ipo_summary,
+    fields=IPO_SUMMARY_FIELDS.values(),
+    description='巨潮资讯上市相关 stock_ipo_summary_cninfo（发行价、募资、承销商）'))
+# 注册表按公司全称关联，按字段选择时只额外请求巨潮资讯公司名称
+register_source(StockSource(
+    'register', 'register_', RATE_EASTMONEY, _fetch_register, join=join_register_table,
+    fields=REGISTER_FIELDS, requires=NAME_KEY_FIELDS[:1],
+    description='沪深京IPO注册表 stock_register_sh/sz/bj（全表，按公司全称关联，本地缓存）'))
+
+
+# ---------------------------------------------------------------- 限速与调度
+
+class SmartDelayController:
+    """智能延迟控制器"""
+
+    def __init__(self, base_delay: float = 1.0, max_delay: float = 5.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.current_delay = base_delay
+        self.consecutive_errors = 0
+        self.request_times = []
+
+    def get_delay(self) -> float:
+        """获取当前应该使用的延迟时间"""
+        # 添加随机变化，避免固定模式
+        random_factor = random.uniform(0.7, 1.3)
+        delay = min(self.current_delay * random_factor, self.max_delay)
+
+        # 如果最近请求过于频繁，适当增加延迟
+        if len(self.request_times) >= 3:
+            recent_requests = self.request_times[-3:]
+            if recent_requests[-1] - recent_requests[0] < 2:  # 3次请求在2秒内
+                delay *= 1.5
+
+        return max(delay, 0.1)  # 最小延迟0.1秒
+
+    def record_success(self):
+        """记录成功请求"""
+        self.consecutive_errors = 0
+        self.current_delay = max(self.current_delay * 0.95, self.base_delay)  # 逐渐恢复
+        self.request_times.append(time.time())
+        # 只保留最近的请求记录
+        self.request_times = self.request_times[-10:]
+
+    def record_error(self):
+        """记录错误请求"""
+        self.consecutive_errors += 1
+        # 连续错误时增加延迟
+        if self.consecutive_errors >= 2:
+            self.current_delay = min(self.current_delay * 1.5, self.max_delay)
+
+
+class RateLimiter:
+    """
+    同一限速类别的请求节流：限制同时进行的请求数，相邻两次请求的开始时间间隔由智能延迟控制器决定
+
+    传入AIMD控制器时并发数随延迟和限流信号自适应，请求间隔为固定间隔模式的间隔除以控制器的并发上限，
+    即并发和请求速率同步增减，上限低于1时只拉长间隔。
+    超过总时限被放弃的调用仍在执行时继续占用名额，结束后才归还，同一网站实际在途的请求数不超过并发上限
+    """
+
+    def __init__(self, name: str, delay: float, max_delay: float, concurrency: int = 1,
+                 adaptive: Optional[AIMDController] = None):
+        self.name = name
+        self.controller = SmartDelayController(base_delay=delay, max_delay=max_delay)
+        self.adaptive = adaptive
+        self.enabled = delay > 0
+        self._concurrency = concurrency
+        self._slots = threading.Semaphore(concurrency)
+        self._available = threading.Condition()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+        self._local = threading.local()
+
+    def __enter__(self):
+        entered = time.monotonic()
+        if self.adaptive is None:
+            self._slots.acquire()
+        else:
+            with self._available:
+                while self._in_flight >= self.adaptive.concurrency:
+                    self._available.wait()
+                self._in_flight += 1
+        if self.enabled:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start)
+                # 自适应时为固定间隔模式的间隔除以并发上限，上限最低为1时与固定间隔相同
+                interval = self.controller.get_delay()
+                if self.adaptive is not None:
+                    interval /= self.adaptive.limit
+                self._next_start = start + interval
+            time.sleep(start - now)
+        self._local.start = time.monotonic()
+        # 等待并发名额和请求间隔的时间
+        METRICS.observe('rate_limit_wait', self._local.start - entered, rate_class=self.name)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self.adaptive is not None:
+                latency = time.monotonic() - self._local.start
+                with self._available:
+                    self.adaptive.record(latency, error=exc is not None,
+                                         throttled=exc is not None and is_throttle_error(exc))
+        finally:
+            # 名额一定归还，否则同一网站的请求会全部卡在等待名额上
+            abandoned = getattr(exc, 'future', None) if isinstance(exc, CallTimeoutError) else None
+            if abandoned is not None:
+                abandoned.add_done_callback(lambda _: self._release())
+            else:
+                self._release()
+        return False
+
+    def _release(self) -> None:
+        """归还并发名额"""
+        if self.adaptive is None:
+            self._slots.release()
+            return
+        with self._available:
+            self._in_flight -= 1
+            self._available.notify_all()
+
+    def record_success(self):
+        with self._lock:
+            self.controller.record_success()
+
+    def record_error(self):
+        with self._lock:
+            self.controller.record_error()
+
+    @property
+    def current_delay(self) -> float:
+        return self.controller.current_delay
+
+    @property
+    def concurrency(self) -> int:
+        """当前并发上限"""
+        return self.adaptive.concurrency if self.adaptive is not None else self._concurrency
+
+    def describe(self) -> str:
+        """批量获取时显示的限速状态"""
+        text = f"{self.name} {self.current_delay:.2f}秒"
+        if self.adaptive is not None:
+            text += f"/并发{self.adaptive.concurrency}/限流{self.adaptive.throttle_count}次"
+        return text
+
+
+class SourceEngine:
+    """
+    多数据源并发获取引擎
+
+    每个 (股票, 数据源) 是一个任务，由线程池执行；同一限速类别的任务经同一限速器排队，
+    不同网站的请求并发进行。批量获取时同时在途的股票数有上限，股票的所有数据源完成后按完成顺序返回。
+    全表数据源每个引擎只请求一次，由 merge_tables 关联到股票记录。
+    时间或请求数预算用完、或调用 stop() 后不再提交新的股票、不再重试，在途的请求完成后结束
+    """
+
+    def __init__(self, sources: Optional[Iterable[str]] = None, delay: float = 2.0, max_delay: float = 10.0,
+                 max_retries: int = 3, max_workers: Optional[int] = None, verbose: bool = True,
+                 fields: Optional[Iterable[str]] = None, time_budget: Optional[float] = None,
+                 request_budget: Optional[int] = None, adaptive: bool = False, max_concurrency: int = 8,
+                 latency_target: float = 3.0, connect_timeout: Optional[float] = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: Optional[float] = DEFAULT_READ_TIMEOUT,
+                 call_timeout: Optional[float] = DEFAULT_CALL_TIMEOUT):
+        """
+        参数:
+            sources: 数据源名称，None为默认数据源；指定fields时为可用数据源的范围
+            delay: 同一网站相邻两次请求的基础间隔（秒），0表示不限速
+            max_delay: 出错退避时的最大间隔（秒）
+            max_retries: 每个数据源的最大尝试次数
+            max_workers: 线程数，默认为逐只股票数据源数的2倍
+            verbose: 是否打印重试和失败信息
+            fields: 只获取这些字段（带前缀），只请求提供这些字段的数据源，结果中只保留这些字段
+            time_budget: 时间预算（秒），自引擎创建起计时，None为不限
+            request_budget: 请求数预算（含重试），None为不限
+            adaptive: 是否按AIMD自适应调整每个网站的并发数，默认每个网站同时只有一个请求
+            max_concurrency: 自适应时每个网站的并发上限
+            latency_target: 自适应时请求延迟中位数的目标（秒），超过时缩减并发
+            connect_timeout / read_timeout: 接口内部未指定超时的HTTP请求的连接、读取超时（秒），进程内全局生效
+            call_timeout: 单次接口调用的总时限（秒），超时即放弃等待、按临时失败重试；全表数据源至少为5分钟
+        """
+        # 字段投影：{数据源名称: 保留的字段名集合}，None表示保留全部字段
+        self.projection: Optional[Dict[str, set]] = None
+        if fields is None:
+            self.sources = resolve_sources(sources)
+        else:
+            self.sources, projection = resolve_fields(fields)
+            allowed = {source.name for source in resolve_sources(sources)} if sources is not None else None
+            outside = [source.name for source in self.sources if allowed is not None and source.name not in allowed]
+            if outside:
+                raise ValueError(f"所选字段需要数据源 {', '.join(outside)}，不在指定的数据源中")
+            self.projection = {name: set(wanted) for name, wanted in projection.items()}
+        self.stock_sources = [source for source in self.sources if not source.is_table]
+        self.table_sources = [source for source in self.sources if source.is_table]
+        self.max_retries = max_retries
+        set_request_timeouts(connect_timeout, read_timeout)
+        self.call_timeout = call_timeout
+        self.timeout_counts = {source.name: 0 for source in self.sources}
+        # 自适应时线程数需足够让每个网站达到并发上限
+        self.max_workers = max_workers or max((max_concurrency if adaptive else 2) * len(self.stock_sources), 1)
+        self.verbose = verbose
+        self.limiters = {
+            rate_class: RateLimiter(rate_class, delay, max_delay,
+                                    adaptive=AIMDController(max_limit=max_concurrency, latency_target=latency_target)
+                                    if adaptive else None)
+            for rate_class in dict.fromkeys(source.rate_class for source in self.sources)
+        }
+        self._tables: Dict[str, Any] = {}
+        self.request_budget = request_budget
+        self.request_count = 0
+        self._deadline = time.monotonic() + time_budget if time_budget else None
+        self._stop_reason: Optional[str] = None
+        self._count_lock = threading.Lock()
+
+    @property
+    def source_names(self) -> List[str]:
+        return [source.name for source in self.sources]
+
+    def describe_timeouts(self) -> str:
+        """各数据源的超时次数"""
+        return ', '.join(f"{name} {count}次" for name, count in self.timeout_counts.items())
+
+    @property
+    def stop_reason(self) -> Optional[str]:
+        """提前停止的原因，未停止时为None"""
+        return self._stop_reason
+
+    def stop(self, reason: str) -> None:
+        """停止提交新的股票和重试，可在信号处理函数或其他线程中调用"""
+        if self._stop_reason is None:
+            self._stop_reason = reason
+
+    def _budget_exhausted(self, reserved: int = 0) -> bool:
+        """
+        检查是否应停止，预算用完时记录停止原因
+
+        参数:
+            reserved: 即将发起的请求数，与已发起的请求一起不能超过请求预算
+        """
+        if self._stop_reason is None:
+            if self._deadline is not None and time.monotonic() >= self._deadline:
+                self.stop("时间预算已用完")
+            elif self.request_budget is not None and self.request_count + reserved > self.request_budget:
+                self.stop(f"请求预算已用完 ({self.request_budget} 次)")
+        return self._stop_reason is not None
+
+    def _with_retries(self, source: StockSource, label: str, call: Callable[[], Any]) -> Tuple[Any, Optional[str]]:
+        """经限速器调用接口，超过总时限放弃等待，失败时退避重试，返回 (结果, 错误信息)；停止后不再重试"""
+        limiter = self.limiters[source.rate_class]
+        timeout = self.call_timeout
+        if source.is_table and timeout is not None:
+            timeout = max(timeout, DEFAULT_TABLE_TIMEOUT)
+        last_error = None
+        for attempt in range(1, self.max_retries + 1):
+            if attempt > 1 and self._budget_exhausted(reserved=1):
+                break
+            with self._count_lock:
+                self.request_count += 1
+            METRICS.inc('request', source=source.name)
+            try:
+                with limiter:
+                    result = call_with_timeout(call, timeout)
+                limiter.record_success()
+                return result, None
+            except Exception as e:
+                last_error = str(e) or type(e).__name__
+                throttled = is_throttle_error(e)
+                if not (throttled and limiter.adaptive is not None):
+                    # 自适应时限流已由并发上限减半和冷却处理，不再叠加拉长基础间隔
+                    limiter.record_error()
+                METRICS.inc('error', source=source.name)
+                if is_timeout_error(e):
+                    # 超时属于临时失败，计数后照常重试
+                    with self._count_lock:
+                        self.timeout_counts[source.name] += 1
+                    METRICS.inc('timeout', source=source.name)
+                if throttled:
+                    METRICS.inc('throttle', source=source.name)
+                if self.verbose:
+                    print(f"  ✗ {label} {source.name} 第{attempt}次失败: {last_error}")
+                if limiter.adaptive is not None and attempt < self.max_retries and throttled:
+                    # 被限流后等上游的统计窗口过去再重试，避免重试继续加重过载
+                    with METRICS.timer('throttle_cooldown', rate_class=source.rate_class):
+                        time.sleep(limiter.adaptive.cooldown)
+        return None, last_error
+
+    def _project(self, source: StockSource, fields: Iterable[str]) -> List[str]:
+        """字段投影后需要保留的字段（不含前缀）"""
+        if self.projection is None:
+            return list(fields)
+        return [field for field in fields if field in self.projection[source.name]]
+
+    def fetch_source(self, source: StockSource, code: str) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        获取单只股票的单个数据源，失败时退避重试
+
+        返回:
+            Tuple[Dict[str, Any], Optional[str]]: (带前缀的字段, 错误信息)；
+            接口正常返回但没有该股票数据时字段为空、错误为None
+        """
+        def call():
+            # 接口请求（含akshare解析）和字段提取分开统计
+            with METRICS.timer('fetch', source=source.name):
+                raw = source.fetch(source.symbol(code))
+            with METRICS.timer('extract', source=source.name):
+                return source.extract(raw, code)
+
+        extracted, error = self._with_retries(source, code, call)
+        extracted = extracted or {}
+        fields = {source.prefix + field: json_value(extracted[field]) for field in self._project(source, extracted)}
+        return fields, error
+
+    def fetch_table(self, source: StockSource) -> Tuple[Any, Optional[str]]:
+        """获取全表数据源，成功后在引擎内缓存，返回 (全表, 错误信息)"""
+        if source.name not in self._tables:
+            def call():
+                with METRICS.timer('fetch', source=source.name):
+                    return source.fetch()
+
+            table, error = self._with_retries(source, '全表', call)
+            if error:
+                return None, error
+            self._tables[source.name] = table
+        return self._tables[source.name], None
+
+    def merge_tables(self, stock_data: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        将全表数据源关联到股票记录，直接更新 stock_data 中的记录
+
+        返回:
+            Dict[str, Dict[str, Any]]: {数据源: {"matched": 关联上的股票数} 或 {"error": 错误信息}}
+        """
+        report = {}
+        for source in self.table_sources:
+            table, error = self.fetch_table(source)
+            if error:
+                report[source.name] = {'error': error}
+                continue
+            try:
+                with METRICS.timer('table_join', source=source.name):
+                    joined = source.join(stock_data, table)
+                joined = joined[self._project(source, joined.columns)]
+                joined.columns = [source.prefix + column for column in joined.columns]
+                rows = joined.to_dict('index')
+            except Exception as e:
+                # 关联出错不影响已获取的逐只数据，与获取失败一样记入报告
+                METRICS.inc('error', source=source.name)
+                report[source.name] = {'error': f"关联失败: {e}"}
+                continue
+            for code, fields in rows.items():
+                stock_data[code].update({field: json_value(value) for field, value in fields.items()})
+            report[source.name] = {'matched': len(joined)}
+        return report
+
+    def run(self, codes: Iterable[str],
+            max_pending: Optional[int] = None) -> Iterator[Tuple[str, Dict[str, Any], Dict[str, str]]]:
+        """
+        并发获取多只股票
+
+        参数:
+            codes: 股票代码
+            max_pending: 同时在途的股票数上限，默认等于线程数
+
+        返回:
+            Iterator: 按完成顺序逐只返回 (股票代码, 带前缀的字段, {数据源: 错误信息})
+        """
+        if not self.stock_sources:
+            # 只有全表数据源时不需要逐只请求
+            for code in codes:
+                if self._budget_exhausted():
+                    return
+                yield code, {}, {}
+            return
+
+        codes = iter(codes)
+        max_pending = max_pending or self.max_workers
+        futures = {}
+        states: Dict[str, Dict[str, Any]] = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        def submit_next() -> bool:
+            # 新股票的每个数据源至少一次请求，连同已提交尚未开始的任务一起计入请求预算
+            queued = sum(1 for future in futures if not future.running() and not future.done())
+            if self._budget_exhausted(reserved=queued + len(self.stock_sources)):
+                return False
+            code = next(codes, None)
+            if code is None:
+                return False
+            states[code] = {'results': {}, 'errors': {}, 'remaining': len(self.stock_sources)}
+            for source in self.stock_sources:
+                futures[executor.submit(self.fetch_source, source, code)] = (code, source)
+            return True
+
+        try:
+            while len(states) < max_pending and submit_next():
+                pass
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    code, source = futures.pop(future)
+                    fields, error = future.result()
+                    state = states[code]
+                    state['results'][source.name] = fields
+                    if error:
+                        state['errors'][source.name] = error
+                    state['remaining'] -= 1
+                    if state['remaining'] == 0:
+                        del states[code]
+                        # 字段按数据源登记顺序合并，与完成顺序无关
+                        merged, errors = {}, {}
+                        for source in self.stock_sources:
+                            merged.update(state['results'][source.name])
+                            if source.name in state['errors']:
+                                errors[source.name] = state['errors'][source.name]
+                        yield code, merged, errors
+                        submit_next()
+        finally:
+            # 提前结束（中断、调用方不再迭代）时取消排队中的任务，只等待正在进行的请求
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def fetch_stock(self, code: str) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """并发获取单只股票的所有数据源，返回 (带前缀的字段, {数据源: 错误信息})"""
+        fields, errors = {}, {}
+        for _, fields, errors in self.run([code]):
+            break
+        if self.table_sources:
+            for name, result in self.merge_tables({code: fields}).items():
+                if 'error' in result:
+                    errors[name] = result['error']
+        return fields, errors
+
+
+def print_sources() -> None:
+    """打印已登记的数据源"""
+    print("已登记的数据源 (* 为默认):")
+    for name, source in SOURCE_REGISTRY.items():
+        mark = '*' if source.default else ' '
+        print(f"  {mark} {name:<13} 前缀 {source.prefix:<10} 限速类别 {source.rate_class:<10} {source.description}")
+
+
+def main():
+    """命令行入口"""
+    if len(sys.argv) < 2 or sys.argv[1] in ('list', 'help'):
+        print_sources()
+        print("\n使用方法: python stock_base_sources.py <股票代码> [数据源,数据源|all]")
+        return
+
+    code = sys.argv[1]
+    engine = SourceEngine(sys.argv[2] if len(sys.argv) > 2 else None, delay=0)
+    start = time.perf_counter()
+    fields, errors = engine.fetch_stock(code)
+    print(f"{code}: {len(fields)} 个字段, 耗时 {time.perf_counter() - start:.2f}秒")
+    for field, value in fields.items():
+        print(f"  {field}: {value}")
+    for name, error in errors.items():
+        print(f"  ✗ {name}: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+股票基础信息统计
+将股票数据一次性转换为列式DataFrame，以向量化运算计算市场、行业、省份分布，
+各字段填充率，注册资本和员工人数分位数以及上市年份分布，并输出JSON统计报告
+"""
+
+import os
+import sys
+import json
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from stock_base_query import PROVINCE_SUFFIX_PATTERN
+from stock_base_normalize import CHINA_TZ_NAME, INDUSTRY_NAME_FIELD, NORMALIZED_FLAG
+
+# 记录元信息字段，不计入数据字段数量
+META_FIELDS = ['code', 'name', 'market', 'update_time', 'status', 'error', NORMALIZED_FLAG]
+FAILED_STATUSES = ['failed', 'error']
+
+QUANTILES = [0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0]
+# 分布统计最多保留的类别数量，其余合并为"其他"
+TOP_CATEGORIES = 30
+
+
+def default_stats_file(output_file: str) -> str:
+    """根据数据文件路径推导统计报告路径，如 stock_base_info_stats.json"""
+    return os.path.splitext(output_file)[0] + "_stats.json"
+
+
+def to_frame(stock_data: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+    """股票数据转换为以股票代码为索引的DataFrame，每个字段一列"""
+    # from_records按行批量构建，比from_dict(orient='index')逐个嵌套字典构建快数倍
+    df = pd.DataFrame.from_records(list(stock_data.values()), index=pd.Index(list(stock_data), name='code'))
+    return df
+
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    """取列，不存在时返回全空列"""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(np.nan, index=df.index, dtype=object)
+
+
+def _text(series: pd.Series) -> pd.Series:
+    """空字符串视为缺失"""
+    return series.mask(series.eq(''))
+
+
+def _distribution(series: pd.Series, top: int = TOP_CATEGORIES) -> Dict[str, int]:
+    """类别分布，按数量降序，超出部分合并为"其他"，缺失值计入"未知" """
+    counts = series.fillna('未知').value_counts()
+    result = counts.iloc[:top]
+    distribution = {str(key): int(value) for key, value in result.items()}
+    rest = int(counts.iloc[top:].sum())
+    if rest:
+        distribution['其他'] = distribution.get('其他', 0) + rest
+    return distribution
+
+
+def _quantiles(series: pd.Series) -> Dict[str, Any]:
+    """数值列的数量、均值和分位数"""
+    values = pd.to_numeric(series, errors='coerce').dropna()
+    if values.empty:
+        return {'count': 0}
+    quantiles = values.quantile(QUANTILES)
+    return {
+        'count': int(len(values)),
+        'mean': round(float(values.mean()), 2),
+        'quantiles': {f"p{int(q * 100)}": round(float(value), 2) for q, value in quantiles.items()},
+    }
+
+
+def affiliate_industry_names(df: pd.DataFrame) -> pd.Series:
+    """雪球所属行业名称列，兼容规范化后展开的行业名称字段"""
+    industry = _column(df, 'xqinfo_affiliate_industry')
+    names = industry.map(lambda value: value.get('ind_name') if isinstance(value, dict) else np.nan)
+    return names.fillna(_column(df, INDUSTRY_NAME_FIELD))
+
+
+def _normalized_mask(df: pd.DataFrame) -> pd.Series:
+    """已规范化记录的布尔列"""
+    return _column(df, NORMALIZED_FLAG).notna()
+
+
+def capital_wan(df: pd.DataFrame) -> pd.Series:
+    """注册资本（万元）：优先巨潮资讯，缺失时使用雪球注册资本，原始记录中雪球注册资本单位为元"""
+    cninfo = pd.to_numeric(_column(df, 'cninfo_capital'), errors='coerce')
+    xueqiu = pd.to_numeric(_column(df, 'xqinfo_reg_asset'), errors='coerce')
+    xueqiu = xueqiu.where(_normalized_mask(df), xueqiu / 10000)
+    return cninfo.fillna(xueqiu)
+
+
+def _years(values: pd.Series) -> pd.Series:
+    """日期列的年份：日期字符串直接解析，数值按毫秒时间戳换算为北京时间"""
+    values = _text(values)
+    is_text = values.map(lambda value: isinstance(value, str))
+    from_text = pd.to_datetime(values.where(is_text).astype(object).str[:10], format='%Y-%m-%d', errors='coerce').dt.year
+    timestamps = pd.to_numeric(values.where(~is_text), errors='coerce')
+    from_ms = pd.to_datetime(timestamps, unit='ms', utc=True).dt.tz_convert(CHINA_TZ_NAME).dt.year
+    return from_text.fillna(from_ms)
+
+
+def listing_years(df: pd.DataFrame) -> pd.Series:
+    """上市年份：优先巨潮资讯上市日期，缺失时使用雪球上市日期"""
+    return _years(_column(df, 'cninfo_list_date')).fillna(_years(_column(df, 'xqinfo_listed_date')))
+
+
+def filled_mask(df: pd.DataFrame) -> pd.DataFrame:
+    """数据字段是否有值（非空且非空字符串）的布尔矩阵"""
+    values = df[[column for column in df.columns if column not in META_FIELDS]]
+    filled = values.notna()
+    text_columns = values.select_dtypes(include=['object', 'string']).columns
+    filled[text_columns] &= values[text_columns].ne('')
+    return filled
+
+
+def fill_rates(filled: pd.DataFrame) -> Dict[str, float]:
+    """各数据字段的填充率，按填充率升序"""
+    if filled.empty:
+        return {}
+    rates = filled.mean().sort_values()
+    return {field: round(float(rate), 4) for field, rate in rates.items()}
+
+
+def compute_stats(stock_data: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    计算数据集统计信息
+
+    参数:
+        stock_data: 股票基础信息数据 {股票代码: 股票信息}
+
+    返回:
+        Dict[str, Any]: 统计结果，可直接序列化为JSON
+    """
+    df = to_frame(stock_data)
+    total = len(df)
+    failed_mask = _column(df, 'status').isin(FAILED_STATUSES)
+    success = df[~failed_mask]
+
+    # 字段数量和填充率共用同一个有值矩阵，只对全部列做一次空值判断
+    filled = filled_mask(success)
+    field_counts = filled.sum(axis=1)
+
+    provinces = _text(_column(success, 'xqinfo_provincial_name')).str.replace(PROVINCE_SUFFIX_PATTERN, '', regex=True)
+    years = listing_years(success).dropna().astype(int)
+
+    return {
+        'generated_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'total_stocks': total,
+        'success_stocks': int(len(success)),
+        'failed_stocks': int(failed_mask.sum()),
+        'avg_field_count': round(float(field_counts.mean()), 2) if len(field_counts) else 0.0,
+        'markets': _distribution(_text(_column(df, 'market')), top=len(df)),
+        'cninfo_industries': _distribution(_text(_column(success, 'cninfo_industry'))),
+        'xueqiu_industries': _distribution(_text(affiliate_industry_names(success))),
+        'provinces': _distribution(provinces.replace('', np.nan)),
+        'fill_rates': fill_rates(filled),
+        'capital_wan': _quantiles(capital_wan(success)),
+        'staff_num': _quantiles(_column(success, 'xqinfo_staff_num')),
+        'executives_nums': _quantiles(_column(success, 'xqinfo_executives_nums')),
+        'listing_years': {str(year): int(count) for year, count in years.value_counts().sort_index().items()},
+    }
+
+
+def write_stats_report(stats: Dict[str, Any], report_file: str) -> bool:
+    """
+    保存统计报告到JSON文件
+
+    返回:
+        bool: 是否保存成功
+    """
+    try:
+        report_dir = os.path.dirname(report_file)
+        if report_dir:
+            os.makedirs(report_dir, exist_ok=True)
+        tmp_file = report_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, report_file)
+        return True
+    except Exception as e:
+        print(f"✗ 保存统计报告失败: {e}")
+        return False
+
+
+def print_stats(stats: Dict[str, Any], top: int = 10) -> None:
+    """打印统计摘要"""
+    total = stats['total_stocks']
+    if not total:
+        print("没有数据可分析")
+        return
+
+    print(f"总股票数量: {total}")
+    print(f"成功获取: {stats['success_stocks']} ({stats['success_stocks'] / total * 100:.1f}%)")
+    print(f"获取失败: {stats['failed_stocks']} ({stats['failed_stocks'] / total * 100:.1f}%)")
+
+    print(f"\n市场分布:")
+    for market, count in sorted(stats['markets'].items()):
+        print(f"  {market}: {count} 只股票")
+
+    for title, key in (("行业分布（巨潮资讯）", 'cninfo_industries'), ("省份分布", 'provinces')):
+        print(f"\n{title}（前{top}）:")
+        for name, count in list(stats[key].items())[:top]:
+            print(f"  {name}: {count}")
+
+    print(f"\n平均字段数量: {stats['avg_field_count']}")
+    low_fill = [(field, rate) for field, rate in stats['fill_rates'].items() if rate < 0.9]
+    if low_fill:
+        print("填充率低于90%的字段: " + ", ".join(f"{field} {rate:.0%}" for field, rate in low_fill))
+
+    for title, key, unit in (("注册资本", 'capital_wan', "万元"), ("员工人数", 'staff_num', "人")):
+        summary = stats[key]
+        if summary['count']:
+            quantiles = summary['quantiles']
+            print(f"{title}: 中位数 {quantiles['p50']:,.0f}{unit}, P90 {quantiles['p90']:,.0f}{unit}, "
+                  f"最大 {quantiles['p100']:,.0f}{unit}")
+
+    if stats['listing_years']:
+        years = list(stats['listing_years'])
+        busiest = max(stats['listing_years'].items(), key=lambda item: item[1])
+        print(f"上市年份: {years[0]}-{years[-1]}，最多为{busiest[0]}年 {busiest[1]} 只")
+
+
+def benchmark_stats(sample_file: str = "test_stock_base_info.json", sizes: List[int] = (5440, 50000, 200000)) -> None:
+    """
+    测量统计耗时，分别列出构建DataFrame、字段有值矩阵和全部统计的耗时
+
+    数据来自逐条的字典，构建DataFrame和对全部单元格的有值判断占了大部分耗时，整体耗时与逐条循环相当
+    """
+    # 延迟导入，统计模块本身不依赖渲染模块
+    from stock_base_json_2_md import build_benchmark_data
+
+    for size in sizes:
+        data = build_benchmark_data(sample_file, size)
+
+        start = time.perf_counter()
+        df = to_frame(data)
+        frame_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        filled_mask(df)
+        mask_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        compute_stats(data)
+        stats_time = time.perf_counter() - start
+        print(f"  {size:>7} 只股票: 统计共 {stats_time:.2f}秒 "
+              f"(构建DataFrame {frame_time:.2f}秒, 字段有值矩阵 {mask_time:.2f}秒)")
+
+
+def main():
+    """命令行入口"""
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        benchmark_stats()
+        return
+
+    json_file = sys.argv[1] if len(sys.argv) > 1 else "stock_base_info.json"
+    report_file = sys.argv[2] if len(sys.argv) > 2 else default_stats_file(json_file)
+
+    with open(json_file, 'r', encoding='utf-8') as f:
+        stock_data = json.load(f)
+    stats = compute_stats(stock_data)
+    print_stats(stats)
+    if write_stats_report(stats, report_file):
+        print(f"\n✓ 统计报告已保存到 {report_file}")
+
+
+if __name__ == "__main__":
+    main()
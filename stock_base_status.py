@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量获取的实时状态
+运行中持续更新一个小的状态文件（可选本地HTTP接口），包含各数据源每分钟完成的股票数、成功率和失败率、
+各网站当前的请求间隔和并发、剩余队列长度和预计完成时间；安静模式下由这里定期输出一行状态，
+代替逐只股票的进度输出
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, Optional
+
+DEFAULT_STATUS_HOST = "127.0.0.1"
+DEFAULT_STATUS_INTERVAL = 5.0
+# 安静模式下输出状态行的间隔（秒）
+DEFAULT_ECHO_INTERVAL = 30.0
+# 计算吞吐量的滑动窗口（秒）
+RATE_WINDOW = 300.0
+
+STATE_RUNNING = 'running'
+STATE_STOPPED = 'stopped'
+STATE_FINISHED = 'finished'
+
+
+def default_status_file(output_file: str) -> str:
+    """根据数据文件路径推导状态文件路径，如 stock_base_info_status.json"""
+    return os.path.splitext(output_file)[0] + "_status.json"
+
+
+class ProgressTracker:
+    """记录每只股票的获取结果，计算吞吐量和预计完成时间，可在其他线程读取快照"""
+
+    def __init__(self, total: int, sources: Iterable[str], engine=None, window: float = RATE_WINDOW):
+        """
+        参数:
+            total: 本次运行待获取的股票数
+            sources: 逐只股票数据源名称
+            engine: 数据源引擎，用于读取各网站的请求间隔、并发、请求数和停止原因
+            window: 吞吐量的滑动窗口（秒）
+        """
+        self.total = total
+        self.engine = engine
+        self.window = window
+        self.started = time.time()
+        self.done = 0
+        self.success = 0
+        self.failed = 0
+        self.current: Optional[str] = None
+        self.state = STATE_RUNNING
+        self._sources = {name: {'ok': 0, 'failed': 0} for name in sources}
+        # (完成时间, 失败的数据源)，只保留窗口内的记录
+        self._recent: deque = deque()
+        self._lock = threading.Lock()
+
+    def record(self, code: str, ok: bool, errors: Dict[str, str]) -> None:
+        """
+        记录一只股票的结果
+
+        参数:
+            code: 股票代码
+            ok: 是否获取成功（至少一个数据源成功）
+            errors: {数据源: 错误信息}，未出现的数据源视为成功
+        """
+        now = time.time()
+        with self._lock:
+            self.done += 1
+            self.success += int(ok)
+            self.failed += int(not ok)
+            self.current = code
+            for name, counts in self._sources.items():
+                counts['failed' if name in errors else 'ok'] += 1
+            self._recent.append((now, frozenset(errors)))
+            self._trim(now)
+
+    def finish(self, stopped: bool = False) -> None:
+        with self._lock:
+            self.state = STATE_STOPPED if stopped else STATE_FINISHED
+
+    def _trim(self, now: float) -> None:
+        while self._recent and self._recent[0][0] < now - self.window:
+            self._recent.popleft()
+
+    def _rate(self, now: float, source: Optional[str] = None) -> float:
+        """每分钟完成的股票数；指定数据源时只计该数据源成功的股票"""
+        self._trim(now)
+        # 运行时间不足一个窗口时按运行时间计算；长时间没有完成的股票时降为0，不再给出预计完成时间
+        span = min(now - self.started, self.window)
+        count = sum(1 for _, failed in self._recent if source is None or source not in failed)
+        return count / span * 60 if span > 0 else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前状态，即状态文件和HTTP接口的内容"""
+        now = time.time()
+        with self._lock:
+            rate = self._rate(now)
+            remaining = self.total - self.done
+            eta_seconds = remaining / rate * 60 if rate > 0 and self.state == STATE_RUNNING else None
+            sources = {
+                name: {
+                    'ok': counts['ok'],
+                    'failed': counts['failed'],
+                    'success_rate': round(counts['ok'] / self.done, 4) if self.done else None,
+                    'stocks_per_min': round(self._rate(now, name), 2),
+                }
+                for name, counts in self._sources.items()
+            }
+            status = {
+                'state': self.state,
+                'started': datetime.fromtimestamp(self.started).strftime('%Y-%m-%d %H:%M:%S'),
+                'updated': datetime.fromtimestamp(now).strftime('%Y-%m-%d %H:%M:%S'),
+                'elapsed': round(now - self.started, 1),
+                'total': self.total,
+                'done': self.done,
+                'success': self.success,
+                'failed': self.failed,
+                'success_rate': round(self.success / self.done, 4) if self.done else None,
+                'failure_rate': round(self.failed / self.done, 4) if self.done else None,
+                'queue_depth': remaining,
+                'current': self.current,
+                'stocks_per_min': round(rate, 2),
+                'eta_seconds': round(eta_seconds) if eta_seconds is not None else None,
+                'eta': (datetime.fromtimestamp(now) + timedelta(seconds=eta_seconds)).strftime('%Y-%m-%d %H:%M:%S')
+                       if eta_seconds is not None else None,
+                'sources': sources,
+            }
+        engine = self.engine
+        if engine is not None:
+            status['stop_reason'] = engine.stop_reason
+            status['requests'] = engine.request_count
+            status['timeouts'] = dict(engine.timeout_counts)
+            status['backoff'] = {
+                name: {
+                    'delay': round(limiter.current_delay, 3),
+                    'concurrency': limiter.concurrency,
+                    'throttles': limiter.adaptive.throttle_count if limiter.adaptive is not None else None,
+                }
+                for name, limiter in engine.limiters.items()
+            }
+        return status
+
+
+def format_status(status: Dict[str, Any]) -> str:
+    """一行状态，安静模式下定期输出"""
+    eta = f"{timedelta(seconds=status['eta_seconds'])}" if status['eta_seconds'] is not None else '-'
+    rates = ', '.join(f"{name} {item['stocks_per_min']:.1f}" for name, item in status['sources'].items())
+    line = (f"[{status['updated'][11:]}] {status['done']}/{status['total']} "
+            f"成功 {status['success']} 失败 {status['failed']}  {status['stocks_per_min']:.1f}只/分钟"
+            f"{f' ({rates})' if rates else ''}  剩余 {status['queue_depth']}  预计剩余 {eta}")
+    if status.get('backoff'):
+        line += "  间隔 " + ', '.join(f"{name} {item['delay']:.2f}秒" for name, item in status['backoff'].items())
+    return line
+
+
+class StatusReporter:
+    """后台定期写出状态文件，可选提供本地HTTP接口，安静模式下定期输出状态行"""
+
+    def __init__(self, tracker: ProgressTracker, status_file: Optional[str] = None,
+                 interval: float = DEFAULT_STATUS_INTERVAL, port: Optional[int] = None,
+                 host: str = DEFAULT_STATUS_HOST, echo_interval: Optional[float] = None):
+        """
+        参数:
+            tracker: 进度记录
+            status_file: 状态文件，None为不写文件
+            interval: 状态文件的更新间隔（秒）
+            port: HTTP接口端口，None为不启动；GET / 或 /status 返回状态JSON
+            host: HTTP接口监听地址，默认只监听本机
+            echo_interval: 输出状态行的间隔（秒），None为不输出
+        """
+        self.tracker = tracker
+        self.status_file = status_file
+        self.interval = interval
+        self.port = port
+        self.host = host
+        self.echo_interval = echo_interval
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def __enter__(self):
+        if self.port is not None:
+            try:
+                self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+            except OSError as e:
+                # 端口被占用等情况不影响获取，只是没有HTTP接口
+                print(f"✗ 状态接口启动失败: {e}")
+            else:
+                self._server.daemon_threads = True
+                threading.Thread(target=self._server.serve_forever, name="status-http", daemon=True).start()
+                print(f"✓ 状态接口: http://{self.host}:{self._server.server_address[1]}/status")
+        self._thread = threading.Thread(target=self._loop, name="status-reporter", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stopped.set()
+        self._thread.join()
+        self.write()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        return False
+
+    @property
+    def server_port(self) -> Optional[int]:
+        """HTTP接口实际监听的端口（port为0时由系统分配）"""
+        return self._server.server_address[1] if self._server is not None else None
+
+    def write(self) -> None:
+        """写出状态文件，先写临时文件再替换"""
+        if not self.status_file:
+            return
+        try:
+            tmp_file = self.status_file + ".tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.tracker.snapshot(), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.status_file)
+        except Exception as e:
+            print(f"✗ 写入状态文件失败: {e}")
+
+    def _loop(self) -> None:
+        next_echo = time.monotonic() + (self.echo_interval or 0)
+        while not self._stopped.wait(self.interval):
+            self.write()
+            if self.echo_interval is not None and time.monotonic() >= next_echo:
+                print(format_status(self.tracker.snapshot()), flush=True)
+                next_echo = time.monotonic() + self.echo_interval
+
+    def _handler(self):
+        tracker = self.tracker
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/status'):
+                    self.send_error(404)
+                    return
+                body = json.dumps(tracker.snapshot(), ensure_ascii=False).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Cache-Control', 'no-store')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return StatusHandler
+
+
+def main():
+    """命令行入口: python stock_base_status.py [状态文件]，查看正在运行或上次运行的状态"""
+    status_file = sys.argv[1] if len(sys.argv) > 1 else default_status_file("stock_base_info.json")
+    if not os.path.exists(status_file):
+        print(f"✗ 状态文件 {status_file} 不存在")
+        sys.exit(1)
+    with open(status_file, 'r', encoding='utf-8') as f:
+        status = json.load(f)
+    print(f"状态: {status['state']}" + (f" ({status['stop_reason']})" if status.get('stop_reason') else ""))
+    print(format_status(status))
+    for name, item in status['sources'].items():
+        rate = f"{item['success_rate'] * 100:.1f}%" if item['success_rate'] is not None else '-'
+        print(f"  {name:<10} 成功 {item['ok']:>6}  失败 {item['failed']:>5}  成功率 {rate:>6}  "
+              f"{item['stocks_per_min']:.1f}只/分钟")
+    for name, item in (status.get('backoff') or {}).items():
+        throttles = f"  限流 {item['throttles']}次" if item['throttles'] is not None else ""
+        print(f"  {name:<10} 间隔 {item['delay']:.2f}秒  并发 {item['concurrency']}{throttles}")
+    if status['eta']:
+        print(f"预计完成时间: {status['eta']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据源调用的超时控制
+两层超时：
+1. 连接/读取超时：akshare 内部用 requests 发请求且大多不传 timeout，在 requests 的适配器上为未指定超时的请求
+   补上 (连接超时, 读取超时)，保证卡住的socket最终会返回，调用线程不会永久阻塞
+2. 单次调用的总时限：接口调用在共享的有界线程池中执行，超过时限即放弃等待并抛出 CallTimeoutError，
+   作为可重试的临时失败处理；被放弃的调用由读取超时兜底结束，线程回到线程池，不会无限增长
+"""
+
+import sys
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 20.0
+DEFAULT_CALL_TIMEOUT = 60.0
+# 全表数据源一次调用可能包含多页请求，总时限更长
+DEFAULT_TABLE_TIMEOUT = 300.0
+# 执行接口调用的线程数上限，同时在途和被放弃尚未结束的调用共用
+CALL_POOL_SIZE = 64
+
+
+class CallTimeoutError(TimeoutError):
+    """接口调用超过总时限，已放弃等待；future 为仍在执行的被放弃调用，已取消时为None"""
+
+    def __init__(self, message: str, future: Optional[Future] = None):
+        super().__init__(message)
+        self.future = future
+
+
+def is_timeout_error(error: BaseException) -> bool:
+    """是否为超时类的临时失败（总时限、连接超时、读取超时）"""
+    return isinstance(error, (TimeoutError, requests.exceptions.Timeout))
+
+
+_request_timeout: Optional[Tuple[float, float]] = None
+_original_send = HTTPAdapter.send
+_install_lock = threading.Lock()
+
+
+def _send_with_timeout(self, request, stream=False, timeout=None, *args, **kwargs):
+    if timeout is None and _request_timeout is not None:
+        timeout = _request_timeout
+    return _original_send(self, request, stream, timeout, *args, **kwargs)
+
+
+def set_request_timeouts(connect: Optional[float], read: Optional[float]) -> None:
+    """
+    为未指定超时的 requests 请求设置默认的连接和读取超时（进程内全局生效）
+
+    参数:
+        connect: 连接超时（秒），None为不限
+        read: 读取超时（秒），两次收到数据之间的最长间隔，None为不限
+    """
+    global _request_timeout
+    with _install_lock:
+        _request_timeout = None if connect is None and read is None else (connect, read)
+        if HTTPAdapter.send is not _send_with_timeout:
+            HTTPAdapter.send = _send_with_timeout
+
+
+def get_request_timeouts() -> Optional[Tuple[float, float]]:
+    """当前的默认 (连接超时, 读取超时)"""
+    return _request_timeout
+
+
+_call_pool = ThreadPoolExecutor(max_workers=CALL_POOL_SIZE, thread_name_prefix="source-call")
+_abandoned = set()
+_abandoned_lock = threading.Lock()
+
+
+def call_with_timeout(call: Callable[[], Any], timeout: Optional[float]) -> Any:
+    """
+    在调用线程池中执行接口调用，超过总时限时放弃等待
+
+    参数:
+        call: 无参数的接口调用
+        timeout: 总时限（秒），None时直接在当前线程调用
+
+    返回:
+        调用结果；超时抛出 CallTimeoutError，调用本身的异常原样抛出。
+        调用方占用的资源（如限速器名额）应等 CallTimeoutError.future 结束后再释放
+    """
+    if timeout is None:
+        return call()
+    future = _call_pool.submit(call)
+    try:
+        return future.result(timeout=timeout)
+    except FuturesTimeoutError:
+        # 尚未开始的直接取消；已在执行的无法中断，由读取超时兜底结束
+        if future.cancel():
+            raise CallTimeoutError(f"调用超时({timeout:g}秒)") from None
+        with _abandoned_lock:
+            _abandoned.add(future)
+        future.add_done_callback(_forget)
+        raise CallTimeoutError(f"调用超时({timeout:g}秒)", future) from None
+
+
+def _forget(future) -> None:
+    with _abandoned_lock:
+        _abandoned.discard(future)
+
+
+def abandoned_calls() -> int:
+    """已放弃等待但仍在执行的调用数"""
+    with _abandoned_lock:
+        return len(_abandoned)
+
+
+def _check_read_timeout(hang: float, read: float) -> bool:
+    """本地起一个迟迟不返回的HTTP服务，确认不带 timeout 的 requests 请求按读取超时结束"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class HangingHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(hang)
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), HangingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    previous = get_request_timeouts()
+    set_request_timeouts(1.0, read)
+    start = time.perf_counter()
+    try:
+        requests.get(f"http://127.0.0.1:{server.server_address[1]}/")
+        timed_out = False
+    except requests.exceptions.ReadTimeout:
+        timed_out = True
+    finally:
+        elapsed = time.perf_counter() - start
+        set_request_timeouts(*(previous or (None, None)))
+        server.shutdown()
+    print(f"  不带timeout的请求: {'读取超时' if timed_out else '未超时'}, 耗时 {elapsed:.1f}秒 (读取超时 {read:g}秒)")
+    return timed_out
+
+
+def check_timeouts(hang: float = 3.0, timeout: float = 0.5, rounds: int = 20) -> bool:
+    """
+    自检：不带timeout的请求按读取超时结束；反复调用会卡住的接口，确认总时限生效，
+    且被放弃的调用结束后线程回到线程池
+
+    参数:
+        hang: 模拟接口卡住的时长（秒），相当于读取超时兜底结束的时间
+        timeout: 总时限（秒）
+        rounds: 调用次数
+    """
+    read_ok = _check_read_timeout(hang, timeout)
+    start = time.perf_counter()
+    timeouts = 0
+    for _ in range(rounds):
+        try:
+            call_with_timeout(lambda: time.sleep(hang), timeout)
+        except CallTimeoutError:
+            timeouts += 1
+    elapsed = time.perf_counter() - start
+    print(f"  {rounds} 次调用: 超时 {timeouts} 次, 耗时 {elapsed:.1f}秒 (时限 {timeout:g}秒), "
+          f"仍在执行的被放弃调用 {abandoned_calls()} 个")
+
+    time.sleep(hang + 0.5)
+    threads = sum(1 for thread in threading.enumerate() if thread.name.startswith("source-call"))
+    print(f"  {hang:g}秒后: 仍在执行的被放弃调用 {abandoned_calls()} 个, 调用线程 {threads} 个 (上限 {CALL_POOL_SIZE})")
+    passed = read_ok and timeouts == rounds and abandoned_calls() == 0 and threads <= CALL_POOL_SIZE
+    print("✓ 超时控制正常" if passed else "✗ 超时控制异常")
+    return passed
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "check":
+        sys.exit(0 if check_timeouts() else 1)
+    print("使用方法: python stock_base_timeout.py check")
@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多主机/多进程分布式获取的工作队列
+队列保存在一个SQLite文件中（本机或各主机都能访问的共享目录），各主机的worker按优先级成批租用股票代码，
+租约到期未续约的任务（worker崩溃、断网）自动被其他worker重新领取。结果按股票代码幂等提交：
+同一股票只有第一次成功提交生效，与断点续传一样已完成的股票不再获取，失败的股票重新排队直至达到尝试上限。
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import signal
+import socket
+import sqlite3
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional
+
+from stock_base_multi_handle import (base_stock_info, format_errors, install_stop_signal, load_stock_base_info_from_json,
+                                     parse_duration, save_stock_base_info_to_json)
+from stock_base_metrics import DEFAULT_EXPORT_INTERVAL, MetricsExporter, default_metrics_files
+from stock_base_normalize import normalize_dataset
+from stock_base_scheduler import load_watchlist, prioritize
+from stock_base_sources import SourceEngine, StockSource, register_source
+from stock_code_universe import get_stock_universe, get_universe_diff
+
+DEFAULT_QUEUE_FILE = "stock_work_queue.db"
+
+# 任务状态
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+TASK_STATUSES = [PENDING, LEASED, DONE, FAILED]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    code TEXT PRIMARY KEY,
+    name TEXT,
+    market TEXT,
+    priority INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_claim ON tasks (status, priority);
+CREATE TABLE IF NOT EXISTS results (
+    code TEXT PRIMARY KEY,
+    record TEXT NOT NULL,
+    worker TEXT,
+    committed REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class WorkQueue:
+    """
+    基于SQLite文件的租约工作队列
+
+    使用默认的回滚日志模式而非WAL，放在网络共享目录时依赖文件系统的文件锁；
+    租约时间使用各主机的系统时间，主机之间的时钟偏差应远小于租约时长
+    """
+
+    def __init__(self, queue_file: str = DEFAULT_QUEUE_FILE, timeout: float = 60.0):
+        self.queue_file = queue_file
+        self.conn = sqlite3.connect(queue_file, timeout=timeout, isolation_level=None)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _transaction(self):
+        """写事务：BEGIN IMMEDIATE 立即取得写锁，多个进程的领取互斥"""
+        return _Transaction(self.conn)
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key: str, value: Any) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def add_tasks(self, stock_codes: Dict[str, Dict[str, Any]], done_codes: Iterable[str] = ()) -> int:
+        """
+        按给定顺序加入任务，顺序即优先级；已在队列中的股票保持原状态
+
+        参数:
+            stock_codes: 按优先级排列的 {股票代码: {'name', 'market'}}
+            done_codes: 已处理的股票代码（如已有断点中的股票），直接记为完成
+
+        返回:
+            int: 新加入的任务数
+        """
+        done_codes = set(done_codes)
+        now = time.time()
+        with self._transaction():
+            before = self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+            offset = self.conn.execute("SELECT COALESCE(MAX(priority) + 1, 0) FROM tasks").fetchone()[0]
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO tasks (code, name, market, priority, status, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                [(code, info.get('name', ''), info.get('market', ''), offset + position,
+                  DONE if code in done_codes else PENDING, now)
+                 for position, (code, info) in enumerate(stock_codes.items())])
+            after = self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+        return after - before
+
+    def claim(self, worker: str, batch_size: int, lease_seconds: float) -> List[Dict[str, Any]]:
+        """
+        领取一批优先级最高的待处理任务，包括租约已过期的任务
+
+        返回:
+            List[Dict]: [{'code', 'name', 'market', 'attempts'}]
+        """
+        now = time.time()
+        with self._transaction():
+            rows = self.conn.execute(
+                "SELECT code, name, market, attempts FROM tasks "
+                "WHERE status = ? OR (status = ? AND lease_until < ?) ORDER BY priority LIMIT ?",
+                (PENDING, LEASED, now, batch_size)).fetchall()
+            self.conn.executemany(
+                "UPDATE tasks SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1, updated = ? "
+                "WHERE code = ?",
+                [(LEASED, worker, now + lease_seconds, now, row[0]) for row in rows])
+        return [{'code': code, 'name': name, 'market': market, 'attempts': attempts + 1}
+                for code, name, market, attempts in rows]
+
+    def renew(self, worker: str, lease_seconds: float) -> int:
+        """续约该worker持有的全部任务，返回续约的任务数"""
+        now = time.time()
+        with self._transaction():
+            cursor = self.conn.execute(
+                "UPDATE tasks SET lease_until = ? WHERE status = ? AND worker = ?",
+                (now + lease_seconds, LEASED, worker))
+        return cursor.rowcount
+
+    def complete(self, worker: str, code: str, record: Dict[str, Any]) -> bool:
+        """
+        提交获取成功的结果；同一股票只有第一次提交生效，租约过期后迟到的重复提交被忽略
+
+        返回:
+            bool: 本次提交是否生效
+        """
+        now = time.time()
+        with self._transaction():
+            cursor = self.conn.execute(
+                "UPDATE tasks SET status = ?, worker = ?, lease_until = NULL, updated = ? "
+                "WHERE code = ? AND status != ?", (DONE, worker, now, code, DONE))
+            if cursor.rowcount == 0:
+                return False
+            self.conn.execute("INSERT OR REPLACE INTO results (code, record, worker, committed) VALUES (?, ?, ?, ?)",
+                              (code, json.dumps(record, ensure_ascii=False), worker, now))
+        return True
+
+    def fail(self, worker: str, code: str, record: Dict[str, Any], max_attempts: int) -> Optional[str]:
+        """
+        提交获取失败；未达到尝试上限时重新排队，达到上限时记为失败并保存失败记录
+
+        返回:
+            Optional[str]: 任务的新状态，该worker已不持有租约时为None
+        """
+        now = time.time()
+        with self._transaction():
+            row = self.conn.execute("SELECT attempts FROM tasks WHERE code = ? AND status = ? AND worker = ?",
+                                    (code, LEASED, worker)).fetchone()
+            if row is None:
+                return None
+            status = FAILED if row[0] >= max_attempts else PENDING
+            self.conn.execute("UPDATE tasks SET status = ?, lease_until = NULL, updated = ? WHERE code = ?",
+                              (status, now, code))
+            if status == FAILED:
+                self.conn.execute("INSERT OR REPLACE INTO results (code, record, worker, committed) VALUES (?, ?, ?, ?)",
+                                  (code, json.dumps(record, ensure_ascii=False), worker, now))
+        return status
+
+    def release(self, worker: str) -> int:
+        """退出前归还该worker未完成的任务，不计入尝试次数"""
+        with self._transaction():
+            cursor = self.conn.execute(
+                "UPDATE tasks SET status = ?, worker = NULL, lease_until = NULL, attempts = MAX(attempts - 1, 0) "
+                "WHERE status = ? AND worker = ?", (PENDING, LEASED, worker))
+        return cursor.rowcount
+
+    def next_expiry(self) -> Optional[float]:
+        """其他worker持有的租约中最早的到期时间，没有租约时为None"""
+        return self.conn.execute("SELECT MIN(lease_until) FROM tasks WHERE status = ?", (LEASED,)).fetchone()[0]
+
+    def counts(self) -> Dict[str, int]:
+        """各状态的任务数"""
+        rows = dict(self.conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+        return {status: rows.get(status, 0) for status in TASK_STATUSES}
+
+    def results(self) -> Dict[str, Dict[str, Any]]:
+        """已提交的结果，按优先级排列"""
+        rows = self.conn.execute(
+            "SELECT results.code, results.record FROM results JOIN tasks ON tasks.code = results.code "
+            "ORDER BY tasks.priority").fetchall()
+        return {code: json.loads(record) for code, record in rows}
+
+
+class _Transaction:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def init_queue(queue_file: str = DEFAULT_QUEUE_FILE, sources: Optional[List[str]] = None,
+               fields: Optional[List[str]] = None, existing_file: str = "stock_base_info.json",
+               checkpoint_file: Optional[str] = None, watchlist: Optional[List[str]] = None,
+               stock_codes: Optional[Dict[str, Dict[str, Any]]] = None) -> WorkQueue:
+    """
+    创建或补充工作队列，任务按获取优先级排列，数据源和字段配置写入队列供各worker使用
+
+    参数:
+        queue_file: 队列文件
+        sources: 数据源名称
+        fields: 只获取这些字段
+        existing_file: 已有数据集，用于安排优先级
+        checkpoint_file: 单机运行的断点文件，其中已处理的股票记为完成
+        watchlist: 关注列表
+        stock_codes: 股票列表，None时获取全部A股
+    """
+    engine = SourceEngine(sources, delay=0, fields=fields)
+    stock_codes = stock_codes if stock_codes is not None else get_stock_universe()
+    existing = load_stock_base_info_from_json(existing_file) if existing_file and os.path.exists(existing_file) else {}
+    plan = prioritize(stock_codes, existing, engine, get_universe_diff()['listed'], watchlist or [])
+
+    done_codes = []
+    if checkpoint_file and os.path.exists(checkpoint_file):
+        with open(checkpoint_file, 'r', encoding='utf-8') as f:
+            done_codes = json.load(f).get('processed_codes', [])
+
+    queue = WorkQueue(queue_file)
+    queue.set_meta('sources', engine.source_names)
+    queue.set_meta('fields', fields)
+    added = queue.add_tasks({code: stock_codes[code] for code in plan['code']}, done_codes)
+    print(f"✓ 工作队列 {queue_file}: 新加入 {added} 只股票，数据源 {', '.join(engine.source_names)}")
+    print_status(queue)
+    return queue
+
+
+def run_worker(queue_file: str = DEFAULT_QUEUE_FILE, worker: Optional[str] = None, batch_size: int = 20,
+               lease_seconds: float = 300.0, delay: float = 2.0, max_workers: Optional[int] = None,
+               max_attempts: int = 3, time_budget: Optional[float] = None, request_budget: Optional[int] = None,
+               poll_interval: float = 5.0, verbose: bool = True, adaptive: bool = False,
+               timeouts: Optional[Dict[str, float]] = None,
+               metrics_interval: float = DEFAULT_EXPORT_INTERVAL) -> Dict[str, int]:
+    """
+    运行一个worker：成批领取任务、获取并提交结果，直到队列中没有可领取的任务
+
+    其他worker还持有租约时继续等待，租约过期后接手；预算用完或收到SIGTERM时归还未完成的任务后退出
+
+    参数:
+        queue_file: 队列文件
+        worker: worker名称，默认为 主机名-进程号
+        batch_size: 每次领取的股票数
+        lease_seconds: 租约时长（秒），每提交一只股票续约一次
+        delay: 同一网站相邻两次请求的间隔（秒）
+        max_workers: 并发线程数
+        max_attempts: 每只股票的最大领取次数，达到后记为失败
+        time_budget: 时间预算（秒）
+        request_budget: 请求数预算
+        poll_interval: 等待其他worker租约到期时的最长轮询间隔（秒）
+        verbose: 是否打印每只股票的结果
+        adaptive: 是否按延迟和限流信号自适应调整每个网站的并发数
+        timeouts: 超时设置 connect_timeout/read_timeout/call_timeout
+        metrics_interval: 耗时统计的导出间隔（秒），0为只在结束时导出
+
+    返回:
+        Dict[str, int]: {'done', 'failed', 'requeued', 'ignored', 'released'}
+    """
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+    queue = WorkQueue(queue_file)
+    engine = SourceEngine(queue.get_meta('sources'), delay=delay, max_workers=max_workers,
+                          fields=queue.get_meta('fields'), verbose=verbose,
+                          time_budget=time_budget, request_budget=request_budget, adaptive=adaptive,
+                          **(timeouts or {}))
+    stats = {'done': 0, 'failed': 0, 'requeued': 0, 'ignored': 0, 'released': 0}
+    print(f"worker {worker} 启动: 数据源 {', '.join(engine.source_names)}, 每批 {batch_size} 只, 租约 {lease_seconds:g}秒")
+
+    # 各worker的耗时统计分别导出，如 stock_work_queue_host-123_metrics.json
+    with MetricsExporter(*default_metrics_files(queue_file, worker), interval=metrics_interval):
+        previous_handler = install_stop_signal(engine)
+        try:
+            while not engine.stop_reason:
+                batch = queue.claim(worker, batch_size, lease_seconds)
+                if not batch:
+                    expiry = queue.next_expiry()
+                    if expiry is None:
+                        break
+                    # 其余任务都被其他worker租用，等待完成或租约过期
+                    time.sleep(min(max(expiry - time.time(), 0) + 0.1, poll_interval))
+                    continue
+
+                tasks = {task['code']: task for task in batch}
+                for code, fields, errors in engine.run(tasks):
+                    base_info = base_stock_info(code, tasks[code])
+                    if fields or not engine.stock_sources:
+                        key = 'done' if queue.complete(worker, code, {**base_info, **fields}) else 'ignored'
+                        stats[key] += 1
+                        if verbose:
+                            print(f"✓ [{worker}] {code} {tasks[code]['name']}" + (" (已由其他worker提交)" if key == 'ignored' else ""))
+                    elif engine.stop_reason:
+                        continue
+                    else:
+                        record = {**base_info, 'status': 'failed', 'error': format_errors(errors),
+                                  'attempts': tasks[code]['attempts']}
+                        status = queue.fail(worker, code, record, max_attempts)
+                        stats['failed' if status == FAILED else 'requeued'] += 1
+                        if verbose:
+                            print(f"✗ [{worker}] {code} 第{tasks[code]['attempts']}次领取失败: {record['error']}")
+                    queue.renew(worker, lease_seconds)
+        finally:
+            if previous_handler is not None:
+                signal.signal(signal.SIGTERM, previous_handler)
+            stats['released'] = queue.release(worker)
+            queue.close()
+
+    reason = f"，{engine.stop_reason}" if engine.stop_reason else ""
+    print(f"worker {worker} 结束{reason}: 完成 {stats['done']}, 失败 {stats['failed']}, 重新排队 {stats['requeued']}, "
+          f"重复提交 {stats['ignored']}, 归还 {stats['released']}, 超时 {engine.describe_timeouts()}")
+    return stats
+
+
+def print_status(queue: WorkQueue) -> None:
+    """打印队列各状态的任务数"""
+    counts = queue.counts()
+    total = sum(counts.values())
+    print(f"  共 {total} 只: 待处理 {counts[PENDING]}, 租用中 {counts[LEASED]}, 完成 {counts[DONE]}, 失败 {counts[FAILED]}")
+
+
+def export_results(queue_file: str = DEFAULT_QUEUE_FILE, output_file: str = "stock_base_info.json") -> bool:
+    """
+    将队列中的结果合并到数据集并保存；全表数据源在此请求一次并关联
+
+    获取失败的股票若已有成功记录则保留原记录
+    """
+    queue = WorkQueue(queue_file)
+    results = queue.results()
+    engine = SourceEngine(queue.get_meta('sources'), fields=queue.get_meta('fields'))
+    queue.close()
+
+    stock_data = load_stock_base_info_from_json(output_file) if os.path.exists(output_file) else {}
+    for code, record in results.items():
+        previous = stock_data.get(code)
+        if record.get('status') == 'failed' and previous and previous.get('status') not in ['failed', 'error']:
+            continue
+        stock_data[code] = record
+    stock_data = normalize_dataset(stock_data)
+
+    if engine.table_sources:
+        succeeded = {code: info for code, info in stock_data.items() if info.get('status') not in ['failed', 'error']}
+        for name, result in engine.merge_tables(succeeded).items():
+            if 'error' in result:
+                print(f"✗ {name} 失败: {result['error']}")
+            else:
+                print(f"✓ {name} 关联 {result['matched']} 只股票")
+    print(f"✓ 队列中 {len(results)} 条结果已合并")
+    return save_stock_base_info_to_json(stock_data, output_file)
+
+
+# ---------------- 多进程模拟 ----------------
+
+def _register_simulated_sources(failure_rate: float, latency: float, crash_after: Optional[int]) -> None:
+    """登记两个离线模拟数据源：随机延迟、随机失败，crash_after 次请求后直接终止进程模拟主机宕机"""
+    counter = {'calls': 0}
+
+    def fetch(symbol: str) -> str:
+        counter['calls'] += 1
+        if crash_after is not None and counter['calls'] > crash_after:
+            os._exit(1)
+        time.sleep(random.uniform(0, 2 * latency))
+        if random.random() < failure_rate:
+            raise ConnectionError("模拟网络错误")
+        return symbol
+
+    for name, rate_class in [('sim_a', 'sim_a'), ('sim_b', 'sim_b')]:
+        register_source(StockSource(name, f'{name}_', rate_class, fetch,
+                                    lambda raw, code, name=name: {'value': f'{name}:{raw}'},
+                                    fields=['value'], description='多进程模拟数据源'))
+
+
+def _simulated_worker(queue_file: str, worker: str, failure_rate: float, latency: float,
+                      crash_after: Optional[int], lease_seconds: float) -> None:
+    """模拟主机的进程入口"""
+    _register_simulated_sources(failure_rate, latency, crash_after)
+    run_worker(queue_file, worker=worker, batch_size=10, lease_seconds=lease_seconds, delay=0,
+               max_attempts=3, poll_interval=0.5, verbose=False)
+
+
+def simulate(workers: int = 4, stocks: int = 300, crashes: int = 1, failure_rate: float = 0.05,
+             latency: float = 0.01, lease_seconds: float = 2.0) -> bool:
+    """
+    用多个本机进程模拟多台主机获取：部分进程中途直接退出，检查租约过期后任务被接手、每只股票恰好提交一次
+
+    返回:
+        bool: 检查是否通过
+    """
+    import multiprocessing
+
+    queue_file = os.path.join(tempfile.mkdtemp(prefix="stock_work_queue_"), "queue.db")
+    stock_codes = {f"{i:06d}": {'name': f'模拟{i}', 'market': 'sim'} for i in range(1, stocks + 1)}
+    queue = WorkQueue(queue_file)
+    queue.set_meta('sources', ['sim_a', 'sim_b'])
+    queue.set_meta('fields', None)
+    queue.add_tasks(stock_codes)
+    queue.close()
+
+    print(f"模拟 {workers} 个worker（其中 {crashes} 个中途退出）处理 {stocks} 只股票，租约 {lease_seconds:g}秒")
+    context = multiprocessing.get_context('spawn')
+    start = time.perf_counter()
+    processes = []
+    for index in range(workers):
+        # 模拟两个数据源各请求约 crash_after/2 只股票后宕机
+        crash_after = 2 * stocks // workers // 3 if index < crashes else None
+        process = context.Process(target=_simulated_worker,
+                                  args=(queue_file, f"sim-{index}", failure_rate, latency, crash_after, lease_seconds))
+        process.start()
+        processes.append(process)
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    queue = WorkQueue(queue_file)
+    counts = queue.counts()
+    results = queue.results()
+    reclaimed = queue.conn.execute("SELECT COUNT(*) FROM tasks WHERE attempts > 1").fetchone()[0]
+    by_worker = dict(queue.conn.execute("SELECT worker, COUNT(*) FROM results GROUP BY worker").fetchall())
+    queue.close()
+
+    exit_codes = [process.exitcode for process in processes]
+    print(f"  耗时 {elapsed:.1f}秒, 进程退出码 {exit_codes}")
+    print(f"  任务: 完成 {counts[DONE]}, 失败 {counts[FAILED]}, 待处理 {counts[PENDING]}, 租用中 {counts[LEASED]}")
+    print(f"  多次领取的任务 {reclaimed} 只, 各worker提交: {by_worker}")
+
+    passed = (counts[PENDING] == 0 and counts[LEASED] == 0 and len(results) == stocks
+              and counts[DONE] + counts[FAILED] == stocks
+              and all(record['code'] == code for code, record in results.items()))
+    print("✓ 所有股票恰好提交一次，宕机worker的任务已被接手" if passed else "✗ 模拟检查未通过")
+    return passed
+
+
+def main():
+    """命令行入口"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="多主机分布式获取的工作队列")
+    parser.add_argument('command', choices=['init', 'work', 'status', 'export', 'simulate'])
+    parser.add_argument('queue_file', nargs='?', default=DEFAULT_QUEUE_FILE)
+    parser.add_argument('--sources', help="init: 逗号分隔的数据源名称")
+    parser.add_argument('--fields', help="init: 逗号分隔的字段名")
+    parser.add_argument('--watchlist', help="init: 关注列表文件或逗号分隔的股票代码")
+    parser.add_argument('--checkpoint', help="init: 单机运行的断点文件，其中已处理的股票记为完成")
+    parser.add_argument('--output', default="stock_base_info.json", help="init/export: 数据集文件")
+    parser.add_argument('--worker', help="work: worker名称，默认为 主机名-进程号")
+    parser.add_argument('--batch', type=int, default=20, help="work: 每次领取的股票数")
+    parser.add_argument('--lease', type=float, default=300.0, help="work: 租约时长（秒）")
+    parser.add_argument('--delay', type=float, default=2.0, help="work: 同一网站的请求间隔（秒）")
+    parser.add_argument('--workers', type=int, help="work: 并发线程数；simulate: 模拟的worker进程数")
+    parser.add_argument('--adaptive', action='store_true', help="work: 自适应调整每个网站的并发数")
+    parser.add_argument('--connect-timeout', type=float, help="work: HTTP连接超时（秒），默认5")
+    parser.add_argument('--read-timeout', type=float, help="work: HTTP读取超时（秒），默认20")
+    parser.add_argument('--call-timeout', type=float, help="work: 单次接口调用总时限（秒），默认60")
+    parser.add_argument('--time-budget', help="work: 时间预算，如 3600、45m、1.5h")
+    parser.add_argument('--request-budget', type=int, help="work: 请求数预算")
+    parser.add_argument('--stocks', type=int, default=300, help="simulate: 模拟的股票数")
+    args = parser.parse_args()
+
+    if args.command == 'init':
+        init_queue(args.queue_file, sources=args.sources.split(',') if args.sources else None,
+                   fields=args.fields.split(',') if args.fields else None, existing_file=args.output,
+                   checkpoint_file=args.checkpoint, watchlist=load_watchlist(args.watchlist))
+    elif args.command == 'work':
+        run_worker(args.queue_file, worker=args.worker, batch_size=args.batch, lease_seconds=args.lease,
+                   delay=args.delay, max_workers=args.workers,
+                   time_budget=parse_duration(args.time_budget) if args.time_budget else None,
+                   request_budget=args.request_budget, adaptive=args.adaptive,
+                   timeouts={name: value for name, value in [('connect_timeout', args.connect_timeout),
+                                                             ('read_timeout', args.read_timeout),
+                                                             ('call_timeout', args.call_timeout)]
+                             if value is not None})
+    elif args.command == 'status':
+        queue = WorkQueue(args.queue_file)
+        print(f"工作队列 {args.queue_file}: 数据源 {', '.join(queue.get_meta('sources', []))}")
+        print_status(queue)
+        queue.close()
+    elif args.command == 'export':
+        export_results(args.queue_file, args.output)
+    elif args.command == 'simulate':
+        sys.exit(0 if simulate(workers=args.workers or 4, stocks=args.stocks) else 1)
+
+
+if __name__ == "__main__":
+    main()
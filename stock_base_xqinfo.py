@@ -10,6 +10,46 @@ import pandas as pd
 from datetime import datetime
 import os
 
+from stock_code_market import xueqiu_symbol
+
+# 需要提取的字段列表（保存时加xqinfo_前缀）
+XQINFO_FIELDS = [
+    'org_name_cn',           # 公司名称
+    'org_short_name_cn',     # 公司简称
+    'main_operation_business', # 主营业务
+    'operating_scope',       # 经营范围
+    'org_cn_introduction',   # 公司简介
+    'legal_representative',  # 法人代表
+    'general_manager',       # 总经理
+    'secretary',             # 董秘
+    'established_date',      # 成立日期
+    'reg_asset',             # 注册资本
+    'staff_num',             # 员工人数
+    'org_website',           # 官方网站
+    'reg_address_cn',        # 注册地址
+    'office_address_cn',     # 办公地址
+    'listed_date',           # 上市日期
+    'provincial_name',       # 省份
+    'actual_controller',     # 实际控制人
+    'classi_name',           # 公司类型
+    'chairman',              # 董事长
+    'executives_nums',       # 高管人数
+    'issue_price',           # 发行价格
+    'affiliate_industry'     # 所属行业
+]
+
+def extract_basic_info(df):
+    """
+    从stock_individual_basic_info_xq返回的item/value数据中提取所需字段（不含前缀）
+
+    :param df: 接口返回数据
+    :return: {字段名: 值}，缺失的字段为'N/A'，数据为空时返回空字典
+    """
+    if df.empty:
+        return {}
+    data_dict = dict(zip(df['item'], df['value']))
+    return {field: data_dict.get(field, 'N/A') for field in XQINFO_FIELDS}
+
 def get_xueqiu_stock_info(stock_code="600030"):
     """
     获取雪球股票基础信息
@@ -18,47 +58,9 @@ def get_xueqiu_stock_info(stock_code="600030"):
     :return: 包含股票信息的字典
     """
 
-    # 需要提取的字段列表
-    required_fields = [
-        'org_name_cn',           # 公司名称
-        'org_short_name_cn',     # 公司简称
-        'main_operation_business', # 主营业务
-        'operating_scope',       # 经营范围
-        'org_cn_introduction',   # 公司简介
-        'legal_representative',  # 法人代表
-        'general_manager',       # 总经理
-        'secretary',             # 董秘
-        'established_date',      # 成立日期
-        'reg_asset',             # 注册资本
-        'staff_num',             # 员工人数
-        'org_website',           # 官方网站
-        'reg_address_cn',        # 注册地址
-        'office_address_cn',     # 办公地址
-        'listed_date',           # 上市日期
-        'provincial_name',       # 省份
-        'actual_controller',     # 实际控制人
-        'classi_name',           # 公司类型
-        'chairman',              # 董事长
-        'executives_nums',       # 高管人数
-        'issue_price',           # 发行价格
-        'affiliate_industry'     # 所属行业
-    ]
-
     try:
         # 根据股票代码判断交易所前缀
-        if stock_code.startswith('6'):
-            # 上海证券交易所
-            symbol = f"SH{stock_code}"
-        elif stock_code.startswith(('0', '2', '3')):
-            # 深圳证券交易所
-            symbol = f"SZ{stock_code}"
-        elif stock_code.startswith(('8', '4', '9')):
-            # 北京证券交易所
-            symbol = f"BJ{stock_code}"
-        else:
-            # 默认使用SH前缀
-            symbol = f"SH{stock_code}"
-            print(f"警告: 无法识别股票代码 {stock_code} 的交易所，默认使用SH前缀")
+        symbol = xueqiu_symbol(stock_code)
 
         print(f"正在获取雪球股票基础信息...")
         print(f"股票代码: {stock_code} ({symbol})")
@@ -70,15 +72,8 @@ def get_xueqiu_stock_info(stock_code="600030"):
             print("未获取到数据")
             return None
 
-        # 将DataFrame转换为字典，方便查找
-        data_dict = dict(zip(df['item'], df['value']))
-
-        # 提取所需字段并添加前缀
-        result = {}
-        for field in required_fields:
-            value = data_dict.get(field, 'N/A')
-            # 添加xqinfo_前缀
-            result[f'xqinfo_{field}'] = value
+        # 提取所需字段并添加xqinfo_前缀
+        result = {f'xqinfo_{field}': value for field, value in extract_basic_info(df).items()}
 
         return result
 
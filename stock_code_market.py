@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+A股股票代码所属交易所识别
+基于代码前缀规则表判断所属市场（sh/sz/bj），支持整列代码的向量化识别，
+供股票列表获取和各数据源的代码拼接统一使用
+"""
+
+import time
+from typing import Iterable, List
+
+import numpy as np
+import pandas as pd
+
+# 代码前缀规则表：(前缀, 市场)，按最长前缀优先匹配
+MARKET_PREFIX_RULES = [
+    ('920', 'bj'),  # 北交所新代码段
+    ('900', 'sh'),  # 上交所B股
+    ('6', 'sh'),    # 上交所主板、科创板
+    ('9', 'sh'),    # 其余9开头代码沿用上交所
+    ('0', 'sz'),    # 深交所主板
+    ('2', 'sz'),    # 深交所B股
+    ('3', 'sz'),    # 深交所创业板
+    ('4', 'bj'),    # 北交所（原新三板精选层）
+    ('8', 'bj'),    # 北交所
+]
+
+UNKNOWN_MARKET = 'unknown'
+
+# 按前缀长度分组，便于逐行识别时截取定长前缀查表
+_RULES_BY_LENGTH = {}
+for _prefix, _market in MARKET_PREFIX_RULES:
+    _RULES_BY_LENGTH.setdefault(len(_prefix), {})[_prefix] = _market
+_PREFIX_LENGTHS = sorted(_RULES_BY_LENGTH, reverse=True)
+
+# 向量化识别使用的查找表：前缀数值 -> 市场编号，0表示未匹配
+_MARKET_LABELS = np.array([UNKNOWN_MARKET] + sorted({market for _, market in MARKET_PREFIX_RULES}), dtype=object)
+_PREFIX_TABLES = {}
+for _length, _rules in _RULES_BY_LENGTH.items():
+    _table = np.zeros(10 ** _length, dtype=np.int8)
+    for _prefix, _market in _rules.items():
+        _table[int(_prefix)] = list(_MARKET_LABELS).index(_market)
+    _PREFIX_TABLES[_length] = _table
+
+
+def normalize_codes(codes: Iterable) -> np.ndarray:
+    """
+    将股票代码统一为6位字符串数组
+
+    Args:
+        codes: 股票代码序列，可以是字符串或整数
+
+    Returns:
+        np.ndarray: 6位代码字符串数组，空值为空字符串
+    """
+    values = np.asarray(codes)
+    # np.char.zfill 不支持空数组
+    if values.size == 0:
+        return values.astype('U6')
+    if values.dtype.kind in 'iu':
+        return np.char.zfill(values.astype(str), 6)
+    if values.dtype.kind == 'U':
+        # 已是定长6位字符串时无需再补零
+        if values.dtype.itemsize == 6 * 4 and (np.char.str_len(values) == 6).all():
+            return values
+        values = np.char.strip(values)
+        return np.where(values == '', '', np.char.zfill(values, 6))
+
+    # 混合类型或含空值时逐个转换
+    series = pd.Series(values, dtype=object)
+    missing = series.isna().to_numpy(copy=True)
+    values = series.to_numpy(dtype=object, copy=True)
+    values[missing] = ''
+    values = np.char.strip(values.astype(str))
+    missing |= values == ''
+    result = np.char.zfill(values, 6)
+    result[missing] = ''
+    return result
+
+
+def classify_markets(codes: Iterable) -> np.ndarray:
+    """
+    向量化识别一组股票代码的所属市场
+
+    将6位代码按字符码点转换为数字矩阵，按前缀长度从长到短计算前缀数值并查表，
+    全程为numpy数组运算，不逐行调用Python函数。
+
+    Args:
+        codes: 股票代码序列
+
+    Returns:
+        np.ndarray: 与输入等长的市场代码数组（sh/sz/bj/unknown）
+    """
+    normalized = normalize_codes(codes).astype('U6')
+    if normalized.size == 0:
+        return _MARKET_LABELS[np.zeros(0, dtype=np.int8)]
+    # 每个字符的Unicode码点减去'0'即为数字，非数字字符落在0-9之外
+    digits = normalized.view(np.uint32).reshape(-1, 6).astype(np.int64) - ord('0')
+    is_digit = (digits >= 0) & (digits <= 9)
+
+    market_ids = np.zeros(len(normalized), dtype=np.int8)
+    for length in _PREFIX_LENGTHS:
+        prefix_digits = digits[:, :length]
+        valid = is_digit[:, :length].all(axis=1) & (market_ids == 0)
+        weights = 10 ** np.arange(length - 1, -1, -1)
+        prefix_values = np.where(valid, prefix_digits @ weights, 0)
+        hits = np.where(valid, _PREFIX_TABLES[length][prefix_values], 0)
+        market_ids = np.where(market_ids == 0, hits, market_ids).astype(np.int8)
+
+    return _MARKET_LABELS[market_ids]
+
+
+def determine_market(code) -> str:
+    """
+    根据股票代码判断所属市场
+
+    Args:
+        code: 股票代码
+
+    Returns:
+        str: 市场代码（sh/sz/bj/unknown）
+    """
+    if code is None or pd.isna(code):
+        return UNKNOWN_MARKET
+
+    code_str = str(code).strip()
+    if not code_str:
+        return UNKNOWN_MARKET
+
+    code_str = code_str.zfill(6)
+    for length in _PREFIX_LENGTHS:
+        market = _RULES_BY_LENGTH[length].get(code_str[:length])
+        if market:
+            return market
+    return UNKNOWN_MARKET
+
+
+def xueqiu_symbols(codes: Iterable) -> np.ndarray:
+    """
+    向量化生成雪球接口使用的代码，如 SH600030，无法识别的代码使用SH前缀
+
+    Args:
+        codes: 股票代码序列
+
+    Returns:
+        np.ndarray: 带交易所前缀的代码数组
+    """
+    normalized = normalize_codes(codes)
+    markets = classify_markets(normalized)
+    markets[markets == UNKNOWN_MARKET] = 'sh'
+    return np.char.add(np.char.upper(markets.astype(str)), normalized)
+
+
+def xueqiu_symbol(code: str) -> str:
+    """
+    生成雪球接口使用的代码，如 SH600030
+
+    Args:
+        code (str): 股票代码
+
+    Returns:
+        str: 带交易所前缀的代码，无法识别时使用SH前缀
+    """
+    market = determine_market(code)
+    if market == UNKNOWN_MARKET:
+        print(f"警告: 无法识别股票代码 {code} 的交易所，默认使用SH前缀")
+        market = 'sh'
+    return f"{market.upper()}{str(code).zfill(6)}"
+
+
+def check_prefix_rules() -> bool:
+    """校验规则表中每个前缀的识别结果，逐行与向量化结果一致"""
+    cases = [
+        ('000001', 'sz'), ('002709', 'sz'), ('200011', 'sz'), ('300750', 'sz'), ('301611', 'sz'),
+        ('600030', 'sh'), ('688031', 'sh'), ('900901', 'sh'), ('950001', 'sh'),
+        ('920964', 'bj'), ('430047', 'bj'), ('830799', 'bj'), ('872808', 'bj'),
+        (1, 'sz'), ('100000', UNKNOWN_MARKET), ('', UNKNOWN_MARKET), (None, UNKNOWN_MARKET),
+    ]
+    codes = [code for code, _ in cases]
+    vectorized = classify_markets(codes)
+    symbols = xueqiu_symbols(codes)
+
+    all_passed = True
+    for (code, expected), market, symbol in zip(cases, vectorized, symbols):
+        scalar = determine_market(code)
+        passed = scalar == expected and market == expected
+        all_passed = all_passed and passed
+        print(f"  {'✓' if passed else '✗'} {code!s:>8} -> {market:<8} {symbol}")
+
+    # 规则表中的每个前缀都必须有校验用例
+    # 空输入返回空数组
+    for empty in ([], pd.Series([], dtype=object), pd.Series([], dtype=str), np.array([], dtype=np.int64)):
+        sizes = (normalize_codes(empty).size, classify_markets(empty).size, xueqiu_symbols(empty).size)
+        passed = sizes == (0, 0, 0)
+        all_passed = all_passed and passed
+        print(f"  {'✓' if passed else '✗'} 空输入 {getattr(empty, 'dtype', 'list')!s:>8} -> {sizes}")
+
+    missing_prefixes = [prefix for prefix, _ in MARKET_PREFIX_RULES
+                        if not any(str(code).zfill(6).startswith(prefix) for code, _ in cases if code)]
+    if missing_prefixes:
+        print(f"  ✗ 未覆盖的前缀: {missing_prefixes}")
+        all_passed = False
+    return all_passed
+
+
+def benchmark_classify(sizes: List[int] = (10_000, 100_000, 1_000_000)) -> None:
+    """对比逐行识别与向量化识别的吞吐量"""
+    rng = np.random.default_rng(0)
+    prefixes = np.array([prefix for prefix, _ in MARKET_PREFIX_RULES])
+    for size in sizes:
+        chosen = prefixes[rng.integers(0, len(prefixes), size)]
+        suffixes = rng.integers(0, 1_000_000, size).astype(str)
+        codes = np.char.add(chosen, np.char.zfill(suffixes, 6)).astype('U6')
+
+        start = time.perf_counter()
+        scalar = pd.Series(codes).apply(determine_market).to_numpy()
+        scalar_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        vectorized = classify_markets(codes)
+        vector_time = time.perf_counter() - start
+
+        identical = "一致" if (scalar == vectorized).all() else "不一致"
+        print(f"  {size:>9} 个代码: 逐行 {size / scalar_time / 1e6:.2f} 百万/秒, "
+              f"向量化 {size / vector_time / 1e6:.2f} 百万/秒, "
+              f"加速比 {scalar_time / vector_time:.1f}x, 结果{identical}")
+
+
+if __name__ == "__main__":
+    print("前缀规则校验:")
+    print("全部通过" if check_prefix_rules() else "存在失败项")
+    print("\n吞吐量测试:")
+    benchmark_classify()
@@ -10,6 +10,8 @@ import pandas as pd
 import json
 from typing import Dict, Any
 
+from stock_code_market import classify_markets, determine_market, normalize_codes
+
 
 def stock_info_a_code_name() -> pd.DataFrame:
     """
@@ -46,7 +48,7 @@ def stock_info_a_code_name() -> pd.DataFrame:
 
         # 添加market列（如果不存在）
         if 'market' not in df.columns:
-            df['market'] = df['code'].apply(_determine_market)
+            df['market'] = classify_markets(df['code'])
 
         # 确保返回的列顺序正确
         required_cols = ['code', 'name', 'market']
@@ -61,7 +63,7 @@ def stock_info_a_code_name() -> pd.DataFrame:
 
 def _determine_market(code: str) -> str:
     """
-    根据股票代码判断所属市场
+    根据股票代码判断所属市场，规则见stock_code_market.MARKET_PREFIX_RULES
 
     Args:
         code (str): 股票代码
@@ -69,22 +71,7 @@ def _determine_market(code: str) -> str:
     Returns:
         str: 市场代码（sh/sz/bj）
     """
-    if pd.isna(code):
-        return 'unknown'
-
-    code_str = str(code).zfill(6)
-
-    # 上交所代码规则
-    if code_str.startswith(('6', '9')):
-        return 'sh'
-    # 深交所代码规则
-    elif code_str.startswith(('0', '2', '3')):
-        return 'sz'
-    # 北交所代码规则
-    elif code_str.startswith(('8', '4')):
-        return 'bj'
-    else:
-        return 'unknown'
+    return determine_market(code)
 
 
 def stock_info_a_code_name_json() -> Dict[str, Dict[str, str]]:
@@ -103,14 +90,7 @@ def stock_info_a_code_name_json() -> Dict[str, Dict[str, str]]:
             return {}
 
         # 转换为JSON格式
-        result = {}
-        for _, row in df.iterrows():
-            code = str(row['code']).zfill(6)
-            result[code] = {
-                "code": code,
-                "name": str(row['name']),
-                "market": str(row['market'])
-            }
+        result = build_code_name_dict(df)
 
         return result
 
@@ -119,6 +99,29 @@ def stock_info_a_code_name_json() -> Dict[str, Dict[str, str]]:
         return {}
 
 
+def build_code_name_dict(df: pd.DataFrame) -> Dict[str, Dict[str, str]]:
+    """
+    将股票列表DataFrame按列整体转换为字典格式，不逐行遍历DataFrame
+
+    Args:
+        df (pd.DataFrame): 包含code、name、market列的股票列表
+
+    Returns:
+        Dict[str, Dict[str, str]]: {股票代码: {"code": 股票代码, "name": 股票名称, "market": 市场}}
+    """
+    codes = normalize_codes(df['code']).tolist()
+    names = df['name'].astype(str).tolist()
+    if 'market' in df.columns:
+        markets = df['market'].astype(str).tolist()
+    else:
+        markets = classify_markets(codes).tolist()
+
+    return {
+        code: {"code": code, "name": name, "market": market}
+        for code, name, market in zip(codes, names, markets)
+    }
+
+
 def save_stock_info_to_json(file_path: str = "stock_info.json") -> bool:
     """
     将A股信息保存到JSON文件
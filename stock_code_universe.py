@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""
+A股股票列表快照
+并发获取沪深京各交易所板块的股票列表并合并为统一格式，持久化到本地快照文件，
+在有效期内直接复用，并提供与上一次快照的差异（新上市/已退市股票代码），供增量运行使用
+"""
+
+import os
+import sys
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from stock_code_market import normalize_codes
+from stock_code_name import (
+    build_code_name_dict,
+    stock_info_a_code_name_json,
+    stock_info_bj_name_code,
+    stock_info_sh_name_code,
+    stock_info_sz_name_code,
+)
+
+DEFAULT_SNAPSHOT_FILE = "stock_universe_snapshot.json"
+DEFAULT_TTL_HOURS = 24.0
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 交易所板块表：(板块名称, 获取函数, 调用参数, 所属市场)
+EXCHANGE_BOARDS = [
+    ('上交所主板A股', stock_info_sh_name_code, {'symbol': '主板A股'}, 'sh'),
+    ('上交所科创板', stock_info_sh_name_code, {'symbol': '科创板'}, 'sh'),
+    ('深交所A股', stock_info_sz_name_code, {'symbol': 'A股列表'}, 'sz'),
+    ('北交所', stock_info_bj_name_code, {}, 'bj'),
+]
+
+# 各交易所接口返回的列名不同，按候选列名归一化为统一格式
+BOARD_COLUMN_CANDIDATES = {
+    'code': ['证券代码', 'A股代码', 'B股代码', 'CDR代码', '代码'],
+    'name': ['证券简称', 'A股简称', 'B股简称', 'CDR简称', '名称'],
+    'list_date': ['上市日期', 'A股上市日期', 'B股上市日期', 'CDR上市日期'],
+}
+
+UNIVERSE_COLUMNS = ['code', 'name', 'market', 'board', 'list_date']
+
+
+def normalize_board_frame(df: pd.DataFrame, board: str, market: str) -> pd.DataFrame:
+    """
+    将单个交易所板块的股票列表归一化为统一格式
+
+    Args:
+        df (pd.DataFrame): 交易所接口返回的原始数据
+        board (str): 板块名称
+        market (str): 所属市场（sh/sz/bj）
+
+    Returns:
+        pd.DataFrame: 包含code、name、market、board、list_date列，已去除空代码
+    """
+    columns = {}
+    for target, candidates in BOARD_COLUMN_CANDIDATES.items():
+        source = next((col for col in candidates if col in df.columns), None)
+        if source is None and target != 'list_date':
+            raise KeyError(f"{board} 缺少{target}列，实际列名: {list(df.columns)}")
+        columns[target] = source
+
+    result = pd.DataFrame({
+        'code': normalize_codes(df[columns['code']]),
+        'name': df[columns['name']].astype(str).str.strip().to_numpy(),
+    })
+    result['market'] = market
+    result['board'] = board
+    if columns['list_date']:
+        result['list_date'] = pd.to_datetime(df[columns['list_date']], errors='coerce').dt.strftime('%Y-%m-%d').to_numpy()
+    else:
+        result['list_date'] = None
+    return result[result['code'] != ''][UNIVERSE_COLUMNS]
+
+
+def _fetch_board(board: str, fetch_func, kwargs: Dict[str, Any], market: str) -> Dict[str, Any]:
+    """获取并归一化单个板块，返回包含数据和耗时的结果"""
+    start = time.perf_counter()
+    try:
+        df = fetch_func(**kwargs)
+        if df.empty:
+            raise ValueError("返回数据为空")
+        frame = normalize_board_frame(df, board, market)
+        error = None
+    except Exception as e:
+        frame = None
+        error = str(e)
+    return {
+        'board': board,
+        'frame': frame,
+        'rows': 0 if frame is None else len(frame),
+        'seconds': time.perf_counter() - start,
+        'error': error,
+    }
+
+
+def fetch_exchange_boards(boards: Optional[List[Tuple]] = None,
+                          max_workers: Optional[int] = None) -> Tuple[Optional[pd.DataFrame], List[Dict[str, Any]]]:
+    """
+    并发获取各交易所板块的股票列表并合并
+
+    Args:
+        boards: 板块表，默认为EXCHANGE_BOARDS
+        max_workers: 并发线程数，默认每个板块一个线程
+
+    Returns:
+        Tuple[Optional[pd.DataFrame], List[Dict[str, Any]]]:
+            (合并后的股票列表，任一板块失败时为None; 各板块的耗时报告)
+    """
+    boards = boards or EXCHANGE_BOARDS
+    with ThreadPoolExecutor(max_workers=max_workers or len(boards)) as executor:
+        futures = [executor.submit(_fetch_board, *board) for board in boards]
+        reports = [future.result() for future in futures]
+
+    if any(report['error'] for report in reports):
+        return None, reports
+
+    merged = pd.concat([report['frame'] for report in reports], ignore_index=True)
+    # 同一代码出现在多个板块时保留板块表中靠前的记录
+    merged = merged.drop_duplicates(subset='code', keep='first').sort_values('code', ignore_index=True)
+    return merged, reports
+
+
+def print_board_report(reports: List[Dict[str, Any]], wall_seconds: float) -> None:
+    """打印各板块的获取耗时"""
+    print("交易所板块获取耗时:")
+    for report in reports:
+        status = f"{report['rows']} 只" if not report['error'] else f"失败: {report['error']}"
+        print(f"  {report['board']:<10} {report['seconds']:>6.2f}秒  {status}")
+    total = sum(report['seconds'] for report in reports)
+    print(f"  并发总耗时 {wall_seconds:.2f}秒 (各板块耗时之和 {total:.2f}秒)")
+
+
+def build_universe_from_exchanges(boards: Optional[List[Tuple]] = None) -> Dict[str, Dict[str, str]]:
+    """
+    并发获取沪深京各板块并构建股票列表
+
+    Returns:
+        Dict[str, Dict[str, str]]: {股票代码: {"code": 股票代码, "name": 股票名称, "market": 市场}}，
+        任一板块获取失败时返回空字典
+    """
+    start = time.perf_counter()
+    merged, reports = fetch_exchange_boards(boards)
+    print_board_report(reports, time.perf_counter() - start)
+    if merged is None:
+        return {}
+    return build_code_name_dict(merged)
+
+
+def diff_codes(previous_codes, current_codes) -> Dict[str, List[str]]:
+    """
+    比较两次股票列表的差异
+
+    Args:
+        previous_codes: 上一次的股票代码集合
+        current_codes: 本次的股票代码集合
+
+    Returns:
+        Dict[str, List[str]]: {"listed": 新上市代码, "delisted": 已退市代码}，均已排序
+    """
+    previous_codes = set(previous_codes)
+    current_codes = set(current_codes)
+    return {
+        'listed': sorted(current_codes - previous_codes),
+        'delisted': sorted(previous_codes - current_codes),
+    }
+
+
+class UniverseSnapshot:
+    """股票列表快照管理器"""
+
+    def __init__(self, snapshot_file: str = DEFAULT_SNAPSHOT_FILE, ttl_hours: float = DEFAULT_TTL_HOURS):
+        self.snapshot_file = snapshot_file
+        self.ttl = timedelta(hours=ttl_hours)
+        self.stocks = {}
+        self.timestamp = None
+        self.previous_codes = []
+        self.previous_timestamp = None
+
+    def load(self) -> bool:
+        """加载快照文件"""
+        try:
+            if not os.path.exists(self.snapshot_file):
+                return False
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.stocks = data.get('stocks', {})
+            self.timestamp = data.get('timestamp')
+            previous = data.get('previous', {})
+            self.previous_codes = previous.get('codes', [])
+            self.previous_timestamp = previous.get('timestamp')
+            return True
+        except Exception as e:
+            print(f"✗ 加载股票列表快照失败: {e}")
+            return False
+
+    def save(self) -> bool:
+        """保存快照文件"""
+        try:
+            data = {
+                'timestamp': self.timestamp,
+                'stocks': self.stocks,
+                'previous': {
+                    'timestamp': self.previous_timestamp,
+                    'codes': self.previous_codes,
+                },
+            }
+            tmp_file = self.snapshot_file + ".tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.snapshot_file)
+            return True
+        except Exception as e:
+            print(f"✗ 保存股票列表快照失败: {e}")
+            return False
+
+    def is_fresh(self) -> bool:
+        """快照是否在有效期内"""
+        if not self.stocks or not self.timestamp:
+            return False
+        try:
+            snapshot_time = datetime.strptime(self.timestamp, TIME_FORMAT)
+        except ValueError:
+            return False
+        return datetime.now() - snapshot_time < self.ttl
+
+    def update(self, stocks: Dict[str, Dict[str, str]]) -> None:
+        """用新的股票列表替换当前快照，当前快照转为上一次快照"""
+        if self.stocks:
+            self.previous_codes = sorted(self.stocks)
+            self.previous_timestamp = self.timestamp
+        self.stocks = stocks
+        self.timestamp = datetime.now().strftime(TIME_FORMAT)
+
+    def refresh(self, source: str = "exchanges") -> bool:
+        """
+        从akshare重新获取股票列表并保存快照
+
+        Args:
+            source (str): exchanges为并发获取各交易所板块，失败时回退到a_code_name；
+                          a_code_name为调用stock_info_a_code_name
+        """
+        stocks = {}
+        if source == "exchanges":
+            stocks = build_universe_from_exchanges()
+            if not stocks:
+                print("✗ 交易所板块获取不完整，改用stock_info_a_code_name")
+        if not stocks:
+            stocks = stock_info_a_code_name_json()
+        if not stocks:
+            print("✗ 获取股票列表失败，保留原有快照")
+            return False
+        self.update(stocks)
+        return self.save()
+
+    def diff(self) -> Dict[str, List[str]]:
+        """
+        当前快照相对上一次快照的差异
+
+        Returns:
+            Dict[str, List[str]]: {"listed": 新上市代码, "delisted": 已退市代码}，
+            没有上一次快照时两者均为空
+        """
+        if not self.previous_timestamp:
+            return {'listed': [], 'delisted': []}
+        return diff_codes(self.previous_codes, self.stocks)
+
+
+def get_stock_universe(snapshot_file: str = DEFAULT_SNAPSHOT_FILE, ttl_hours: float = DEFAULT_TTL_HOURS,
+                       force_refresh: bool = False, source: str = "exchanges") -> Dict[str, Dict[str, str]]:
+    """
+    获取A股股票列表，快照在有效期内时不再请求akshare
+
+    Args:
+        snapshot_file (str): 快照文件路径
+        ttl_hours (float): 快照有效期（小时），0表示每次都重新获取
+        force_refresh (bool): 是否强制重新获取
+        source (str): 刷新时的数据来源，exchanges或a_code_name
+
+    Returns:
+        Dict[str, Dict[str, str]]: {股票代码: {"code": 股票代码, "name": 股票名称, "market": 市场}}
+    """
+    snapshot = UniverseSnapshot(snapshot_file, ttl_hours)
+    snapshot.load()
+
+    if not force_refresh and snapshot.is_fresh():
+        print(f"✓ 使用股票列表快照: {len(snapshot.stocks)} 只股票 (更新于 {snapshot.timestamp})")
+        return snapshot.stocks
+
+    if snapshot.refresh(source):
+        changes = snapshot.diff()
+        print(f"✓ 已更新股票列表快照: {len(snapshot.stocks)} 只股票, "
+              f"新上市 {len(changes['listed'])} 只, 已退市 {len(changes['delisted'])} 只")
+    elif snapshot.stocks:
+        print(f"✓ 使用过期的股票列表快照: {len(snapshot.stocks)} 只股票 (更新于 {snapshot.timestamp})")
+    return snapshot.stocks
+
+
+def get_universe_diff(snapshot_file: str = DEFAULT_SNAPSHOT_FILE) -> Dict[str, List[str]]:
+    """
+    读取快照文件中记录的最近一次股票列表变化
+
+    Returns:
+        Dict[str, List[str]]: {"listed": 新上市代码, "delisted": 已退市代码}
+    """
+    snapshot = UniverseSnapshot(snapshot_file)
+    snapshot.load()
+    return snapshot.diff()
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "show"
+
+    if command == "refresh":
+        get_stock_universe(force_refresh=True)
+    elif command == "diff":
+        changes = get_universe_diff()
+        print(f"新上市: {len(changes['listed'])} 只 {changes['listed'][:20]}")
+        print(f"已退市: {len(changes['delisted'])} 只 {changes['delisted'][:20]}")
+    elif command == "boards":
+        build_universe_from_exchanges()
+    elif command == "show":
+        universe = get_stock_universe()
+        print(f"股票列表共 {len(universe)} 只股票")
+    else:
+        print(f"未知命令: {command}")
+        print("使用方法: python stock_code_universe.py [show|refresh|diff|boards]")